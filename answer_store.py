@@ -0,0 +1,155 @@
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import deque
+
+# check() outcomes
+CORRECT = 'correct'
+INCORRECT = 'incorrect'
+EXPIRED = 'expired'
+LOCKED = 'locked'
+
+class _Entry:
+    __slots__ = ('digest', 'expires_at', 'attempts')
+
+    def __init__(self, digest, expires_at, attempts):
+        self.digest = digest
+        self.expires_at = expires_at
+        self.attempts = attempts
+
+class AnswerStore:
+    """Outstanding CAPTCHA answers for pending members, sized for raids.
+
+    Each (guild, user) pair is packed into one int key and maps to a slotted
+    record holding a keyed 16-byte hash of the answer, its expiry and the
+    failed-attempt count. Every answer shares one TTL, so a timer wheel of
+    one-second buckets, appended in order, drives both expiry and eviction:
+    past max_entries the oldest bucket loses an entry. Lookups are a dict hit
+    plus hmac.compare_digest.
+
+    A member who reaches max_attempts is locked out until the entry expires;
+    issuing them a new challenge does not reset the counter.
+    """
+
+    def __init__(self, ttl=300, max_entries=200000, max_attempts=3, secret=None, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_attempts = max_attempts
+        self.clock = clock
+        self._secret = secret or os.urandom(32)
+
+        self._lock = threading.Lock()
+        self._entries = {}
+        # deque of [tick, keys, head]; keys of answered or replaced entries are skipped when popped
+        self._wheel = deque()
+
+        self.expirations = 0
+        self.evictions = 0
+        self.lockouts = 0
+
+    def put(self, guild_id, user_id, answer):
+        """Store the answer to a new challenge; returns False while the member is locked out"""
+        key = self._key(guild_id, user_id)
+        now = self.clock()
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.get(key)
+            attempts = entry.attempts if entry else 0
+            if attempts >= self.max_attempts:
+                return False
+
+            expires_at = now + self.ttl
+            self._entries[key] = _Entry(self._digest(key, answer), expires_at, attempts)
+            tick = int(expires_at)
+            if self._wheel and self._wheel[-1][0] == tick:
+                self._wheel[-1][1].append(key)
+            else:
+                self._wheel.append([tick, [key], 0])
+            while len(self._entries) > self.max_entries:
+                self._pop_oldest()
+            return True
+
+    def check(self, guild_id, user_id, answer):
+        """CORRECT (and forget the answer), INCORRECT, EXPIRED or LOCKED"""
+        key = self._key(guild_id, user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= self.clock():
+                return EXPIRED
+            if entry.attempts >= self.max_attempts:
+                return LOCKED
+            if hmac.compare_digest(entry.digest, self._digest(key, answer)):
+                del self._entries[key]
+                return CORRECT
+
+            entry.attempts += 1
+            if entry.attempts >= self.max_attempts:
+                # Keep the record until it expires so a new challenge can't reset the count
+                entry.digest = b''
+                self.lockouts += 1
+                return LOCKED
+            return INCORRECT
+
+    def attempts_left(self, guild_id, user_id):
+        with self._lock:
+            entry = self._entries.get(self._key(guild_id, user_id))
+            return self.max_attempts - (entry.attempts if entry else 0)
+
+    def purge_expired(self):
+        with self._lock:
+            before = len(self._entries)
+            self._expire(self.clock())
+            return before - len(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'wheel_buckets': len(self._wheel),
+                'expirations': self.expirations,
+                'evictions': self.evictions,
+                'lockouts': self.lockouts
+            }
+
+    @staticmethod
+    def _key(guild_id, user_id):
+        # Discord snowflakes fit in 64 bits
+        return (int(guild_id) << 64) | int(user_id)
+
+    def _digest(self, key, answer):
+        return hashlib.blake2b(
+            answer.strip().upper().encode(),
+            key=self._secret,
+            salt=key.to_bytes(16, 'big'),
+            digest_size=16
+        ).digest()
+
+    def _expire(self, now):
+        while self._wheel and self._wheel[0][0] + 1 <= now:
+            _, keys, head = self._wheel.popleft()
+            for key in keys[head:]:
+                entry = self._entries.get(key)
+                # Replaced entries live on in a later bucket
+                if entry is not None and entry.expires_at <= now:
+                    del self._entries[key]
+                    self.expirations += 1
+
+    def _pop_oldest(self):
+        while self._wheel:
+            bucket = self._wheel[0]
+            tick, keys = bucket[0], bucket[1]
+            while bucket[2] < len(keys):
+                key = keys[bucket[2]]
+                bucket[2] += 1
+                entry = self._entries.get(key)
+                if entry is not None and int(entry.expires_at) == tick:
+                    del self._entries[key]
+                    self.evictions += 1
+                    return
+            self._wheel.popleft()
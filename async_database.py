@@ -0,0 +1,38 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+class AsyncDatabase:
+    """Awaitable wrapper around Database for code running on the bot's event loop.
+
+    Every call runs on one dedicated executor thread, so a slow disk sync stalls
+    that thread instead of gateway heartbeats and other interactions. The single
+    thread also keeps all bot-side queries on one per-thread connection.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='vynk-db')
+
+    async def run(self, func, *args, **kwargs):
+        """Run any blocking database callable on the DB thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def get_server_settings(self, guild_id):
+        return await self.run(self.db.get_server_settings, guild_id)
+
+    async def save_server_settings(self, guild_id, verification_channel, verified_role, log_channel=None, method='button'):
+        return await self.run(self.db.save_server_settings, guild_id, verification_channel, verified_role, log_channel, method)
+
+    async def log_verification(self, guild_id, user_id, user_name, method, status):
+        return await self.run(self.db.log_verification, guild_id, user_id, user_name, method, status)
+
+    async def get_server_stats(self, guild_id):
+        return await self.run(self.db.get_server_stats, guild_id)
+
+    async def flush_logs(self):
+        return await self.run(self.db.flush_logs)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
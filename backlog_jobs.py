@@ -0,0 +1,277 @@
+import asyncio
+import threading
+import uuid
+from datetime import datetime, timezone
+import discord
+from rollups import insert_verification_logs
+from db_connection import ConnectionManager
+
+class BacklogJobManager:
+    """Throttled, resumable bulk assignment of the verified role to existing members.
+
+    Progress is checkpointed to the backlog_jobs table together with each batch of
+    verification_logs rows, so a job picks up after the last checkpoint when the
+    bot restarts. All database work runs on async_db's thread; from the event loop,
+    call the synchronous getters through async_db.run.
+
+    The dashboard shares only the database with the bot: it calls create_job()
+    and cancel_job() directly, the bot's start() poller picks up new jobs, and a
+    job cancelled that way stops at its next checkpoint.
+    """
+
+    def __init__(self, bot, db_path, rate=5.0, batch_size=25):
+        self.bot = bot
+        self.rate = rate
+        self.batch_size = batch_size
+        self._tasks = {}
+        self._watcher = None
+
+        self._lock = threading.Lock()
+        self.db = ConnectionManager.for_path(db_path)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS backlog_jobs (
+                job_id TEXT PRIMARY KEY,
+                guild_id TEXT,
+                role_id TEXT,
+                joined_before TEXT,
+                requested_by TEXT,
+                status TEXT DEFAULT 'running',
+                last_member_id INTEGER DEFAULT 0,
+                total INTEGER DEFAULT 0,
+                processed INTEGER DEFAULT 0,
+                assigned INTEGER DEFAULT 0,
+                failed INTEGER DEFAULT 0,
+                error TEXT,
+                created_at TEXT,
+                updated_at TEXT
+            )
+        ''')
+        self.conn.commit()
+
+    @property
+    def conn(self):
+        return self.db.connection()
+
+    def start(self, poll_interval=15):
+        """Once the bot is ready, run interrupted jobs and poll for ones created by the dashboard"""
+        if self._watcher is None:
+            self._watcher = asyncio.get_running_loop().create_task(self._watch(poll_interval))
+
+    async def stop(self):
+        if self._watcher:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+            self._watcher = None
+
+    async def start_job(self, guild_id, role_id, joined_before=None, requested_by=None):
+        """Create and start a job; must be called on the bot's event loop"""
+        from database import async_db
+        job_id = await async_db.run(self.create_job, guild_id, role_id, joined_before, requested_by)
+        self._spawn(job_id)
+        return await async_db.run(self.get_job, job_id)
+
+    async def resume_all(self):
+        """Run every running job without a task: interrupted by a restart or created by the dashboard"""
+        from database import async_db
+        job_ids = [job_id for job_id in await async_db.run(self._running_job_ids) if job_id not in self._tasks]
+        for job_id in job_ids:
+            print(f"🔁 Picking up verify-backlog job {job_id}")
+            self._spawn(job_id)
+        return len(job_ids)
+
+    async def cancel(self, job_id):
+        """Stop a running job; returns False if it had already finished"""
+        from database import async_db
+        if not await async_db.run(self.cancel_job, job_id):
+            return False
+        task = self._tasks.get(job_id)
+        if task:
+            task.cancel()
+        return True
+
+    def get_job(self, job_id):
+        with self._lock:
+            row = self.conn.execute('SELECT * FROM backlog_jobs WHERE job_id = ?', (job_id,)).fetchone()
+        if not row:
+            return None
+        job = dict(row)
+        job['progress'] = round(job['processed'] / job['total'] * 100, 1) if job['total'] else 0
+        return job
+
+    def get_active_job(self, guild_id):
+        with self._lock:
+            row = self.conn.execute('''
+                SELECT job_id FROM backlog_jobs WHERE guild_id = ? AND status = 'running'
+                ORDER BY created_at DESC LIMIT 1
+            ''', (str(guild_id),)).fetchone()
+        return self.get_job(row['job_id']) if row else None
+
+    def get_latest_job(self, guild_id):
+        with self._lock:
+            row = self.conn.execute('''
+                SELECT job_id FROM backlog_jobs WHERE guild_id = ?
+                ORDER BY created_at DESC LIMIT 1
+            ''', (str(guild_id),)).fetchone()
+        return self.get_job(row['job_id']) if row else None
+
+    def cancel_job(self, job_id):
+        """Mark a running job cancelled; its task, if any, stops at the next checkpoint"""
+        return self._finish(job_id, 'cancelled')
+
+    def create_job(self, guild_id, role_id, joined_before=None, requested_by=None):
+        """Record a running job; the bot starts it, or picks it up within a poll interval"""
+        with self._lock, self.conn:
+            # Checked in the same transaction so two requests can't both start a job
+            running = self.conn.execute('''
+                SELECT job_id FROM backlog_jobs WHERE guild_id = ? AND status = 'running' LIMIT 1
+            ''', (str(guild_id),)).fetchone()
+            if running:
+                raise ValueError(f"Job {running['job_id']} is already running for this guild")
+
+            job_id = uuid.uuid4().hex[:12]
+            now = datetime.now().isoformat()
+            self.conn.execute('''
+                INSERT INTO backlog_jobs
+                (job_id, guild_id, role_id, joined_before, requested_by, status, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, 'running', ?, ?)
+            ''', (job_id, str(guild_id), str(role_id),
+                  joined_before.isoformat() if joined_before else None, requested_by, now, now))
+        return job_id
+
+    def _running_job_ids(self):
+        with self._lock:
+            rows = self.conn.execute("SELECT job_id FROM backlog_jobs WHERE status = 'running'").fetchall()
+        return [row['job_id'] for row in rows]
+
+    async def _watch(self, poll_interval):
+        await self.bot.wait_until_ready()
+        while True:
+            try:
+                await self.resume_all()
+            except Exception as e:
+                print(f"❌ Error polling verify-backlog jobs: {e}")
+            await asyncio.sleep(poll_interval)
+
+    def _spawn(self, job_id):
+        task = asyncio.get_running_loop().create_task(self._run(job_id))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    async def _run(self, job_id):
+        from database import async_db
+        job = await async_db.run(self.get_job, job_id)
+        batch = []
+        assigned = failed = 0
+        last_member_id = job['last_member_id']
+        try:
+            guild = self.bot.get_guild(int(job['guild_id']))
+            if not guild:
+                raise RuntimeError("Guild not found")
+            role = guild.get_role(int(job['role_id']))
+            if not role:
+                raise RuntimeError(f"Role {job['role_id']} not found")
+            if not guild.chunked:
+                await guild.chunk()
+
+            joined_before = datetime.fromisoformat(job['joined_before']) if job['joined_before'] else None
+            pending = sorted(
+                (m for m in guild.members
+                 if m.id > job['last_member_id'] and not m.bot and role not in m.roles
+                 and (joined_before is None or (m.joined_at and m.joined_at < joined_before))),
+                key=lambda m: m.id
+            )
+            total = job['processed'] + len(pending)
+            await async_db.run(self._update, job_id, total=total)
+            print(f"📋 verify-backlog {job_id}: {len(pending)} members to process in {guild.name}")
+
+            for member in pending:
+                status = 'success'
+                try:
+                    await member.add_roles(role, reason=f"VYNK verify-backlog {job_id}")
+                    assigned += 1
+                except discord.Forbidden:
+                    # Missing permissions or role hierarchy: every other member would fail the same way
+                    raise RuntimeError(f"Missing permission to assign {role.name}")
+                except discord.HTTPException as e:
+                    print(f"⚠️ verify-backlog {job_id}: could not verify {member}: {e}")
+                    status = 'failed'
+                    failed += 1
+
+                batch.append((str(guild.id), str(member.id), str(member), 'backlog', status, datetime.now().isoformat()))
+                last_member_id = member.id
+                if len(batch) >= self.batch_size:
+                    # Hand the batch off before awaiting so a cancel can't checkpoint it twice, and
+                    # shield the write so a cancel can't drop it while it waits for the DB thread
+                    checkpoint = (job_id, batch, last_member_id, assigned, failed)
+                    batch, assigned, failed = [], 0, 0
+                    if not await asyncio.shield(async_db.run(self._checkpoint, *checkpoint)):
+                        print(f"🛑 verify-backlog {job_id} cancelled")
+                        return
+
+                await asyncio.sleep(1 / self.rate)
+
+            checkpoint = (job_id, batch, last_member_id, assigned, failed)
+            batch, assigned, failed = [], 0, 0
+            await asyncio.shield(async_db.run(self._checkpoint, *checkpoint))
+            if not await async_db.run(self._finish, job_id, 'completed'):
+                print(f"🛑 verify-backlog {job_id} cancelled")
+                return
+
+            job = await async_db.run(self.get_job, job_id)
+            print(f"✅ verify-backlog {job_id} completed: {job['assigned']} assigned, {job['failed']} failed")
+            await self.bot.send_log(
+                job['guild_id'],
+                "📋 Verification Backlog Complete",
+                f"**Job:** `{job_id}`\n**Assigned:** {job['assigned']}\n**Failed:** {job['failed']}",
+                0x10B981
+            )
+        except asyncio.CancelledError:
+            # Bot shutdown or cancel(): keep what was already assigned
+            await async_db.run(self._checkpoint, job_id, batch, last_member_id, assigned, failed)
+            raise
+        except Exception as e:
+            print(f"❌ verify-backlog {job_id} failed: {e}")
+            await async_db.run(self._checkpoint, job_id, batch, last_member_id, assigned, failed)
+            await async_db.run(self._finish, job_id, 'failed', error=str(e))
+
+    def _checkpoint(self, job_id, rows, last_member_id, assigned, failed):
+        """Write a batch of log rows and advance the job cursor in one transaction.
+
+        Returns False once the job has been cancelled, e.g. from the dashboard.
+        """
+        with self._lock, self.conn:
+            if rows:
+                insert_verification_logs(self.conn, rows)
+                self.conn.execute('''
+                    UPDATE backlog_jobs
+                    SET last_member_id = ?, processed = processed + ?, assigned = assigned + ?,
+                        failed = failed + ?, updated_at = ?
+                    WHERE job_id = ?
+                ''', (last_member_id, len(rows), assigned, failed, datetime.now().isoformat(), job_id))
+            row = self.conn.execute('SELECT status FROM backlog_jobs WHERE job_id = ?', (job_id,)).fetchone()
+        return row is not None and row['status'] == 'running'
+
+    def _finish(self, job_id, status, error=None):
+        """Move a running job to its final status; finished jobs are left alone"""
+        with self._lock, self.conn:
+            cursor = self.conn.execute('''
+                UPDATE backlog_jobs SET status = ?, error = ?, updated_at = ?
+                WHERE job_id = ? AND status = 'running'
+            ''', (status, error, datetime.now().isoformat(), job_id))
+        return cursor.rowcount > 0
+
+    def _update(self, job_id, **fields):
+        fields['updated_at'] = datetime.now().isoformat()
+        assignments = ', '.join(f"{name} = ?" for name in fields)
+        with self._lock, self.conn:
+            self.conn.execute(f'UPDATE backlog_jobs SET {assignments} WHERE job_id = ?', (*fields.values(), job_id))
+
+def parse_joined_before(value):
+    """Parse a YYYY-MM-DD (or full ISO) date into an aware UTC datetime"""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
@@ -0,0 +1,92 @@
+"""Memory per pending CAPTCHA answer, and check() latency.
+
+Fills an AnswerStore and the plain {(guild_id, user_id): (answer, expires_at)}
+dict it replaced with the same N members, reporting traced bytes per entry,
+then times check() hits and misses and put() once the store is at its cap.
+
+Run from the repository root:
+    python -m benchmarks.bench_answer_store [entries]
+"""
+import gc
+import random
+import sys
+import time
+import tracemalloc
+
+from answer_store import AnswerStore
+from captcha import ALPHABET, LENGTH
+
+GUILD_ID = 1100000000000000000
+
+
+def members(count):
+    rng = random.Random(7)
+    base = 1200000000000000000
+    return [(GUILD_ID, base + i, ''.join(rng.choice(ALPHABET) for _ in range(LENGTH))) for i in range(count)]
+
+
+def fresh(population):
+    # Each interaction brings its own id ints and the pool hands over its answer string,
+    # so copies are what a store actually keeps alive
+    for g, u, answer in population:
+        yield int(str(g)), int(str(u)), (answer + '.')[:-1]
+
+
+def traced(build):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held = build()
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return held, used
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    population = members(count)
+    answers = [answer for _, _, answer in population]
+
+    def build_dict():
+        expires = time.monotonic() + 300
+        return {(g, u): (answer, expires) for g, u, answer in fresh(population)}
+
+    def build_store():
+        store = AnswerStore(max_entries=count)
+        for g, u, answer in fresh(population):
+            store.put(g, u, answer)
+        return store
+
+    naive, dict_bytes = traced(build_dict)
+    del naive
+    store, store_bytes = traced(build_store)
+    print(f"📊 {count} pending answers")
+    print(f"   plain dict:  {dict_bytes / count:6.0f} bytes/entry (plaintext answers, no attempt limit)")
+    print(f"   AnswerStore: {store_bytes / count:6.0f} bytes/entry (hashed answers, timer wheel, attempt counters)")
+
+    sample = random.Random(1).sample(population, min(count, 20000))
+    start = time.perf_counter()
+    for g, u, answer in sample:
+        store.check(g, u, answer.lower() + 'X')
+    miss = (time.perf_counter() - start) / len(sample)
+    start = time.perf_counter()
+    for g, u, answer in sample:
+        store.check(g, u, answer)
+    hit = (time.perf_counter() - start) / len(sample)
+    print(f"   check(): {hit * 1e6:.2f}µs correct, {miss * 1e6:.2f}µs incorrect")
+
+    # Refill to the cap, then every put() evicts the oldest entry
+    for g, u, answer in sample:
+        store.put(g, u, answer)
+    start = time.perf_counter()
+    for i in range(len(sample)):
+        store.put(GUILD_ID + 1, i, answers[i])
+    put = (time.perf_counter() - start) / len(sample)
+    stats = store.stats()
+    print(f"   put() at cap: {put * 1e6:.2f}µs, {stats['entries']} entries, {stats['evictions']} evictions, "
+          f"{stats['wheel_buckets']} wheel bucket(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""CAPTCHA rendering throughput and CaptchaPool footprint.
+
+Reports single-core render rate, how fast a pool with 1..N worker processes
+fills its ring buffer, the cost of take() on the loop thread, and the memory
+held by a full buffer and by each worker process.
+
+Run from the repository root:
+    python -m benchmarks.bench_captcha [pool_size]
+"""
+import os
+import sys
+import time
+
+from captcha import CaptchaPool, render_challenge
+
+
+def rss_mb(pid):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def fill(pool, timeout=120):
+    start = time.perf_counter()
+    pool.start()
+    while len(pool._buffer) < pool.size:
+        if time.perf_counter() - start > timeout:
+            raise RuntimeError("Pool did not fill in time")
+        time.sleep(0.005)
+    return time.perf_counter() - start
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    cores = os.cpu_count() or 1
+
+    render_challenge()  # warm up font loading
+    count = 200
+    start = time.perf_counter()
+    for _ in range(count):
+        render_challenge()
+    single = count / (time.perf_counter() - start)
+    print(f"📊 In-process render: {single:7.0f} challenges/sec on one core ({1000 / single:.2f}ms each)")
+
+    workers_options = sorted({1, max(1, cores // 2), cores})
+    for workers in workers_options:
+        pool = CaptchaPool(size=size, low_water=size // 4, workers=workers)
+        try:
+            # First fill includes spawning the workers; time a second one for steady state
+            fill(pool)
+            pool._buffer.clear()
+            pool._refill()
+            elapsed = fill(pool)
+            rate = size / elapsed
+            print(f"   pool, {workers:2d} worker(s): {rate:7.0f} challenges/sec ({rate / workers:6.0f} per core)")
+
+            if workers == workers_options[-1]:
+                stats = pool.stats()
+                start = time.perf_counter()
+                taken = 0
+                while pool.take() is not None and taken < size // 2:
+                    taken += 1
+                per_take = (time.perf_counter() - start) / max(taken, 1)
+                worker_rss = [rss_mb(pid) for pid in pool._executor._processes]
+                print(f"   take(): {per_take * 1e6:.2f}µs per challenge on the caller's thread")
+                print(f"   full buffer: {stats['buffered']} challenges, {stats['buffer_bytes'] / 1024:.0f} KB "
+                      f"({stats['buffer_bytes'] / max(stats['buffered'], 1) / 1024:.1f} KB each)")
+                print(f"   worker RSS: {sum(worker_rss):.0f} MB total, {max(worker_rss, default=0):.0f} MB per process; "
+                      f"parent RSS {rss_mb(os.getpid()):.0f} MB")
+        finally:
+            pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
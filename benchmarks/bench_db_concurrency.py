@@ -0,0 +1,145 @@
+"""Multi-process, multi-threaded SQLite stress test.
+
+Two processes (standing in for the Procfile's `web` and `worker`) each run
+writer threads that insert verification logs and reader threads that query
+stats, all against one database file. The legacy setup shares a single
+check_same_thread=False connection per process in rollback-journal mode; the
+current setup goes through ConnectionManager (WAL, synchronous=NORMAL, busy
+timeout, per-thread and read-only connections).
+
+Run from the repository root:
+    python -m benchmarks.bench_db_concurrency [writes_per_thread] [writer_threads] [reader_threads]
+"""
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+_tmpdir = tempfile.mkdtemp(prefix="vynk-bench-")
+os.environ.setdefault('VYNK_DB_PATH', os.path.join(_tmpdir, 'global.db'))
+
+from rollups import INSERT_LOG_SQL
+
+
+def legacy_worker(path, writes, writers, readers, results):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    errors = []
+    stop = threading.Event()
+
+    def write():
+        for i in range(writes):
+            try:
+                cursor = conn.cursor()
+                cursor.execute(INSERT_LOG_SQL, ("1", str(i), "user", "button", "success", datetime.now().isoformat()))
+                conn.commit()
+            except Exception as e:
+                errors.append(type(e).__name__)
+
+    def read():
+        while not stop.is_set():
+            try:
+                cursor = conn.cursor()
+                cursor.execute('SELECT COUNT(*) FROM verification_logs WHERE guild_id = ?', ("1",))
+                cursor.fetchone()
+            except Exception as e:
+                errors.append(type(e).__name__)
+
+    run_threads(write, read, writers, readers, stop)
+    results.put(errors)
+
+
+def managed_worker(path, writes, writers, readers, results):
+    from database import Database
+    from web_dashboard import DashboardDB
+    db = Database(path)
+    dashboard = DashboardDB(path)
+    errors = []
+    stop = threading.Event()
+
+    def write():
+        for i in range(writes):
+            try:
+                db.log_verification_now("1", str(i), "user", "button", "success")
+            except Exception as e:
+                errors.append(type(e).__name__)
+
+    def read():
+        while not stop.is_set():
+            try:
+                query = dashboard.read_conn.execute('SELECT COUNT(*) FROM verification_logs WHERE guild_id = ?', ("1",))
+                query.fetchone()
+            except Exception as e:
+                errors.append(type(e).__name__)
+
+    run_threads(write, read, writers, readers, stop)
+    results.put(errors)
+
+
+def run_threads(write, read, writers, readers, stop):
+    reader_threads = [threading.Thread(target=read) for _ in range(readers)]
+    writer_threads = [threading.Thread(target=write) for _ in range(writers)]
+    for thread in reader_threads + writer_threads:
+        thread.start()
+    for thread in writer_threads:
+        thread.join()
+    stop.set()
+    for thread in reader_threads:
+        thread.join()
+
+
+def run(label, worker, path, writes, writers, readers):
+    if worker is managed_worker:
+        # Create the schema up front so both processes start on an initialised file
+        from database import Database
+        Database(path).close()
+    else:
+        conn = sqlite3.connect(path)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS verification_logs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id TEXT, user_id TEXT, user_name TEXT,
+                method TEXT, status TEXT, timestamp TEXT
+            )
+        ''')
+        conn.commit()
+        conn.close()
+
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=worker, args=(path, writes, writers, readers, results)) for _ in range(2)]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    errors = [error for _ in processes for error in results.get()]
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - start
+
+    conn = sqlite3.connect(path)
+    rows = conn.execute('SELECT COUNT(*) FROM verification_logs').fetchone()[0]
+    conn.close()
+
+    expected = 2 * writers * writes
+    kinds = {kind: errors.count(kind) for kind in set(errors)}
+    print(f"   {label:<8} {rows / elapsed:9.0f} writes/sec  {rows:6d}/{expected} rows  {len(errors):5d} errors {kinds or ''}")
+
+
+def main():
+    writes = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    writers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    readers = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+
+    print(f"📊 2 processes x ({writers} writer + {readers} reader threads), {writes} writes per writer")
+    run("legacy", legacy_worker, os.path.join(_tmpdir, 'legacy.db'), writes, writers, readers)
+    run("managed", managed_worker, os.path.join(_tmpdir, 'managed.db'), writes, writers, readers)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        shutil.rmtree(_tmpdir, ignore_errors=True)
@@ -0,0 +1,130 @@
+"""DiscordREST against a local fake Discord that enforces per-route rate limits.
+
+The fake server allows LIMIT requests per WINDOW seconds per route bucket and
+answers 429 with Retry-After beyond that, like Discord does. A raid wave of
+role assignments is fired from many threads, first with bare HTTP calls and
+then through DiscordREST. The run fails if DiscordREST loses any request.
+
+Run from the repository root:
+    python -m benchmarks.bench_discord_rest [assignments] [threads]
+"""
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from http_client import HTTPClient
+from discord_rest import DiscordREST, route_key
+
+LIMIT = 5
+WINDOW = 1.0
+
+
+class FakeDiscordHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _handle(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+
+        route, major = route_key(self.command, self.path)
+        status, headers, body = self.server.take(f"{route}|{major}")
+
+        payload = json.dumps(body).encode() if body is not None else b''
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_PUT = do_POST = _handle
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeDiscord(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), FakeDiscordHandler)
+        self.lock = threading.Lock()
+        self.windows = {}
+        self.served = 0
+        self.rejected = 0
+
+    def take(self, bucket):
+        with self.lock:
+            now = time.monotonic()
+            window_start, used = self.windows.get(bucket, (now, 0))
+            if now - window_start >= WINDOW:
+                window_start, used = now, 0
+            reset_after = max(window_start + WINDOW - now, 0)
+
+            if used >= LIMIT:
+                self.rejected += 1
+                headers = {
+                    'X-RateLimit-Limit': LIMIT,
+                    'X-RateLimit-Remaining': 0,
+                    'X-RateLimit-Reset-After': f"{reset_after:.3f}",
+                    'X-RateLimit-Bucket': bucket,
+                    'Retry-After': f"{reset_after:.3f}"
+                }
+                return 429, headers, {'message': 'You are being rate limited.', 'retry_after': reset_after, 'global': False}
+
+            used += 1
+            self.windows[bucket] = (window_start, used)
+            self.served += 1
+            headers = {
+                'X-RateLimit-Limit': LIMIT,
+                'X-RateLimit-Remaining': LIMIT - used,
+                'X-RateLimit-Reset-After': f"{reset_after:.3f}",
+                'X-RateLimit-Bucket': bucket
+            }
+            return 200, headers, {}
+
+
+def wave(send, count, threads):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        statuses = list(pool.map(lambda i: send(f'/guilds/1/members/{i}/roles/2').status_code, range(count)))
+    return time.perf_counter() - start, statuses
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+
+    server = FakeDiscord()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    print(f"📊 {count} role assignments from {threads} threads, limit {LIMIT}/{WINDOW:.0f}s per route")
+
+    raw = HTTPClient(retries=0)
+    elapsed, statuses = wave(lambda path: raw.put(f'{base}{path}'), count, threads)
+    failed = sum(1 for s in statuses if s != 200)
+    print(f"   bare HTTP   : {elapsed:6.2f}s  {failed:4d} failed  {server.rejected:4d} 429s served")
+
+    # Start the second run in a fresh window
+    time.sleep(WINDOW)
+    server.rejected = 0
+    client = DiscordREST('fake-token', http=HTTPClient(retries=0), base_url=base)
+    elapsed, statuses = wave(client.put, count, threads)
+    failed = sum(1 for s in statuses if s != 200)
+    print(f"   DiscordREST : {elapsed:6.2f}s  {failed:4d} failed  {server.rejected:4d} 429s served")
+    print(f"   client stats: {client.stats()}")
+
+    server.shutdown()
+    if failed:
+        sys.exit(f"❌ DiscordREST lost {failed} requests")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Peak RSS while streaming /api/export for a large synthetic guild.
+
+The table is populated in a child process so the parent's peak RSS only
+reflects the export. The export is read through the Flask test client chunk by
+chunk, as a client download would, and the run fails if the peak grows by more
+than a fixed budget.
+
+Run from the repository root:
+    python -m benchmarks.bench_export_memory [rows]
+"""
+import multiprocessing
+import os
+import resource
+import sys
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+_tmpdir = tempfile.mkdtemp(prefix="vynk-bench-")
+os.environ['VYNK_DB_PATH'] = os.path.join(_tmpdir, 'bench.db')
+
+# Allowed growth of peak RSS during one export, in MB
+RSS_BUDGET_MB = 50
+
+
+def populate(count):
+    import json
+    from web_dashboard import db
+    from rollups import insert_verification_logs
+
+    conn = db.conn
+    start = datetime(2024, 1, 1)
+    for offset in range(0, count, 10000):
+        rows = [("1", str(i % 50000), f"user{i}", "web" if i % 4 == 0 else "button",
+                 "success" if i % 10 else "failed", (start + timedelta(seconds=i)).isoformat())
+                for i in range(offset, min(offset + 10000, count))]
+        with conn:
+            insert_verification_logs(conn, rows)
+
+    geolocation = json.dumps({"country": "Norway", "region": "Oslo", "city": "Oslo", "isp": "Example", "vpn_detected": False})
+    with conn:
+        conn.executemany('''
+            INSERT INTO verification_sessions (session_id, discord_user_id, discord_guild_id, status, geolocation_data, created_at, completed_at)
+            VALUES (?, ?, '1', 'completed', ?, ?, ?)
+        ''', [(f"s{i}", str(i), geolocation, start.isoformat(), start.isoformat()) for i in range(0, 50000, 4)])
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    print(f"📊 Populating {count} verification_logs rows...")
+    child = multiprocessing.Process(target=populate, args=(count,))
+    child.start()
+    child.join()
+
+    from web_dashboard import app
+    client = app.test_client()
+    with client.session_transaction() as flask_session:
+        flask_session['user_id'] = 'bench'
+
+    failed = False
+    for query in ('format=csv', 'format=ndjson', 'format=csv&gzip=1'):
+        before = peak_rss_mb()
+        start = time.perf_counter()
+        response = client.get(f'/api/export/1?{query}', buffered=False)
+        size = sum(len(chunk) for chunk in response.response)
+        response.close()
+        elapsed = time.perf_counter() - start
+        growth = peak_rss_mb() - before
+        failed = failed or growth > RSS_BUDGET_MB
+        print(f"   {query:<18} {size / 1e6:8.1f} MB in {elapsed:5.1f}s  peak RSS +{growth:5.1f} MB")
+
+    if failed:
+        print(f"❌ Peak RSS grew by more than {RSS_BUDGET_MB} MB during an export")
+        sys.exit(1)
+    print(f"✅ Peak RSS stayed within {RSS_BUDGET_MB} MB")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        shutil.rmtree(_tmpdir, ignore_errors=True)
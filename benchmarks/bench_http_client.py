@@ -0,0 +1,129 @@
+"""Connection reuse of the shared HTTPClient against a local stub server.
+
+Each simulated verification makes the four upstream calls of the web flow
+(geolocation lookup, role PUT, user GET, log POST). The benchmark compares
+module-level requests.* calls (a new connection per call) with the pooled
+client, over TLS when the openssl CLI is available.
+
+Run from the repository root:
+    python -m benchmarks.bench_http_client [verifications]
+"""
+import json
+import os
+import shutil
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from http_client import HTTPClient
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _reply(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        body = json.dumps({'id': '1', 'username': 'stub', 'country': 'Nowhere'}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_PUT = do_POST = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, context=None):
+        super().__init__(address, StubHandler)
+        self.context = context
+        self.connections = 0
+
+    def get_request(self):
+        sock, addr = super().get_request()
+        self.connections += 1
+        if self.context:
+            sock = self.context.wrap_socket(sock, server_side=True)
+        return sock, addr
+
+
+def make_certificate(directory):
+    if not shutil.which('openssl'):
+        return None
+    cert = os.path.join(directory, 'cert.pem')
+    key = os.path.join(directory, 'key.pem')
+    subprocess.run([
+        'openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+        '-subj', '/CN=localhost', '-addext', 'subjectAltName=DNS:localhost,IP:127.0.0.1',
+        '-keyout', key, '-out', cert
+    ], check=True, capture_output=True)
+    return cert, key
+
+
+def verification(call, base, verify):
+    call('GET', f'{base}/v1/?ip_address=127.0.0.1', verify=verify)
+    call('PUT', f'{base}/guilds/1/members/2/roles/3', verify=verify)
+    call('GET', f'{base}/users/2', verify=verify)
+    call('POST', f'{base}/channels/4/messages', json={'embeds': []}, verify=verify)
+
+
+def run(label, call, server, base, verify, count):
+    server.connections = 0
+    start = time.perf_counter()
+    for _ in range(count):
+        verification(call, base, verify)
+    elapsed = time.perf_counter() - start
+    print(f"   {label:<14} {elapsed / count * 1000:8.2f} ms/verification  "
+          f"{server.connections:6d} connections for {count * 4} requests")
+    return elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    tmpdir = tempfile.mkdtemp(prefix="vynk-bench-")
+    try:
+        bench(count, tmpdir)
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def bench(count, tmpdir):
+    certificate = make_certificate(tmpdir)
+    context = None
+    if certificate:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(*certificate)
+
+    server = StubServer(('127.0.0.1', 0), context)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    scheme = 'https' if context else 'http'
+    base = f"{scheme}://localhost:{server.server_address[1]}"
+    verify = certificate[0] if certificate else True
+
+    client = HTTPClient()
+
+    print(f"📊 {count} verifications against a local {scheme.upper()} stub (4 upstream calls each)")
+    fresh = run("requests.*", requests.request, server, base, verify, count)
+    pooled = run("HTTPClient", client.request, server, base, verify, count)
+    print(f"   saved per verification: {(fresh - pooled) / count * 1000:.2f} ms")
+    print(f"   client stats: {client.stats()}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
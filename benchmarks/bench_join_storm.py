@@ -0,0 +1,126 @@
+"""Simulated join storm: messages sent and event-loop time per welcome strategy.
+
+Replays N member joins into one guild with many text channels, scheduling
+each on_member_join as its own task the way discord.py dispatches events.
+Compares the old handler (linear channel scan + one message per member)
+with WelcomeDispatcher. Sends are faked and counted; the time Discord's
+per-channel rate limit (about 5 messages / 5s) would need to deliver them is
+estimated rather than waited out.
+
+Run from the repository root:
+    python -m benchmarks.bench_join_storm [joins] [channels]
+"""
+import asyncio
+import contextlib
+import io
+import sys
+import time
+
+import discord
+
+from welcome_dispatcher import WelcomeDispatcher
+
+# Joins delivered per gateway tick, and ticks per second
+JOINS_PER_TICK = 50
+TICKS_PER_SECOND = 10
+# Discord's per-channel send limit, messages per second
+CHANNEL_RATE = 1.0
+
+
+class FakeChannel:
+    def __init__(self, channel_id, name):
+        self.id = channel_id
+        self.name = name
+        self.sent = 0
+
+    async def send(self, content=None, **kwargs):
+        await asyncio.sleep(0)
+        self.sent += 1
+
+
+class FakeGuild:
+    def __init__(self, channels):
+        self.id = 1100000000000000000
+        self.name = "Storm Test"
+        self.text_channels = [FakeChannel(1300000000000000000 + i, f"channel-{i}") for i in range(channels - 1)]
+        # Worst case for the scan: the welcome channel is last
+        self.text_channels.append(FakeChannel(1300000000000000000 + channels, "general"))
+        self._by_id = {c.id: c for c in self.text_channels}
+
+    def get_channel(self, channel_id):
+        return self._by_id.get(channel_id)
+
+    @property
+    def sent(self):
+        return sum(c.sent for c in self.text_channels)
+
+
+class FakeMember:
+    def __init__(self, guild, user_id):
+        self.guild = guild
+        self.id = user_id
+        self.name = f"raider{user_id % 100000}"
+        self.mention = f"<@{user_id}>"
+
+    def __str__(self):
+        return self.name
+
+
+async def legacy_on_member_join(member):
+    # The handler as it was before WelcomeDispatcher, minus the per-join print
+    channel = discord.utils.get(member.guild.text_channels, name="verification")
+    if not channel:
+        channel = discord.utils.get(member.guild.text_channels, name="general")
+    if channel:
+        embed = discord.Embed(
+            title=f"Welcome {member.name}! 👋",
+            description="Please complete verification to access the server. Check the verification channel for instructions.",
+            color=0x3B82F6
+        )
+        await channel.send(f"{member.mention}", embed=embed)
+
+
+async def storm(handler, guild, joins):
+    tasks = []
+    for i in range(joins):
+        member = FakeMember(guild, 1200000000000000000 + i)
+        tasks.append(asyncio.ensure_future(handler(member)))
+        if (i + 1) % JOINS_PER_TICK == 0:
+            await asyncio.sleep(1 / TICKS_PER_SECOND)
+    await asyncio.gather(*tasks)
+
+
+async def run(guild, joins, handler, dispatcher=None):
+    cpu = time.process_time()
+    await storm(handler, guild, joins)
+    if dispatcher:
+        await dispatcher.stop()
+    return guild.sent, time.process_time() - cpu
+
+
+def report(name, joins, sent, cpu):
+    print(f"   {name:<18} {sent:6d} messages  {cpu * 1000:8.1f}ms loop CPU "
+          f"({cpu / joins * 1e6:6.1f}µs/join)  ~{sent / CHANNEL_RATE:6.0f}s to deliver under the rate limit")
+
+
+async def main():
+    joins = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    channels = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    print(f"📊 {joins} joins at {JOINS_PER_TICK * TICKS_PER_SECOND}/s into a guild with {channels} text channels")
+
+    report("per-member", joins, *await run(FakeGuild(channels), joins, legacy_on_member_join))
+
+    dispatcher = WelcomeDispatcher(interval=1.0)
+    dispatcher.start()
+    # The dispatcher logs each individual welcome and batch; keep the table readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = await run(FakeGuild(channels), joins, dispatcher.member_joined, dispatcher)
+    report("WelcomeDispatcher", joins, *result)
+    stats = dispatcher.stats()
+    print(f"   dispatcher: {stats['messages_sent'] - stats['batch_messages']} individual + "
+          f"{stats['batch_messages']} batched message(s) covering {stats['batched_members']} members, "
+          f"{stats['channel_lookups']} channel scan(s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,58 @@
+"""Compare verification log throughput: per-row commit vs. the write-behind LogWriter.
+
+Run from the repository root:
+    python -m benchmarks.bench_log_writer [rows]
+"""
+import os
+import sys
+import shutil
+import tempfile
+import time
+
+_tmpdir = tempfile.mkdtemp(prefix="vynk-bench-")
+os.environ.setdefault('VYNK_DB_PATH', os.path.join(_tmpdir, 'global.db'))
+
+from database import Database
+
+
+def bench_per_row(rows):
+    db = Database(os.path.join(_tmpdir, 'per_row.db'))
+    start = time.perf_counter()
+    for i in range(rows):
+        db.log_verification_now(str(i % 50), str(i), f"user{i}", "button", "success")
+    elapsed = time.perf_counter() - start
+    db.close()
+    return elapsed
+
+
+def bench_write_behind(rows):
+    db = Database(os.path.join(_tmpdir, 'write_behind.db'))
+    start = time.perf_counter()
+    for i in range(rows):
+        db.log_verification(str(i % 50), str(i), f"user{i}", "button", "success")
+    db.flush_logs()
+    elapsed = time.perf_counter() - start
+    written = db.conn.execute('SELECT COUNT(*) FROM verification_logs').fetchone()[0]
+    batches = db.log_writer.batches_written
+    db.close()
+    assert written == rows, f"expected {rows} rows, found {written}"
+    return elapsed, batches
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+    per_row = bench_per_row(rows)
+    write_behind, batches = bench_write_behind(rows)
+
+    print(f"📊 {rows} verification log rows")
+    print(f"   per-row commit : {per_row:8.3f}s  {rows / per_row:10.0f} rows/sec")
+    print(f"   write-behind   : {write_behind:8.3f}s  {rows / write_behind:10.0f} rows/sec  ({batches} transactions)")
+    print(f"   speedup        : {per_row / write_behind:8.1f}x")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        shutil.rmtree(_tmpdir, ignore_errors=True)
@@ -0,0 +1,114 @@
+"""Measure how long bot-side database calls block the asyncio event loop.
+
+A ticker task sleeps 5ms at a time and records how late it wakes up, which is
+what gateway heartbeats and other interactions experience. Simulated
+interactions read settings, write a log row, read stats and occasionally save
+settings, while a second process periodically holds the write lock the way the
+web dashboard does. The "blocking" run calls Database directly on the loop; the
+"async" run goes through AsyncDatabase.
+
+Run from the repository root:
+    python -m benchmarks.bench_loop_blocking [interactions]
+"""
+import asyncio
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+_tmpdir = tempfile.mkdtemp(prefix="vynk-bench-")
+os.environ.setdefault('VYNK_DB_PATH', os.path.join(_tmpdir, 'global.db'))
+
+from async_database import AsyncDatabase
+from database import Database
+
+TICK = 0.005
+# Longer than CPU scheduling noise, shorter than the other process's lock hold
+STALL = 0.025
+
+
+def lock_holder(path, stop):
+    """Take the write lock for 50ms every 200ms, like a busy dashboard process"""
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    while not stop.is_set():
+        conn.execute('BEGIN IMMEDIATE')
+        conn.execute("UPDATE settings_version SET version = version WHERE id = 1")
+        time.sleep(0.05)
+        conn.execute('COMMIT')
+        time.sleep(0.15)
+
+
+async def ticker(lags, done):
+    while not done.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+
+async def blocking_interaction(db, i):
+    settings = db.get_server_settings("1")
+    db.log_verification("1", str(i), "user", "button", "success")
+    db.get_server_stats("1")
+    if i % 10 == 0:
+        db.save_server_settings("1", settings['verification_channel'], settings['verified_role'], settings['log_channel'])
+
+
+async def async_interaction(adb, i):
+    settings = await adb.get_server_settings("1")
+    await adb.log_verification("1", str(i), "user", "button", "success")
+    await adb.get_server_stats("1")
+    if i % 10 == 0:
+        await adb.save_server_settings("1", settings['verification_channel'], settings['verified_role'], settings['log_channel'])
+
+
+async def run(label, interaction, target, count):
+    lags = []
+    done = asyncio.Event()
+    tick_task = asyncio.create_task(ticker(lags, done))
+
+    start = time.perf_counter()
+    for i in range(count):
+        await interaction(target, i)
+        # Interactions arrive spaced out rather than back to back
+        await asyncio.sleep(0.002)
+    elapsed = time.perf_counter() - start
+
+    done.set()
+    await tick_task
+
+    lags.sort()
+    stalls = sum(1 for lag in lags if lag > STALL)
+    p99 = lags[int(len(lags) * 0.99)] if lags else 0
+    print(f"   {label:<9} {elapsed:6.2f}s run  {stalls:4d} stalls >{STALL * 1000:.0f}ms  "
+          f"worst {max(lags, default=0) * 1000:6.1f}ms  p99 tick lag {p99 * 1000:6.2f}ms")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    path = os.path.join(_tmpdir, 'bench.db')
+    db = Database(path)
+    db.save_server_settings("1", "10", "20", "30")
+
+    stop = multiprocessing.Event()
+    holder = multiprocessing.Process(target=lock_holder, args=(path, stop))
+    holder.start()
+    try:
+        print(f"📊 {count} interactions with a concurrent writer holding the lock 25% of the time")
+        asyncio.run(run("blocking", blocking_interaction, db, count))
+        adb = AsyncDatabase(db)
+        asyncio.run(run("async", async_interaction, adb, count))
+        adb.close()
+    finally:
+        stop.set()
+        holder.join()
+        db.close()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        shutil.rmtree(_tmpdir, ignore_errors=True)
@@ -0,0 +1,103 @@
+"""Throughput and latency of role assignment: legacy queue+polling vs. RoleAssignmentDispatcher.
+
+A fake "bot loop" runs in a background thread and each assignment awaits a
+simulated Discord call. Assigner threads play the role of Flask request
+handlers, each requesting roles for distinct users.
+
+Run from the repository root:
+    python -m benchmarks.bench_role_dispatcher [requests_per_assigner] [discord_latency_ms]
+"""
+import asyncio
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from role_dispatcher import RoleAssignmentDispatcher
+
+DISCORD_LATENCY = 0.05
+
+
+async def fake_assign_role_task(guild_id, user_id):
+    await asyncio.sleep(DISCORD_LATENCY)
+    return {'success': True, 'message': f'Role assigned to {user_id}'}
+
+
+class LegacyAssigner:
+    """The previous working_bot_api design: one worker thread and a polled results dict"""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.task_queue = queue.Queue()
+        self.results = {}
+        threading.Thread(target=self._worker, daemon=True).start()
+
+    def _worker(self):
+        while True:
+            task_id, guild_id, user_id = self.task_queue.get()
+            future = asyncio.run_coroutine_threadsafe(fake_assign_role_task(guild_id, user_id), self.loop)
+            try:
+                self.results[task_id] = future.result(timeout=10)
+            except Exception as e:
+                self.results[task_id] = {'success': False, 'error': str(e)}
+
+    def assign(self, guild_id, user_id):
+        task_id = f"{guild_id}_{user_id}_{time.time()}"
+        self.task_queue.put((task_id, guild_id, user_id))
+        for _ in range(150):
+            if task_id in self.results:
+                return self.results.pop(task_id)
+            time.sleep(0.1)
+        return {'success': False, 'error': 'Operation timeout'}
+
+
+def run(assign, assigners, per_assigner):
+    latencies = []
+    lock = threading.Lock()
+
+    def assigner(index):
+        for i in range(per_assigner):
+            start = time.perf_counter()
+            result = assign("1", f"{index}-{i}")
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed if result.get('success') else float('inf'))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=assigners) as pool:
+        list(pool.map(assigner, range(assigners)))
+    total = time.perf_counter() - start
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return len(latencies) / total, p50 * 1000, p99 * 1000
+
+
+def main():
+    global DISCORD_LATENCY
+    per_assigner = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    if len(sys.argv) > 2:
+        DISCORD_LATENCY = float(sys.argv[2]) / 1000
+
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+
+    legacy = LegacyAssigner(loop)
+    dispatcher = RoleAssignmentDispatcher(fake_assign_role_task, max_concurrency=32, timeout=10)
+    dispatcher.attach(loop)
+
+    print(f"📊 Role assignment, {per_assigner} requests per assigner, {DISCORD_LATENCY * 1000:.0f}ms simulated Discord latency")
+    print(f"   {'assigners':>9}  {'impl':<10} {'req/s':>8} {'p50 ms':>9} {'p99 ms':>9}")
+    for assigners in (1, 10, 100):
+        for name, assign in (("legacy", legacy.assign), ("dispatcher", dispatcher.assign)):
+            throughput, p50, p99 = run(assign, assigners, per_assigner)
+            print(f"   {assigners:>9}  {name:<10} {throughput:8.1f} {p50:9.1f} {p99:9.1f}")
+    print(f"   dispatcher stats: {dispatcher.stats()}")
+
+    loop.call_soon_threadsafe(loop.stop)
+
+
+if __name__ == "__main__":
+    main()
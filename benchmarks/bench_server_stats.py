@@ -0,0 +1,101 @@
+"""Latency of DashboardDB.get_server_stats at growing verification_logs sizes.
+
+Compares the previous four unindexed COUNT(*) queries with the current
+implementation, which reads per-guild hourly rollup buckets.
+
+Run from the repository root:
+    python -m benchmarks.bench_server_stats [rows ...]      (default: 10000 1000000 10000000)
+"""
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+_tmpdir = tempfile.mkdtemp(prefix="vynk-bench-")
+os.environ.setdefault('VYNK_DB_PATH', os.path.join(_tmpdir, 'global.db'))
+
+from web_dashboard import DashboardDB
+
+GUILDS = 200
+REPEAT = 20
+
+
+def legacy_stats(conn, guild_id):
+    """The four-query implementation this benchmark replaces"""
+    cursor = conn.cursor()
+    cursor.execute('SELECT COUNT(*) FROM verification_logs WHERE guild_id = ?', (guild_id,))
+    cursor.fetchone()
+    cursor.execute('SELECT COUNT(*) FROM verification_logs WHERE guild_id = ? AND status = "success"', (guild_id,))
+    cursor.fetchone()
+    cursor.execute('SELECT COUNT(*) FROM verification_logs WHERE guild_id = ? AND status = "failed"', (guild_id,))
+    cursor.fetchone()
+    cursor.execute("SELECT COUNT(*) FROM verification_logs WHERE guild_id = ? AND timestamp > datetime('now', '-1 day')", (guild_id,))
+    cursor.fetchone()
+
+
+def populate(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE verification_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id TEXT, user_id TEXT, user_name TEXT,
+            method TEXT, status TEXT, timestamp TEXT
+        )
+    ''')
+    start = datetime.now() - timedelta(days=90)
+    step = timedelta(days=90) / rows
+
+    def generate():
+        for i in range(rows):
+            yield (str(i % GUILDS), str(i), f"user{i}", "button",
+                   "failed" if i % 7 == 0 else "success", (start + step * i).isoformat())
+
+    with conn:
+        conn.executemany('''
+            INSERT INTO verification_logs (guild_id, user_id, user_name, method, status, timestamp)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', generate())
+    conn.close()
+
+
+def timed(fn, *args):
+    samples = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples[len(samples) // 2] * 1000
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 1_000_000, 10_000_000]
+
+    print(f"📊 get_server_stats median latency ({GUILDS} guilds, {REPEAT} runs)")
+    print(f"   {'rows':>12}  {'legacy (ms)':>12}  {'rollup (ms)':>12}")
+    for rows in sizes:
+        path = os.path.join(_tmpdir, f"stats_{rows}.db")
+        populate(path, rows)
+
+        conn = sqlite3.connect(path)
+        legacy = timed(legacy_stats, conn, "7")
+        conn.close()
+
+        # DashboardDB creates the indexes and backfills the rollups on startup
+        db = DashboardDB(path)
+        current = timed(db.get_server_stats, "7")
+        db.read_conn.close()
+        db.conn.close()
+
+        print(f"   {rows:>12}  {legacy:>12.2f}  {current:>12.2f}")
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        shutil.rmtree(_tmpdir, ignore_errors=True)
@@ -0,0 +1,302 @@
+"""Regression benchmark for the bot's interaction and event handlers.
+
+Fires thousands of concurrent fake interactions through the real
+VerificationView.verify_button, /setup-verification and /server-stats
+callbacks, plus on_member_join. The bot runs without a gateway against a
+temporary database, and REST calls go to a counting fake with injectable
+latency. Each handler reports:
+- latency percentiles;
+- event-loop time charged to each interaction;
+- total loop busy time and the longest single loop step;
+- cyclic-GC pauses, which show up as long loop steps;
+- heartbeat lag;
+- DB and REST calls per interaction.
+
+Work the handlers defer (log and welcome dispatchers) is reported as
+background. Results go to a JSON file, and --compare checks a run against an
+earlier one.
+
+Run from the repository root:
+    python -m benchmarks.bot_harness [--interactions 2000] [--concurrency 500]
+    python -m benchmarks.bot_harness --output after.json --compare before.json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+
+from . import instrument
+from .fakes import FakeREST
+from .instrument import GCMonitor, LoopProfiler, Usage, count_db_calls, current
+from .scenarios import SCENARIOS, Environment
+
+TICK = 0.005
+# Longer than scheduling noise; a gateway heartbeat this late is worth knowing about
+STALL = 0.025
+# Changes smaller than these are noise whatever their percentage
+MIN_DELTA_MS = {'p95_ms': 1.0, 'loop_ms_per_interaction': 0.02}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bot_harness", description=__doc__.split('\n')[0])
+    parser.add_argument('--handlers', default=','.join(SCENARIOS), help="comma-separated subset of: " + ', '.join(SCENARIOS))
+    parser.add_argument('--interactions', type=int, default=2000, help="invocations per handler")
+    parser.add_argument('--concurrency', type=int, default=500, help="invocations in flight at once")
+    parser.add_argument('--rest-latency', type=float, default=30, help="fake Discord REST latency in ms")
+    parser.add_argument('--jitter', type=float, default=0.2, help="± fraction applied to REST latency")
+    parser.add_argument('--channels', type=int, default=50, help="text channels in the fake guild")
+    parser.add_argument('--output', help="results file (default: bot-harness-<timestamp>.json)")
+    parser.add_argument('--compare', help="earlier results file to compare against")
+    parser.add_argument('--max-regression', type=float, default=0.25,
+                        help="fail --compare when p95 latency or loop time per interaction grows by more than this fraction")
+    args = parser.parse_args(argv)
+
+    args.handlers = [name.strip() for name in args.handlers.split(',') if name.strip()]
+    unknown = [name for name in args.handlers if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown handler(s): {', '.join(unknown)}")
+    return args
+
+
+def load_bot(db_dir):
+    """Import bot.py against a throwaway database"""
+    # Never benchmark against a real database: database.py reads this at import time
+    os.environ['VYNK_DB_PATH'] = os.path.join(db_dir, 'vynk.db')
+    with contextlib.redirect_stdout(io.StringIO()):
+        import bot
+        from database import async_db
+    count_db_calls(async_db)
+    return bot
+
+
+def ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)]
+
+
+async def heartbeat(lags, done):
+    # Charged to its own Usage so it doesn't count as background work
+    current.set(Usage())
+    while not done.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append((start, time.perf_counter() - start - TICK))
+
+
+async def run_phase(env, scenario, count, concurrency, profiler, gc_monitor):
+    scenario.prepare(env, count)
+    instrument.BACKGROUND.__init__()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    usages = []
+    errors = Counter()
+
+    async def one(i):
+        await gate.wait()
+        async with semaphore:
+            owner = Usage()
+            current.set(owner)
+            start = time.perf_counter()
+            try:
+                await scenario.invoke(env, i)
+            except Exception as e:
+                errors[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - start)
+            usages.append(owner)
+
+    lags = []
+    done = asyncio.Event()
+    ticker = asyncio.create_task(heartbeat(lags, done))
+
+    # Park every task at the gate first so creating them isn't measured
+    gate = asyncio.Event()
+    tasks = [asyncio.ensure_future(one(i)) for i in range(count)]
+    await asyncio.sleep(0)
+    profiler.reset()
+    gc_monitor.reset()
+    gate.set()
+    wall_start = time.perf_counter()
+    await asyncio.gather(*tasks)
+    wall = time.perf_counter() - wall_start
+    busy, longest = profiler.busy, profiler.longest
+    gc_pause, gc_longest = gc_monitor.pause, gc_monitor.longest
+
+    # Deferred work (queued log embeds, batched welcomes) is charged to BACKGROUND
+    async def deferred():
+        current.set(instrument.BACKGROUND)
+        await env.client.log_dispatcher.flush()
+        await env.client.welcomes.flush()
+
+    await asyncio.create_task(deferred())
+    done.set()
+    await ticker
+    lags = [lag for start, lag in lags if start >= wall_start]
+
+    latencies.sort()
+    loop_times = sorted(u.loop_time for u in usages)
+    lags.sort()
+    background = instrument.BACKGROUND
+    db_ops, rest_routes = Counter(), Counter()
+    for u in usages:
+        db_ops.update(u.db_ops)
+        rest_routes.update(u.rest_routes)
+
+    return {
+        'interactions': count,
+        'errors': sum(errors.values()),
+        'error_kinds': dict(errors),
+        'concurrency': concurrency,
+        'wall_s': round(wall, 3),
+        'throughput_per_s': round(count / wall, 1) if wall else 0.0,
+        'p50_ms': ms(percentile(latencies, 0.50)),
+        'p95_ms': ms(percentile(latencies, 0.95)),
+        'p99_ms': ms(percentile(latencies, 0.99)),
+        'max_ms': ms(latencies[-1] if latencies else 0),
+        'loop_ms_per_interaction': ms(statistics.fmean(loop_times)) if loop_times else 0.0,
+        'loop_ms_p99': ms(percentile(loop_times, 0.99)),
+        'loop_busy_ms': ms(busy),
+        'longest_step_ms': ms(longest),
+        'gc_pause_ms': ms(gc_pause),
+        'gc_longest_ms': ms(gc_longest),
+        'heartbeat_worst_lag_ms': ms(lags[-1] if lags else 0),
+        'heartbeat_stalls': sum(1 for lag in lags if lag > STALL),
+        'db_calls_per_interaction': round(sum(u.db_calls for u in usages) / count, 3) if count else 0.0,
+        'rest_calls_per_interaction': round(sum(u.rest_calls for u in usages) / count, 3) if count else 0.0,
+        'db_ops': dict(db_ops),
+        'rest_routes': dict(rest_routes),
+        'background': {
+            'loop_ms': ms(background.loop_time),
+            'db_calls': background.db_calls,
+            'rest_calls': background.rest_calls,
+            'rest_routes': dict(background.rest_routes)
+        }
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, max_regression, meta):
+    """Print per-handler deltas; returns the regressions beyond max_regression"""
+    before = {r['handler']: r for r in baseline['results']}
+    regressions = []
+    print(f"\n🔍 Compared with {baseline['meta'].get('timestamp')} ({baseline['meta'].get('git_revision') or 'unknown revision'})")
+    differing = [key for key in ('interactions', 'concurrency', 'rest_latency_ms', 'channels')
+                 if baseline['meta'].get(key) != meta[key]]
+    if differing:
+        print(f"   ⚠️ Settings differ from the baseline ({', '.join(differing)}); deltas are not like for like")
+    for result in results:
+        old = before.get(result['handler'])
+        if not old:
+            continue
+        changes = {}
+        regressed = False
+        for metric, floor in MIN_DELTA_MS.items():
+            changes[metric] = (result[metric] - old[metric]) / old[metric] if old[metric] else 0.0
+            if changes[metric] > max_regression and result[metric] - old[metric] > floor:
+                regressed = True
+        if regressed:
+            regressions.append(result)
+        print(f"   {'❌' if regressed else '✅'} {result['handler']:<18} "
+              f"p95 {old['p95_ms']:8.2f} → {result['p95_ms']:8.2f}ms ({changes['p95_ms']:+.0%})  "
+              f"loop {old['loop_ms_per_interaction']:6.3f} → {result['loop_ms_per_interaction']:6.3f}ms/interaction "
+              f"({changes['loop_ms_per_interaction']:+.0%})")
+    return regressions
+
+
+async def run_all(args, bot_module):
+    rest = FakeREST(latency=args.rest_latency / 1000, jitter=args.jitter)
+    env = Environment(bot_module, rest, channels=args.channels)
+    env.client.log_dispatcher.start()
+    env.client.welcomes.start()
+    # Dispatcher tasks copied the context above and stay BACKGROUND; the harness gets its own Usage
+    current.set(Usage())
+    await env.configure()
+
+    profiler = LoopProfiler().install()
+    gc_monitor = GCMonitor().install()
+    results = []
+    try:
+        for name in args.handlers:
+            # Handlers log per member; keep the table readable
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = await run_phase(env, SCENARIOS[name], args.interactions, args.concurrency, profiler, gc_monitor)
+            result = {'handler': name, **result}
+            results.append(result)
+            print(f"   {name:<18} {result['p50_ms']:8.2f} {result['p95_ms']:8.2f} {result['p99_ms']:8.2f}ms "
+                  f"{result['loop_ms_per_interaction']:8.3f}ms {result['longest_step_ms']:7.2f}ms {result['gc_longest_ms']:7.2f}ms "
+                  f"{result['heartbeat_worst_lag_ms']:7.2f}ms {result['db_calls_per_interaction']:6.2f} "
+                  f"{result['rest_calls_per_interaction']:8.3f} {result['errors']:6d}")
+    finally:
+        profiler.uninstall()
+        gc_monitor.uninstall()
+        with contextlib.redirect_stdout(io.StringIO()):
+            await env.client.log_dispatcher.stop()
+            await env.client.welcomes.stop()
+    return results
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="vynk-bot-harness-") as db_dir:
+        return benchmark(args, db_dir)
+
+
+def benchmark(args, db_dir):
+    bot_module = load_bot(db_dir)
+
+    print(f"📊 {args.interactions} invocations per handler, {args.concurrency} in flight; "
+          f"fake REST {args.rest_latency:g}ms (±{args.jitter:.0%})")
+    print(f"   {'handler':<18} {'p50':>8} {'p95':>8} {'p99':>10} {'loop/int':>10} {'longest':>9} {'gc':>9} "
+          f"{'hb lag':>9} {'db/int':>6} {'rest/int':>8} {'errors':>6}")
+    results = asyncio.run(run_all(args, bot_module))
+    sys.modules['database'].db.close()
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'cpu_count': os.cpu_count(),
+            'interactions': args.interactions,
+            'concurrency': args.concurrency,
+            'rest_latency_ms': args.rest_latency,
+            'jitter': args.jitter,
+            'channels': args.channels
+        },
+        'results': results
+    }
+    output = args.output or f"bot-harness-{datetime.now():%Y%m%d-%H%M%S}.json"
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.max_regression, report['meta']):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""Minimal stand-ins for the discord.py objects the bot's handlers touch.
+
+Only the attributes and coroutines the handlers use are implemented. Every
+call that would hit Discord's REST API goes through FakeREST, which counts it
+against the current interaction and sleeps an injectable latency.
+"""
+import asyncio
+import itertools
+import random
+
+from .instrument import usage
+
+_ids = itertools.count(1300000000000000000)
+
+
+def snowflake():
+    return next(_ids)
+
+
+class FakeREST:
+    def __init__(self, latency=0.03, jitter=0.2):
+        self.latency = latency
+        self.jitter = jitter
+
+    async def call(self, route):
+        owner = usage()
+        owner.rest_calls += 1
+        owner.rest_routes[route] += 1
+        if self.latency > 0:
+            await asyncio.sleep(self.latency * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+
+class FakePermissions:
+    def __init__(self, administrator=False):
+        self.administrator = administrator
+
+
+class FakeRole:
+    def __init__(self, guild, name):
+        self.id = snowflake()
+        self.guild = guild
+        self.name = name
+
+    @property
+    def mention(self):
+        return f"<@&{self.id}>"
+
+
+class FakeTextChannel:
+    def __init__(self, guild, name):
+        self.id = snowflake()
+        self.guild = guild
+        self.name = name
+
+    @property
+    def mention(self):
+        return f"<#{self.id}>"
+
+    async def send(self, content=None, **kwargs):
+        await self.guild.rest.call('POST /channels/{id}/messages')
+
+
+class FakeMember:
+    def __init__(self, guild, name, roles=(), administrator=False):
+        self.id = snowflake()
+        self.guild = guild
+        self.name = name
+        self.roles = list(roles)
+        self.guild_permissions = FakePermissions(administrator)
+
+    @property
+    def mention(self):
+        return f"<@{self.id}>"
+
+    def __str__(self):
+        return self.name
+
+    async def add_roles(self, *roles, reason=None):
+        for role in roles:
+            await self.guild.rest.call('PUT /guilds/{id}/members/{id}/roles/{id}')
+            self.roles.append(role)
+
+
+class FakeGuild:
+    def __init__(self, rest, name="Harness Guild", channels=50):
+        self.id = snowflake()
+        self.name = name
+        self.rest = rest
+        self.text_channels = [FakeTextChannel(self, f"channel-{i}") for i in range(channels)]
+        self.verification_channel = FakeTextChannel(self, "verification")
+        self.log_channel = FakeTextChannel(self, "verification-logs")
+        self.text_channels += [self.verification_channel, self.log_channel]
+        self.verified_role = FakeRole(self, "Verified")
+        self._roles = {self.verified_role.id: self.verified_role}
+        self._channels = {c.id: c for c in self.text_channels}
+
+    def get_role(self, role_id):
+        return self._roles.get(role_id)
+
+    def get_channel(self, channel_id):
+        return self._channels.get(channel_id)
+
+
+class FakeResponse:
+    def __init__(self, rest):
+        self.rest = rest
+        self._done = False
+
+    def is_done(self):
+        return self._done
+
+    async def send_message(self, content=None, **kwargs):
+        self._done = True
+        await self.rest.call('POST /interactions/{id}/{token}/callback')
+
+    async def send_modal(self, modal):
+        self._done = True
+        await self.rest.call('POST /interactions/{id}/{token}/callback')
+
+    async def defer(self, **kwargs):
+        self._done = True
+        await self.rest.call('POST /interactions/{id}/{token}/callback')
+
+
+class FakeInteraction:
+    def __init__(self, client, guild, user):
+        self.id = snowflake()
+        self.client = client
+        self.guild = guild
+        self.user = user
+        self.response = FakeResponse(guild.rest)
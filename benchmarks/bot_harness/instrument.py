@@ -0,0 +1,121 @@
+"""Per-interaction accounting of event-loop time, DB calls and REST calls.
+
+Each simulated interaction runs in its own task with a Usage set in the
+`current` context variable. The loop profiler times every callback the event
+loop runs and charges it to the Usage of the context it ran in; DB and fake
+REST calls are counted the same way. Work outside any interaction (log and
+welcome dispatchers, the DB thread handing results back) lands in BACKGROUND.
+"""
+import asyncio
+import contextvars
+import gc
+import time
+from collections import Counter
+
+current = contextvars.ContextVar('bot_harness_usage', default=None)
+
+
+class Usage:
+    __slots__ = ('loop_time', 'db_calls', 'rest_calls', 'db_ops', 'rest_routes')
+
+    def __init__(self):
+        self.loop_time = 0.0
+        self.db_calls = 0
+        self.rest_calls = 0
+        self.db_ops = Counter()
+        self.rest_routes = Counter()
+
+
+BACKGROUND = Usage()
+
+
+def usage():
+    return current.get() or BACKGROUND
+
+
+class LoopProfiler:
+    """Times every event-loop callback by wrapping asyncio's Handle._run"""
+
+    def __init__(self):
+        self.busy = 0.0
+        self.longest = 0.0
+        self.callbacks = 0
+        self._original = None
+
+    def install(self):
+        original = self._original = asyncio.events.Handle._run
+        profiler = self
+
+        def _run(handle):
+            start = time.perf_counter()
+            try:
+                original(handle)
+            finally:
+                elapsed = time.perf_counter() - start
+                profiler.busy += elapsed
+                profiler.callbacks += 1
+                if elapsed > profiler.longest:
+                    profiler.longest = elapsed
+                # The Task's own context, so a Usage set inside the interaction is visible here
+                owner = handle._context.get(current) if handle._context is not None else None
+                (owner or BACKGROUND).loop_time += elapsed
+
+        asyncio.events.Handle._run = _run
+        return self
+
+    def uninstall(self):
+        if self._original:
+            asyncio.events.Handle._run = self._original
+            self._original = None
+
+    def reset(self):
+        self.busy = 0.0
+        self.longest = 0.0
+        self.callbacks = 0
+
+
+class GCMonitor:
+    """Total and longest cyclic-GC pause; these land inside whichever loop step triggered them"""
+
+    def __init__(self):
+        self.pause = 0.0
+        self.longest = 0.0
+        self.collections = 0
+        self._started = None
+
+    def install(self):
+        gc.callbacks.append(self._callback)
+        return self
+
+    def uninstall(self):
+        if self._callback in gc.callbacks:
+            gc.callbacks.remove(self._callback)
+
+    def reset(self):
+        self.pause = 0.0
+        self.longest = 0.0
+        self.collections = 0
+
+    def _callback(self, phase, info):
+        if phase == 'start':
+            self._started = time.perf_counter()
+        elif self._started is not None:
+            elapsed = time.perf_counter() - self._started
+            self._started = None
+            self.pause += elapsed
+            self.collections += 1
+            self.longest = max(self.longest, elapsed)
+
+
+def count_db_calls(async_db):
+    """Count every AsyncDatabase call against the interaction that awaited it"""
+    original = async_db.run
+
+    async def run(func, *args, **kwargs):
+        owner = usage()
+        owner.db_calls += 1
+        owner.db_ops[getattr(func, '__name__', repr(func))] += 1
+        return await original(func, *args, **kwargs)
+
+    async_db.run = run
+    return original
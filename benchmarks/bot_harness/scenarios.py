@@ -0,0 +1,87 @@
+"""Drivers that feed fake interactions and events through the bot's real handlers."""
+from .fakes import FakeGuild, FakeInteraction, FakeMember
+
+
+class Environment:
+    """One fake guild wired to the real bot instance, configured for button verification"""
+
+    def __init__(self, bot_module, rest, channels=50):
+        self.bot_module = bot_module
+        self.client = bot_module.bot
+        self.guild = FakeGuild(rest, channels=channels)
+        self.admin = FakeMember(self.guild, "admin", administrator=True)
+        # The log dispatcher resolves the log channel through the client
+        self.client.get_channel = self.guild.get_channel
+
+    async def configure(self):
+        from database import async_db
+        await async_db.save_server_settings(
+            str(self.guild.id),
+            str(self.guild.verification_channel.id),
+            str(self.guild.verified_role.id),
+            str(self.guild.log_channel.id),
+            'button'
+        )
+
+    def interaction(self, user):
+        return FakeInteraction(self.client, self.guild, user)
+
+
+class Scenario:
+    name = None
+
+    def prepare(self, env, count):
+        """Untimed setup for `count` invocations; runs on the loop before the phase starts"""
+
+    async def invoke(self, env, i):
+        raise NotImplementedError
+
+
+class VerifyButton(Scenario):
+    """VerificationView.verify_button; every tenth member is already verified"""
+
+    name = 'verify_button'
+
+    def prepare(self, env, count):
+        self.view = env.bot_module.VerificationView(str(env.guild.id))
+        role = env.guild.verified_role
+        self.members = [FakeMember(env.guild, f"member{i}", roles=[role] if i % 10 == 0 else [])
+                        for i in range(count)]
+
+    async def invoke(self, env, i):
+        await self.view.verify_button.callback(env.interaction(self.members[i]))
+
+
+class SetupVerification(Scenario):
+    name = 'setup_verification'
+
+    async def invoke(self, env, i):
+        guild = env.guild
+        await env.bot_module.setup_verification.callback(
+            env.interaction(env.admin), guild.verification_channel, guild.verified_role, guild.log_channel
+        )
+
+
+class ServerStats(Scenario):
+    name = 'server_stats'
+
+    def prepare(self, env, count):
+        self.member = FakeMember(env.guild, "stats-viewer")
+
+    async def invoke(self, env, i):
+        await env.bot_module.server_stats.callback(env.interaction(self.member))
+
+
+class MemberJoin(Scenario):
+    """on_member_join for a burst of new members, so flood batching kicks in"""
+
+    name = 'on_member_join'
+
+    def prepare(self, env, count):
+        self.members = [FakeMember(env.guild, f"joiner{i}") for i in range(count)]
+
+    async def invoke(self, env, i):
+        await env.bot_module.on_member_join(self.members[i])
+
+
+SCENARIOS = {s.name: s for s in (VerifyButton(), SetupVerification(), ServerStats(), MemberJoin())}
@@ -0,0 +1,202 @@
+"""Load benchmark for the web dashboard's verification and stats endpoints.
+
+Drives the real Flask app against a temporary, seeded database, in-process
+through the test client and/or over HTTP through waitress. Discord and
+Abstract API are replaced by a local fake server with injectable latency.
+Reports p50/p95/p99 latency and throughput per endpoint and writes them to a
+JSON file; --compare checks a run against an earlier file.
+
+Only the timed request counts towards latency. api_verify's portal visit and
+geolocation poll are untimed but are included in its throughput.
+assign_role makes three Discord calls, so DiscordREST's global rate limit
+(50/s) caps it.
+
+Run from the repository root:
+    python -m benchmarks.web_load [--mode both] [--requests 300] [--concurrency 8]
+    python -m benchmarks.web_load --output after.json --compare before.json
+"""
+import argparse
+import concurrent.futures
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+from .fakes import FakeUpstreams
+from .runner import HTTPClient, InProcessClient, WaitressServer, run_scenario
+from .scenarios import GUILD_ID, LOG_CHANNEL, SCENARIOS, VERIFICATION_CHANNEL, VERIFIED_ROLE
+
+MODES = ('inprocess', 'waitress')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.web_load", description=__doc__.split('\n')[0])
+    parser.add_argument('--mode', choices=MODES + ('both',), default='both')
+    parser.add_argument('--endpoints', default=','.join(SCENARIOS), help="comma-separated subset of: " + ', '.join(SCENARIOS))
+    parser.add_argument('--requests', type=int, default=300, help="timed requests per endpoint and mode")
+    parser.add_argument('--concurrency', type=int, default=8, help="client threads")
+    parser.add_argument('--warmup', type=int, default=2, help="untimed requests per client thread")
+    parser.add_argument('--web-threads', type=int, default=int(os.getenv('VYNK_WEB_THREADS', 16)), help="waitress worker threads")
+    parser.add_argument('--discord-latency', type=float, default=50, help="fake Discord latency in ms")
+    parser.add_argument('--abstract-latency', type=float, default=100, help="fake Abstract API latency in ms")
+    parser.add_argument('--jitter', type=float, default=0.2, help="± fraction applied to upstream latencies")
+    parser.add_argument('--seed-logs', type=int, default=20000, help="historical verification logs in the test guild")
+    parser.add_argument('--output', help="results file (default: web-load-<timestamp>.json)")
+    parser.add_argument('--compare', help="earlier results file to compare against")
+    parser.add_argument('--max-regression', type=float, default=0.25,
+                        help="fail --compare when p95 grows or throughput drops by more than this fraction")
+    args = parser.parse_args(argv)
+
+    args.endpoints = [name.strip() for name in args.endpoints.split(',') if name.strip()]
+    unknown = [name for name in args.endpoints if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown endpoint(s): {', '.join(unknown)}")
+    args.modes = MODES if args.mode == 'both' else (args.mode,)
+    return args
+
+
+def load_app(upstreams, seed_logs, db_dir):
+    """Import the dashboard against a throwaway database pointed at the fake upstreams"""
+    # Never benchmark against a real database: both modules read this at import time
+    os.environ['VYNK_DB_PATH'] = os.path.join(db_dir, 'vynk.db')
+    import web_dashboard
+    from database import db as main_db
+    from rollups import insert_verification_logs
+
+    web_dashboard.discord_rest.base_url = upstreams.discord_base_url
+    web_dashboard.ABSTRACT_API_URL = upstreams.abstract_url
+    web_dashboard.ABSTRACT_API_KEY = 'web-load-benchmark'
+
+    main_db.save_server_settings(GUILD_ID, VERIFICATION_CHANNEL, VERIFIED_ROLE, LOG_CHANNEL, 'web')
+    rng = random.Random(42)
+    now = datetime.now()
+    rows = [
+        (GUILD_ID, str(1000 + rng.randrange(seed_logs or 1)), f"Seed User {i}",
+         rng.choice(('button', 'captcha', 'web')), 'success' if rng.random() < 0.9 else 'failed',
+         (now - timedelta(seconds=rng.randrange(30 * 86400))).isoformat())
+        for i in range(seed_logs)
+    ]
+    with web_dashboard.db.conn:
+        insert_verification_logs(web_dashboard.db.conn, rows)
+    return web_dashboard, main_db
+
+
+def drain_geolocation(web_dashboard):
+    """Wait for portal visits' background lookups so they're counted against the right endpoint"""
+    resolver = web_dashboard.geolocation_resolver
+    with resolver._lock:
+        futures = [future for future, _, _ in resolver._pending.values()]
+    concurrent.futures.wait(futures, timeout=60)
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, max_regression):
+    """Print per-endpoint deltas; returns the regressions beyond max_regression"""
+    before = {(r['endpoint'], r['mode']): r for r in baseline['results']}
+    regressions = []
+    print(f"\n🔍 Compared with {baseline['meta'].get('timestamp')} ({baseline['meta'].get('git_revision') or 'unknown revision'})")
+    for result in results:
+        old = before.get((result['endpoint'], result['mode']))
+        if not old:
+            continue
+        p95 = (result['p95_ms'] - old['p95_ms']) / old['p95_ms'] if old['p95_ms'] else 0.0
+        rps = (result['throughput_rps'] - old['throughput_rps']) / old['throughput_rps'] if old['throughput_rps'] else 0.0
+        regressed = p95 > max_regression or rps < -max_regression
+        if regressed:
+            regressions.append(result)
+        print(f"   {'❌' if regressed else '✅'} {result['endpoint']:<14} {result['mode']:<9} "
+              f"p95 {old['p95_ms']:8.2f} → {result['p95_ms']:8.2f}ms ({p95:+.0%})  "
+              f"throughput {old['throughput_rps']:7.1f} → {result['throughput_rps']:7.1f}/s ({rps:+.0%})")
+    return regressions
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="vynk-web-load-") as db_dir:
+        return benchmark(args, db_dir)
+
+
+def benchmark(args, db_dir):
+    upstreams = FakeUpstreams(
+        discord_latency=args.discord_latency / 1000,
+        abstract_latency=args.abstract_latency / 1000,
+        jitter=args.jitter
+    ).start()
+    web_dashboard, main_db = load_app(upstreams, args.seed_logs, db_dir)
+    app = web_dashboard.app
+
+    print(f"📊 {args.requests} requests per endpoint, {args.concurrency} client threads; "
+          f"fake Discord {args.discord_latency:g}ms, Abstract {args.abstract_latency:g}ms (±{args.jitter:.0%})")
+    print(f"   {'endpoint':<14} {'mode':<9} {'req/s':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'errors':>7}")
+
+    results = []
+    first_id = 0
+    for mode in args.modes:
+        server = WaitressServer(app, args.web_threads).start() if mode == 'waitress' else None
+        make_client = (lambda: HTTPClient(server.url)) if server else (lambda: InProcessClient(app))
+        try:
+            for name in args.endpoints:
+                before = upstreams.snapshot()
+                # The app logs every verification; keep the table readable
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result = run_scenario(SCENARIOS[name], make_client, args.requests, args.concurrency,
+                                          args.warmup, first_id)
+                    drain_geolocation(web_dashboard)
+                    main_db.flush_logs()
+                first_id += args.requests
+                after = upstreams.snapshot()
+                result = {'endpoint': name, 'mode': mode, **result,
+                          'upstream_calls': {route: after[route] - before.get(route, 0) for route in after if after[route] != before.get(route, 0)}}
+                results.append(result)
+                print(f"   {name:<14} {mode:<9} {result['throughput_rps']:8.1f} {result['p50_ms']:7.2f}ms "
+                      f"{result['p95_ms']:7.2f}ms {result['p99_ms']:7.2f}ms {result['errors']:7d}")
+        finally:
+            if server:
+                server.stop()
+    upstreams.stop()
+    main_db.close()
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'cpu_count': os.cpu_count(),
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'warmup': args.warmup,
+            'web_threads': args.web_threads,
+            'discord_latency_ms': args.discord_latency,
+            'abstract_latency_ms': args.abstract_latency,
+            'jitter': args.jitter,
+            'seed_logs': args.seed_logs
+        },
+        'results': results
+    }
+    output = args.output or f"web-load-{datetime.now():%Y%m%d-%H%M%S}.json"
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.max_regression):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
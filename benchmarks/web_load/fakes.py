@@ -0,0 +1,116 @@
+"""Local stand-ins for Discord's REST API and Abstract's IP geolocation API.
+
+One threaded HTTP server answers both, sleeping an injectable latency (plus
+uniform jitter) per upstream before replying, and counts requests per route.
+"""
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DISCORD_PREFIX = '/api/v10'
+ABSTRACT_PREFIX = '/abstract/'
+
+_ROLE_PUT = re.compile(r'^/api/v10/guilds/\d+/members/\d+/roles/\d+$')
+_USER_GET = re.compile(r'^/api/v10/users/(\d+)$')
+_MESSAGE_POST = re.compile(r'^/api/v10/channels/\d+/messages$')
+
+
+class FakeUpstreamHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _handle(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+
+        path = self.path.split('?', 1)[0]
+        if path.startswith(ABSTRACT_PREFIX):
+            route, latency = 'abstract geolocation', self.server.abstract_latency
+            status, body = 200, {
+                'country': 'Testland',
+                'region': 'Bench',
+                'city': 'Loadville',
+                'isp': 'Fake ISP',
+                'security': {'is_vpn': False},
+                'connection': {'connection_type': 'Corporate'}
+            }
+        elif self.command == 'PUT' and _ROLE_PUT.match(path):
+            route, latency = 'discord PUT role', self.server.discord_latency
+            status, body = 204, None
+        elif self.command == 'GET' and _USER_GET.match(path):
+            route, latency = 'discord GET user', self.server.discord_latency
+            status, body = 200, {'id': _USER_GET.match(path).group(1), 'username': 'benchuser', 'discriminator': '0'}
+        elif self.command == 'POST' and _MESSAGE_POST.match(path):
+            route, latency = 'discord POST message', self.server.discord_latency
+            status, body = 200, {'id': str(random.getrandbits(60))}
+        else:
+            route, latency = 'unknown', 0
+            status, body = 404, {'message': 'Unknown route'}
+
+        self.server.record(route)
+        self.server.wait(latency)
+
+        payload = json.dumps(body).encode() if body is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_PUT = do_POST = _handle
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeUpstreams(ThreadingHTTPServer):
+    """Fake Discord + Abstract server; latencies are in seconds"""
+
+    daemon_threads = True
+
+    def __init__(self, discord_latency=0.05, abstract_latency=0.1, jitter=0.2):
+        super().__init__(('127.0.0.1', 0), FakeUpstreamHandler)
+        self.discord_latency = discord_latency
+        self.abstract_latency = abstract_latency
+        self.jitter = jitter
+        self._lock = threading.Lock()
+        self.requests = Counter()
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    @property
+    def discord_base_url(self):
+        return self.url + DISCORD_PREFIX
+
+    @property
+    def abstract_url(self):
+        return self.url + ABSTRACT_PREFIX
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-upstreams", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def record(self, route):
+        with self._lock:
+            self.requests[route] += 1
+
+    def wait(self, latency):
+        if latency > 0:
+            time.sleep(latency * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.requests)
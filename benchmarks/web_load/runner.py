@@ -0,0 +1,142 @@
+"""Load driver: N requests from C client threads, in-process or over HTTP."""
+import itertools
+import statistics
+import threading
+import time
+from collections import Counter
+
+import requests
+
+
+class InProcessClient:
+    """Flask test client; one per thread"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, headers=None, json=None):
+        response = self.client.open(path, method=method, headers=headers, json=json)
+        return response.status_code, response.get_data()
+
+
+class HTTPClient:
+    """Keep-alive requests session against a running server; one per thread"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.session = requests.Session()
+
+    def request(self, method, path, headers=None, json=None):
+        response = self.session.request(method, self.base_url + path, headers=headers, json=json, timeout=60)
+        return response.status_code, response.content
+
+
+class WaitressServer:
+    def __init__(self, app, threads):
+        from waitress import create_server
+        # Scenarios give each visitor its own IP via X-Forwarded-For, which waitress
+        # strips unless the client is a trusted proxy
+        self.server = create_server(app, host='127.0.0.1', port=0, threads=threads,
+                                    trusted_proxy='127.0.0.1', trusted_proxy_headers={'x-forwarded-for'})
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._serve, name="web-load-waitress", daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.effective_port}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping.set()
+        self._thread.join()
+
+    def _serve(self):
+        # This thread owns the sockets: they are only closed once its poll loop has
+        # stopped, never from another thread while select() is still using them
+        adj = self.server.adj
+        while not self._stopping.is_set():
+            self.server.asyncore.loop(timeout=0.05, map=self.server._map, use_poll=adj.asyncore_use_poll, count=1)
+        self.server.task_dispatcher.shutdown()
+        for channel in list(self.server._map.values()):
+            if channel is not self.server and channel is not self.server.trigger:
+                channel.close()
+        self.server.close()
+
+
+def percentiles(samples):
+    if len(samples) < 2:
+        value = samples[0] if samples else 0.0
+        return value, value, value
+    cuts = statistics.quantiles(samples, n=100, method='inclusive')
+    return cuts[49], cuts[94], cuts[98]
+
+
+def run_scenario(scenario, make_client, total, concurrency, warmup=0, first_id=0):
+    """Fire `total` requests from `concurrency` threads; returns a result dict (times in ms)
+
+    Requests get ids first_id..first_id+total-1, so runs given disjoint ranges
+    never share users or client IPs.
+    """
+    # Warm-up requests use negative ids so they never collide with timed ones
+    warmup_ids = itertools.count(1)
+    request_ids = itertools.count(first_id)
+    start_gate = threading.Barrier(concurrency + 1)
+    lock = threading.Lock()
+    latencies = []
+    errors = Counter()
+
+    def worker():
+        client = make_client()
+        for _ in range(warmup):
+            try:
+                method, path, kwargs = scenario.prepare(client, -next(warmup_ids))
+                client.request(method, path, **kwargs)
+            except Exception:
+                pass
+        start_gate.wait()
+
+        local = []
+        while True:
+            i = next(request_ids)
+            if i >= first_id + total:
+                break
+            try:
+                method, path, kwargs = scenario.prepare(client, i)
+                started = time.perf_counter()
+                status, body = client.request(method, path, **kwargs)
+                local.append(time.perf_counter() - started)
+                if not scenario.ok(status, body):
+                    with lock:
+                        errors[str(status)] += 1
+            except Exception as e:
+                with lock:
+                    errors[type(e).__name__] += 1
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, name=f"web-load-{n}") for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    start_gate.wait()
+    wall = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - wall
+
+    p50, p95, p99 = percentiles(latencies)
+    return {
+        'requests': total,
+        'errors': sum(errors.values()),
+        'error_kinds': dict(errors),
+        'concurrency': concurrency,
+        'wall_s': round(wall, 3),
+        'throughput_rps': round(total / wall, 1) if wall else 0.0,
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+        'p50_ms': round(p50 * 1000, 2),
+        'p95_ms': round(p95 * 1000, 2),
+        'p99_ms': round(p99 * 1000, 2),
+        'max_ms': round(max(latencies, default=0) * 1000, 2)
+    }
@@ -0,0 +1,93 @@
+"""One scenario per dashboard endpoint under test.
+
+prepare() does any untimed setup for request `i` and returns the request to
+time; ok() decides whether its response counts as a success.
+"""
+import json
+import re
+
+GUILD_ID = '1100000000000000001'
+VERIFICATION_CHANNEL = '1300000000000000001'
+VERIFIED_ROLE = '1400000000000000001'
+LOG_CHANNEL = '1500000000000000001'
+USER_BASE = 1200000000000000000
+
+_SESSION_ID = re.compile(rb'const sessionId = "([0-9a-f-]+)"')
+
+
+def user_id(i):
+    return str(USER_BASE + i)
+
+
+def client_ip(i):
+    # Distinct per request so every portal visit misses the geolocation cache
+    return f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"
+
+
+class Scenario:
+    name = None
+    method = 'GET'
+
+    def prepare(self, client, i):
+        raise NotImplementedError
+
+    def ok(self, status, body):
+        if status >= 400:
+            return False
+        if body[:1] == b'{':
+            return json.loads(body).get('success', True) is not False
+        return True
+
+
+class VerifyPage(Scenario):
+    name = 'verify_page'
+
+    def prepare(self, client, i):
+        return 'GET', f'/verify/{GUILD_ID}/{user_id(i)}', {'headers': {'X-Forwarded-For': client_ip(i)}}
+
+
+class ApiVerify(Scenario):
+    """POST /api/verify; the portal visit and its geolocation poll are not timed"""
+
+    name = 'api_verify'
+
+    def prepare(self, client, i):
+        status, body = client.request('GET', f'/verify/{GUILD_ID}/{user_id(i)}',
+                                      headers={'X-Forwarded-For': client_ip(i)})
+        match = _SESSION_ID.search(body) if status == 200 else None
+        if not match:
+            raise RuntimeError(f"Portal returned {status} without a session id")
+        session_id = match.group(1).decode()
+        # The portal page waits for geolocation before the member can submit
+        client.request('GET', f'/api/geolocation/{session_id}?wait=2')
+        payload = {'session_id': session_id, 'user_id': user_id(i), 'guild_id': GUILD_ID}
+        return 'POST', '/api/verify', {'json': payload}
+
+
+class AssignRole(Scenario):
+    name = 'assign_role'
+
+    def prepare(self, client, i):
+        payload = {
+            'guild_id': GUILD_ID,
+            'user_id': user_id(i),
+            'geolocation_data': {'ip_address': client_ip(i), 'country': 'Testland', 'isp': 'Fake ISP', 'vpn_detected': False}
+        }
+        return 'POST', '/api/discord/assign-role', {'json': payload}
+
+
+class Stats(Scenario):
+    name = 'stats'
+
+    def prepare(self, client, i):
+        return 'GET', f'/api/stats/{GUILD_ID}', {}
+
+
+class Verifications(Scenario):
+    name = 'verifications'
+
+    def prepare(self, client, i):
+        return 'GET', f'/api/verifications/{GUILD_ID}?limit=50', {}
+
+
+SCENARIOS = {s.name: s for s in (VerifyPage(), ApiVerify(), AssignRole(), Stats(), Verifications())}
@@ -4,10 +4,22 @@ from discord.ext import commands
 import os
 from dotenv import load_dotenv
 import asyncio
+import io
+import signal
+from backlog_jobs import BacklogJobManager, parse_joined_before
+import maintenance
+from log_dispatcher import LogDispatcher
+from welcome_dispatcher import WelcomeDispatcher
+from captcha import CaptchaPool
+import answer_store
+from answer_store import AnswerStore
 
 # Load environment variables
 load_dotenv()
 
+# Seconds a member has to answer a CAPTCHA challenge
+CAPTCHA_TTL = 300
+
 class VYNKBot(commands.Bot):
     def __init__(self):
         intents = discord.Intents.default()
@@ -19,10 +31,74 @@ class VYNKBot(commands.Bot):
             intents=intents,
             application_id=os.getenv('APPLICATION_ID')
         )
+        
+        # Coalesces log-channel embeds per guild
+        self.log_dispatcher = LogDispatcher(
+            self,
+            window=float(os.getenv('VYNK_LOG_WINDOW', 2.0)),
+            max_queue=int(os.getenv('VYNK_LOG_MAX_QUEUE', 100))
+        )
+        
+        # Per-member welcomes, batched per guild during join floods
+        self.welcomes = WelcomeDispatcher(
+            flood_threshold=int(os.getenv('VYNK_JOIN_FLOOD_THRESHOLD', 10)),
+            flood_window=float(os.getenv('VYNK_JOIN_FLOOD_WINDOW', 10)),
+            interval=float(os.getenv('VYNK_WELCOME_BATCH_INTERVAL', 5)),
+            batch_size=int(os.getenv('VYNK_WELCOME_BATCH_SIZE', 50))
+        )
+        
+        # Database-backed services are built in setup_hook, so importing this module
+        # (as CAPTCHA worker processes do under spawn) opens no database or threads
+        self.backlog_jobs = None
+        self.retention = None
+        self.maintenance = None
+        
+        # Pre-rendered CAPTCHA challenges, generated in worker processes
+        self.captcha_pool = CaptchaPool(
+            size=int(os.getenv('VYNK_CAPTCHA_POOL_SIZE', 256)),
+            low_water=int(os.getenv('VYNK_CAPTCHA_LOW_WATER', 64)),
+            workers=int(os.getenv('VYNK_CAPTCHA_WORKERS', 0)) or None
+        )
+        # Hashed answers to outstanding challenges, with per-member attempt limits
+        self.captcha_answers = AnswerStore(
+            ttl=CAPTCHA_TTL,
+            max_entries=int(os.getenv('VYNK_CAPTCHA_MAX_PENDING', 200000)),
+            max_attempts=int(os.getenv('VYNK_CAPTCHA_MAX_ATTEMPTS', 3))
+        )
     
     async def setup_hook(self):
         print("🔄 Starting command setup...")
         
+        # Bulk role assignment jobs started by /verify-backlog or the dashboard
+        from database import db
+        self.backlog_jobs = BacklogJobManager(
+            self,
+            db.path,
+            rate=float(os.getenv('VYNK_BACKLOG_RATE', 5))
+        )
+        self.backlog_jobs.start(poll_interval=float(os.getenv('VYNK_BACKLOG_POLL_INTERVAL', 15)))
+        
+        # Retention/archival of old logs and sessions, run in a background thread
+        self.retention = maintenance.from_env(db.path)
+        self.maintenance = maintenance.MaintenanceScheduler(
+            self.retention,
+            interval=float(os.getenv('VYNK_MAINTENANCE_INTERVAL', 6 * 3600))
+        )
+        
+        self.log_dispatcher.start()
+        self.welcomes.start()
+        # Hosts stop the worker with SIGTERM: close() drains the queued embeds and welcomes,
+        # run() returns, and atexit then flushes buffered verification logs
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, lambda: asyncio.create_task(self.close()))
+        except NotImplementedError:
+            # Not supported by the Windows event loop
+            pass
+        self.maintenance.start()
+        self.captcha_pool.start()
+        # CAPTCHA panels posted before a restart keep working
+        self.add_view(CaptchaView())
+        
         # Start the working bot API server
         try:
             from working_bot_api import start_working_api
@@ -43,36 +119,16 @@ class VYNKBot(commands.Bot):
             print(f"❌ Error during global sync: {e}")
     
     async def send_log(self, guild_id: str, title: str, description: str, color: int = 0x3B82F6):
-        """Send a log message to the guild's configured log channel"""
-        try:
-            # Get log channel from database
-            from database import db
-            cursor = db.conn.cursor()
-            cursor.execute('SELECT log_channel FROM server_settings WHERE guild_id = ?', (guild_id,))
-            result = cursor.fetchone()
-            
-            if not result or not result[0]:
-                print(f"ℹ️ No log channel configured for guild {guild_id}")
-                return
-            
-            log_channel_id = int(result[0])
-            channel = self.get_channel(log_channel_id)
-            
-            if channel:
-                embed = discord.Embed(
-                    title=title,
-                    description=description,
-                    color=color,
-                    timestamp=discord.utils.utcnow()
-                )
-                embed.set_footer(text="VYNK Verification System")
-                await channel.send(embed=embed)
-                print(f"📝 Log sent to channel {log_channel_id} in guild {guild_id}")
-            else:
-                print(f"⚠️ Could not find log channel {log_channel_id} in guild {guild_id}")
-        
-        except Exception as e:
-            print(f"❌ Error sending log: {e}")
+        """Queue a log message for the guild's configured log channel"""
+        embed = discord.Embed(
+            title=title,
+            description=description,
+            color=color,
+            timestamp=discord.utils.utcnow()
+        )
+        embed.set_footer(text="VYNK Verification System")
+        # Sent in the background, coalesced with other events for the same guild
+        self.log_dispatcher.enqueue(guild_id, embed)
 
     async def send_verification_log(self, guild_id: str, user: discord.Member, method: str, status: str):
         """Send a verification log message"""
@@ -87,6 +143,17 @@ class VYNKBot(commands.Bot):
         
         await self.send_log(guild_id, title, description, color)
 
+    async def close(self):
+        # Deliver queued log embeds before disconnecting
+        await self.log_dispatcher.stop()
+        await self.welcomes.stop()
+        if self.backlog_jobs:
+            await self.backlog_jobs.stop()
+        if self.maintenance:
+            self.maintenance.stop()
+        self.captcha_pool.shutdown()
+        await super().close()
+
     async def on_ready(self):
         print(f'✅ {self.user} has logged in successfully!')
         print(f'📊 Connected to {len(self.guilds)} servers')
@@ -132,6 +199,114 @@ class WebVerificationView(discord.ui.View):
         
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
+# CAPTCHA Verification View
+class CaptchaView(discord.ui.View):
+    def __init__(self):
+        super().__init__(timeout=None)
+    
+    @discord.ui.button(label="Start CAPTCHA", style=discord.ButtonStyle.primary, emoji="🛡️", custom_id="captcha_button")
+    async def captcha_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        # Pre-rendered, so this is a pop from the pool rather than image rendering on the loop
+        pool = interaction.client.captcha_pool
+        challenge = pool.take()
+        if challenge is None:
+            # Rendering on demand queues behind refill batches and can outlast Discord's 3s deadline
+            await interaction.response.defer(ephemeral=True, thinking=True)
+            challenge = await pool.render()
+        answer, png = challenge
+        send = interaction.followup.send if interaction.response.is_done() else interaction.response.send_message
+        
+        if not interaction.client.captcha_answers.put(interaction.guild.id, interaction.user.id, answer):
+            await send(f"⛔ Too many incorrect attempts. Try again in {CAPTCHA_TTL // 60} minutes.", ephemeral=True)
+            return
+        
+        embed = discord.Embed(
+            title="🛡️ CAPTCHA Verification",
+            description=f"Type the characters shown in the image. You have {CAPTCHA_TTL // 60} minutes.",
+            color=0x3B82F6
+        )
+        embed.set_image(url="attachment://captcha.png")
+        await send(
+            embed=embed,
+            file=discord.File(io.BytesIO(png), filename="captcha.png"),
+            view=CaptchaAnswerView(),
+            ephemeral=True
+        )
+
+class CaptchaAnswerView(discord.ui.View):
+    def __init__(self):
+        super().__init__(timeout=CAPTCHA_TTL)
+    
+    @discord.ui.button(label="Enter Code", style=discord.ButtonStyle.success, emoji="⌨️")
+    async def enter_code(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.send_modal(CaptchaModal())
+
+class CaptchaModal(discord.ui.Modal, title="CAPTCHA Verification"):
+    code = discord.ui.TextInput(label="Characters from the image", min_length=1, max_length=10)
+    
+    async def on_submit(self, interaction: discord.Interaction):
+        from database import async_db
+        answers = interaction.client.captcha_answers
+        result = answers.check(interaction.guild.id, interaction.user.id, self.code.value)
+        
+        if result == answer_store.EXPIRED:
+            await interaction.response.send_message("⌛ This challenge has expired. Click **Start CAPTCHA** again.", ephemeral=True)
+            return
+        
+        if result != answer_store.CORRECT:
+            await async_db.log_verification(
+                guild_id=str(interaction.guild.id),
+                user_id=str(interaction.user.id),
+                user_name=str(interaction.user),
+                method="captcha",
+                status="failed"
+            )
+            await interaction.client.send_verification_log(str(interaction.guild.id), interaction.user, "captcha", "failed")
+            if result == answer_store.LOCKED:
+                message = f"⛔ Too many incorrect attempts. Try again in {CAPTCHA_TTL // 60} minutes."
+            else:
+                remaining = answers.attempts_left(interaction.guild.id, interaction.user.id)
+                message = f"❌ Incorrect code. {remaining} attempt(s) left — click **Enter Code** to try again."
+            await interaction.response.send_message(message, ephemeral=True)
+            return
+        
+        settings = await async_db.get_server_settings(str(interaction.guild.id))
+        verified_role = interaction.guild.get_role(int(settings['verified_role'])) if settings else None
+        if not verified_role:
+            await interaction.response.send_message("❌ This server hasn't been set up properly. Please contact an administrator.", ephemeral=True)
+            return
+        
+        try:
+            await interaction.user.add_roles(verified_role)
+        except discord.HTTPException as e:
+            print(f"CAPTCHA verification error: {e}")
+            await async_db.log_verification(
+                guild_id=str(interaction.guild.id),
+                user_id=str(interaction.user.id),
+                user_name=str(interaction.user),
+                method="captcha",
+                status="failed"
+            )
+            await interaction.client.send_verification_log(str(interaction.guild.id), interaction.user, "captcha", "failed")
+            await interaction.response.send_message("❌ Could not assign the verified role. Please contact an administrator.", ephemeral=True)
+            return
+        
+        await async_db.log_verification(
+            guild_id=str(interaction.guild.id),
+            user_id=str(interaction.user.id),
+            user_name=str(interaction.user),
+            method="captcha",
+            status="success"
+        )
+        await interaction.client.send_verification_log(str(interaction.guild.id), interaction.user, "captcha", "success")
+        
+        embed = discord.Embed(
+            title="🎉 Verification Complete!",
+            description="Welcome to the server! You now have access to all channels.",
+            color=0x10B981
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
 # Button Verification View
 class VerificationView(discord.ui.View):
     def __init__(self, guild_id):
@@ -142,12 +317,10 @@ class VerificationView(discord.ui.View):
     async def verify_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         try:
             # Get server settings from database
-            from database import db
-            cursor = db.conn.cursor()
-            cursor.execute('SELECT verified_role, log_channel FROM server_settings WHERE guild_id = ?', (str(interaction.guild.id),))
-            result = cursor.fetchone()
+            from database import async_db
+            settings = await async_db.get_server_settings(str(interaction.guild.id))
             
-            if not result:
+            if not settings:
                 embed = discord.Embed(
                     title="❌ Configuration Error",
                     description="This server hasn't been set up properly. Please contact an administrator.",
@@ -156,7 +329,7 @@ class VerificationView(discord.ui.View):
                 await interaction.response.send_message(embed=embed, ephemeral=True)
                 return
             
-            verified_role_id = result[0]
+            verified_role_id = settings['verified_role']
             verified_role = interaction.guild.get_role(int(verified_role_id))
             
             if verified_role:
@@ -174,7 +347,7 @@ class VerificationView(discord.ui.View):
                 await interaction.user.add_roles(verified_role)
                 
                 # Log verification to database
-                db.log_verification(
+                await async_db.log_verification(
                     guild_id=str(interaction.guild.id),
                     user_id=str(interaction.user.id),
                     user_name=str(interaction.user),
@@ -204,8 +377,8 @@ class VerificationView(discord.ui.View):
         except Exception as e:
             print(f"Verification error: {e}")
             # Log failed verification
-            from database import db
-            db.log_verification(
+            from database import async_db
+            await async_db.log_verification(
                 guild_id=str(interaction.guild.id),
                 user_id=str(interaction.user.id),
                 user_name=str(interaction.user),
@@ -278,8 +451,8 @@ async def setup_verification(interaction: discord.Interaction,
         return
     
     # Save settings to database
-    from database import db
-    db.save_server_settings(
+    from database import async_db
+    await async_db.save_server_settings(
         guild_id=str(interaction.guild.id),
         verification_channel=str(channel.id),
         verified_role=str(verified_role.id),
@@ -326,8 +499,8 @@ async def setup_captcha(interaction: discord.Interaction,
         return
     
     # Save settings to database
-    from database import db
-    db.save_server_settings(
+    from database import async_db
+    await async_db.save_server_settings(
         guild_id=str(interaction.guild.id),
         verification_channel=str(channel.id),
         verified_role=str(verified_role.id),
@@ -335,6 +508,14 @@ async def setup_captcha(interaction: discord.Interaction,
         method='captcha'
     )
     
+    # Post the CAPTCHA panel
+    panel = discord.Embed(
+        title="🛡️ CAPTCHA Verification",
+        description="Click the button below and type the characters from the image to access the server!",
+        color=0x3B82F6
+    )
+    await channel.send(embed=panel, view=CaptchaView())
+    
     embed = discord.Embed(
         title="🛡️ CAPTCHA Verification",
         description="CAPTCHA verification system has been set up!",
@@ -364,8 +545,8 @@ async def setup_web_verification(interaction: discord.Interaction,
         return
     
     # Save settings to database
-    from database import db
-    db.save_server_settings(
+    from database import async_db
+    await async_db.save_server_settings(
         guild_id=str(interaction.guild.id),
         verification_channel=str(channel.id),
         verified_role=str(verified_role.id),
@@ -400,9 +581,9 @@ async def setup_web_verification(interaction: discord.Interaction,
 @bot.tree.command(name="server-stats", description="Show server verification statistics")
 async def server_stats(interaction: discord.Interaction):
     try:
-        from database import db
+        from database import async_db
         
-        stats = db.get_server_stats(str(interaction.guild.id))
+        stats = await async_db.get_server_stats(str(interaction.guild.id))
         
         embed = discord.Embed(
             title="📊 Server Verification Stats",
@@ -450,6 +631,111 @@ async def server_stats(interaction: discord.Interaction):
         )
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
+@bot.tree.command(name="verify-backlog", description="Give the verified role to existing members in bulk (Admin only)")
+@app_commands.describe(
+    joined_before="Only members who joined before this date, YYYY-MM-DD (optional)"
+)
+async def verify_backlog(interaction: discord.Interaction, joined_before: str = None):
+    if not interaction.user.guild_permissions.administrator:
+        await interaction.response.send_message("You need administrator permissions.", ephemeral=True)
+        return
+    
+    from database import async_db
+    settings = await async_db.get_server_settings(str(interaction.guild.id))
+    if not settings:
+        await interaction.response.send_message("This server hasn't been set up yet. Run a `/setup-*` command first.", ephemeral=True)
+        return
+    
+    try:
+        cutoff = parse_joined_before(joined_before)
+    except ValueError:
+        await interaction.response.send_message("❌ `joined_before` must be a date like `2024-01-31`.", ephemeral=True)
+        return
+    
+    try:
+        job = await bot.backlog_jobs.start_job(
+            interaction.guild.id,
+            settings['verified_role'],
+            joined_before=cutoff,
+            requested_by=str(interaction.user.id)
+        )
+    except ValueError as e:
+        await interaction.response.send_message(f"⚠️ {e}", ephemeral=True)
+        return
+    
+    embed = discord.Embed(
+        title="📋 Verification Backlog Started",
+        description=f"Members without <@&{settings['verified_role']}> are being verified in the background.",
+        color=0x3B82F6
+    )
+    embed.add_field(name="Job ID", value=f"`{job['job_id']}`", inline=True)
+    embed.add_field(name="Joined Before", value=joined_before or "Any time", inline=True)
+    embed.add_field(name="Rate", value=f"{bot.backlog_jobs.rate:g} members/sec", inline=True)
+    embed.set_footer(text="Use /verify-backlog-status to follow progress")
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+@bot.tree.command(name="verify-backlog-status", description="Show progress of the latest verification backlog job")
+async def verify_backlog_status(interaction: discord.Interaction):
+    from database import async_db
+    job = await async_db.run(bot.backlog_jobs.get_latest_job, interaction.guild.id)
+    if not job:
+        await interaction.response.send_message("No verification backlog jobs have been run in this server.", ephemeral=True)
+        return
+    
+    embed = discord.Embed(
+        title="📋 Verification Backlog",
+        description=f"Job `{job['job_id']}` is **{job['status']}**",
+        color=0xEF4444 if job['status'] == 'failed' else 0x3B82F6
+    )
+    embed.add_field(name="Progress", value=f"`{job['processed']}/{job['total']}` ({job['progress']}%)", inline=True)
+    embed.add_field(name="Assigned", value=f"`{job['assigned']}`", inline=True)
+    embed.add_field(name="Failed", value=f"`{job['failed']}`", inline=True)
+    if job['error']:
+        embed.add_field(name="Error", value=job['error'], inline=False)
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+@bot.tree.command(name="verify-backlog-cancel", description="Stop the running verification backlog job (Admin only)")
+async def verify_backlog_cancel(interaction: discord.Interaction):
+    if not interaction.user.guild_permissions.administrator:
+        await interaction.response.send_message("You need administrator permissions.", ephemeral=True)
+        return
+
+    from database import async_db
+    job = await async_db.run(bot.backlog_jobs.get_active_job, interaction.guild.id)
+    if not job or not await bot.backlog_jobs.cancel(job['job_id']):
+        await interaction.response.send_message("No verification backlog job is running in this server.", ephemeral=True)
+        return
+
+    await interaction.response.send_message(
+        f"🛑 Job `{job['job_id']}` cancelled after `{job['processed']}/{job['total']}` members.",
+        ephemeral=True
+    )
+
+@bot.tree.command(name="set-retention", description="Set how long verification data is kept (Admin only)")
+@app_commands.describe(
+    logs_days="Days to keep verification logs before archiving (empty for default)",
+    sessions_days="Days to keep web verification sessions before archiving (empty for default)"
+)
+async def set_retention(interaction: discord.Interaction,
+                        logs_days: app_commands.Range[int, 1, 3650] = None,
+                        sessions_days: app_commands.Range[int, 1, 3650] = None):
+    if not interaction.user.guild_permissions.administrator:
+        await interaction.response.send_message("You need administrator permissions.", ephemeral=True)
+        return
+    
+    from database import async_db
+    await async_db.run(bot.retention.set_policy, interaction.guild.id, logs_days, sessions_days)
+    policy = await async_db.run(bot.retention.get_policy, interaction.guild.id)
+    
+    embed = discord.Embed(
+        title="🗄️ Retention Updated",
+        description="Older data is moved to compressed monthly archives during scheduled maintenance.",
+        color=0x10B981
+    )
+    embed.add_field(name="Verification Logs", value=f"`{policy['log_retention_days']}` days", inline=True)
+    embed.add_field(name="Web Sessions", value=f"`{policy['session_retention_days']}` days", inline=True)
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
 @bot.tree.command(name="vynk-help", description="Show all VYNK commands")
 async def vynk_help(interaction: discord.Interaction):
     embed = discord.Embed(
@@ -460,13 +746,13 @@ async def vynk_help(interaction: discord.Interaction):
     
     embed.add_field(
         name="🔧 Setup Commands",
-        value="• `/setup-verification` - Button verification\n• `/setup-captcha` - CAPTCHA verification\n• `/setup-web-verification` - Web portal verification\n• `/sync` - Sync commands (Admin)",
+        value="• `/setup-verification` - Button verification\n• `/setup-captcha` - CAPTCHA verification\n• `/setup-web-verification` - Web portal verification\n• `/verify-backlog` - Verify existing members in bulk\n• `/set-retention` - Data retention (Admin)\n• `/sync` - Sync commands (Admin)",
         inline=False
     )
     
     embed.add_field(
         name="📊 Utility Commands",
-        value="• `/ping` - Check bot latency\n• `/test` - Test bot functionality\n• `/vynk-help` - This help menu\n• `/server-stats` - View verification stats",
+        value="• `/ping` - Check bot latency\n• `/test` - Test bot functionality\n• `/vynk-help` - This help menu\n• `/server-stats` - View verification stats\n• `/verify-backlog-status` - Bulk verification progress\n• `/verify-backlog-cancel` - Stop bulk verification (Admin)",
         inline=False
     )
     
@@ -481,20 +767,19 @@ async def vynk_help(interaction: discord.Interaction):
 
 @bot.event
 async def on_member_join(member):
-    print(f"👤 {member} joined the server {member.guild.name}")
-    
-    # Find a channel named 'verification' or 'general'
-    channel = discord.utils.get(member.guild.text_channels, name="verification")
-    if not channel:
-        channel = discord.utils.get(member.guild.text_channels, name="general")
-    
-    if channel:
-        embed = discord.Embed(
-            title=f"Welcome {member.name}! 👋",
-            description="Please complete verification to access the server. Check the verification channel for instructions.",
-            color=0x3B82F6
-        )
-        await channel.send(f"{member.mention}", embed=embed)
+    await bot.welcomes.member_joined(member)
+
+@bot.event
+async def on_guild_channel_create(channel):
+    bot.welcomes.invalidate(channel.guild.id)
+
+@bot.event
+async def on_guild_channel_delete(channel):
+    bot.welcomes.invalidate(channel.guild.id)
+
+@bot.event
+async def on_guild_channel_update(before, after):
+    bot.welcomes.invalidate(after.guild.id)
 
 if __name__ == "__main__":
     print("🚀 Starting VYNK Bot...")
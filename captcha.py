@@ -0,0 +1,169 @@
+import asyncio
+import io
+import multiprocessing
+import os
+import random
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+# No 0/O, 1/I/L or 5/S pairs that are hard to tell apart once distorted
+ALPHABET = "ABCDEFGHJKMNPQRTUVWXYZ2346789"
+LENGTH = 5
+WIDTH, HEIGHT = 220, 80
+
+_font = None
+
+def _get_font():
+    global _font
+    if _font is None:
+        try:
+            _font = ImageFont.truetype("DejaVuSans-Bold.ttf", 40)
+        except OSError:
+            _font = ImageFont.load_default(size=40)
+    return _font
+
+def render_challenge(seed=None):
+    """Render one challenge; returns (answer, png_bytes). Runs in worker processes."""
+    rng = random.Random(seed)
+    answer = ''.join(rng.choice(ALPHABET) for _ in range(LENGTH))
+    font = _get_font()
+
+    image = Image.new('RGB', (WIDTH, HEIGHT), (rng.randint(220, 255), rng.randint(220, 255), rng.randint(220, 255)))
+    draw = ImageDraw.Draw(image)
+
+    # Background noise
+    for _ in range(6):
+        draw.line(
+            [(rng.randint(0, WIDTH), rng.randint(0, HEIGHT)), (rng.randint(0, WIDTH), rng.randint(0, HEIGHT))],
+            fill=(rng.randint(120, 200),) * 3,
+            width=2
+        )
+
+    # Each character drawn on its own tile, rotated and jittered
+    x = 12
+    for char in answer:
+        tile = Image.new('RGBA', (50, 60), (0, 0, 0, 0))
+        ImageDraw.Draw(tile).text((8, 4), char, font=font, fill=(rng.randint(0, 90), rng.randint(0, 90), rng.randint(0, 120), 255))
+        tile = tile.rotate(rng.uniform(-30, 30), resample=Image.BICUBIC, expand=False)
+        image.paste(tile, (x, rng.randint(0, 18)), tile)
+        x += rng.randint(34, 40)
+
+    # Foreground strike-through and speckle
+    draw.line([(0, rng.randint(25, 55)), (WIDTH, rng.randint(25, 55))], fill=(60, 60, 60), width=2)
+    for _ in range(300):
+        draw.point((rng.randint(0, WIDTH - 1), rng.randint(0, HEIGHT - 1)), fill=(rng.randint(0, 255),) * 3)
+    image = image.filter(ImageFilter.SMOOTH)
+
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG', optimize=False)
+    return answer, buffer.getvalue()
+
+def render_batch(count):
+    return [render_challenge() for _ in range(count)]
+
+class CaptchaPool:
+    """Ring buffer of pre-rendered CAPTCHA challenges, refilled by a process pool.
+
+    take() pops a ready challenge in O(1). Whenever the buffer drops below
+    low_water, batches are rendered in worker processes until it is full again,
+    so rendering never runs on the bot's event loop.
+    """
+
+    def __init__(self, size=256, low_water=64, workers=None, batch_size=16):
+        self.size = size
+        self.low_water = low_water
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+
+        self._buffer = deque(maxlen=size)
+        # Reentrant: a future that is already done runs _collect inside _refill
+        self._lock = threading.RLock()
+        self._in_flight = 0
+        self._executor = None
+
+        self.issued = 0
+        self.generated = 0
+        self.misses = 0
+        self.refills = 0
+
+    def start(self):
+        if self._executor is None:
+            # spawn, not fork: the bot process has running threads whose locks a fork would copy
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+            self._refill()
+
+    def shutdown(self):
+        if self._executor:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def take(self):
+        """A ready (answer, png_bytes) challenge, or None if the buffer is empty"""
+        try:
+            challenge = self._buffer.popleft()
+        except IndexError:
+            self.misses += 1
+            challenge = None
+        else:
+            self.issued += 1
+        if len(self._buffer) < self.low_water:
+            self._refill()
+        return challenge
+
+    async def render(self):
+        """Render one challenge in the pool now, for when take() came back empty"""
+        self.start()
+        challenge = await asyncio.get_running_loop().run_in_executor(self._executor, render_challenge)
+        self.issued += 1
+        return challenge
+
+    def stats(self):
+        # _collect fills the buffer from the executor's callback thread
+        with self._lock:
+            buffered = list(self._buffer)
+            in_flight = self._in_flight
+        return {
+            'buffered': len(buffered),
+            'size': self.size,
+            'in_flight': in_flight,
+            'issued': self.issued,
+            'generated': self.generated,
+            'misses': self.misses,
+            'refills': self.refills,
+            'buffer_bytes': sum(len(png) + len(answer) for answer, png in buffered)
+        }
+
+    def _refill(self):
+        if self._executor is None:
+            return
+        with self._lock:
+            missing = self.size - len(self._buffer) - self._in_flight * self.batch_size
+            if missing <= 0:
+                return
+            self.refills += 1
+            for _ in range((missing + self.batch_size - 1) // self.batch_size):
+                self._in_flight += 1
+                try:
+                    future = self._executor.submit(render_batch, self.batch_size)
+                except RuntimeError:
+                    # Executor shut down
+                    self._in_flight -= 1
+                    return
+                future.add_done_callback(self._collect)
+
+    def _collect(self, future):
+        with self._lock:
+            self._in_flight -= 1
+        if future.cancelled():
+            return
+        try:
+            challenges = future.result()
+        except Exception as e:
+            print(f"❌ CAPTCHA rendering failed: {e}")
+            return
+        with self._lock:
+            # deque(maxlen) drops the oldest challenge if a batch overshoots
+            self._buffer.extend(challenges)
+            self.generated += len(challenges)
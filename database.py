@@ -1,12 +1,34 @@
-import sqlite3
 import json
+import os
 from datetime import datetime
+from log_writer import LogWriter
+from rollups import create_rollup_table, create_guild_versions_table, insert_verification_logs, query_server_stats
+from settings_cache import SettingsCache, create_settings_version_table, bump_settings_version
+from db_connection import ConnectionManager
+from async_database import AsyncDatabase
+
+DATABASE_PATH = os.getenv('VYNK_DB_PATH', 'vynk.db')
 
 class Database:
-    def __init__(self):
-        self.conn = sqlite3.connect('vynk.db', check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
+    def __init__(self, path=DATABASE_PATH):
+        self.path = path
+        # One WAL-mode connection per thread instead of a single shared connection
+        self.db = ConnectionManager.for_path(path)
         self.create_tables()
+        
+        # server_settings reads are served from memory until a /setup-* command changes them
+        self.settings_cache = SettingsCache(path)
+        
+        # Verification logs are written behind in grouped transactions
+        self.log_writer = LogWriter(
+            path,
+            batch_size=int(os.getenv('VYNK_LOG_BATCH_SIZE', 100)),
+            flush_interval=float(os.getenv('VYNK_LOG_FLUSH_INTERVAL', 0.5))
+        )
+    
+    @property
+    def conn(self):
+        return self.db.connection()
     
     def create_tables(self):
         cursor = self.conn.cursor()
@@ -35,7 +57,25 @@ class Database:
             )
         ''')
         
+        # Covering index for per-guild stats queries
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_verification_logs_guild_status_ts
+            ON verification_logs (guild_id, status, timestamp)
+        ''')
+        
+        # Keyset pagination index for the dashboard's /api/verifications
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_verification_logs_guild_ts_id
+            ON verification_logs (guild_id, timestamp, id)
+        ''')
+        
         self.conn.commit()
+        
+        # Per-guild hourly counters kept in step with verification_logs
+        create_rollup_table(self.conn)
+        create_guild_versions_table(self.conn)
+        
+        create_settings_version_table(self.conn)
     
     def save_server_settings(self, guild_id, verification_channel, verified_role, log_channel=None, method='button'):
         cursor = self.conn.cursor()
@@ -44,16 +84,33 @@ class Database:
             (guild_id, verification_channel, verified_role, log_channel, method)
             VALUES (?, ?, ?, ?, ?)
         ''', (guild_id, verification_channel, verified_role, log_channel, method))
+        bump_settings_version(cursor)
         self.conn.commit()
+        self.settings_cache.invalidate(guild_id)
+    
+    def get_server_settings(self, guild_id):
+        return self.settings_cache.get(guild_id)
     
     def log_verification(self, guild_id, user_id, user_name, method, status):
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            INSERT INTO verification_logs 
-            (guild_id, user_id, user_name, method, status, timestamp)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (guild_id, user_id, user_name, method, status, datetime.now().isoformat()))
-        self.conn.commit()
+        self.log_writer.submit((guild_id, user_id, user_name, method, status, datetime.now().isoformat()))
+    
+    def log_verification_now(self, guild_id, user_id, user_name, method, status):
+        """Insert and commit a single log row immediately, bypassing the write-behind buffer"""
+        with self.conn:
+            insert_verification_logs(self.conn, [(guild_id, user_id, user_name, method, status, datetime.now().isoformat())])
+    
+    def flush_logs(self):
+        """Write all buffered verification logs now"""
+        self.log_writer.flush()
+    
+    def get_server_stats(self, guild_id):
+        return query_server_stats(self.conn, guild_id)
+    
+    def close(self):
+        self.log_writer.close()
 
 # Global database instance
-db = Database()
\ No newline at end of file
+db = Database()
+
+# Awaitable facade for the bot's event loop
+async_db = AsyncDatabase(db)
\ No newline at end of file
@@ -0,0 +1,61 @@
+import sqlite3
+import os
+import threading
+import urllib.parse
+
+class ConnectionManager:
+    """Per-thread SQLite connections to one database file.
+
+    The file is switched to WAL journal mode so readers don't block the writer,
+    and every connection gets synchronous=NORMAL and a busy timeout so a second
+    writer waits instead of failing with "database is locked". Read-only
+    connections are opened separately for dashboard queries.
+    """
+
+    _managers = {}
+    _managers_lock = threading.Lock()
+
+    @classmethod
+    def for_path(cls, path):
+        """Shared manager for a database file, so every component in a process reuses its connections"""
+        key = os.path.abspath(path)
+        with cls._managers_lock:
+            manager = cls._managers.get(key)
+            if manager is None:
+                manager = cls._managers[key] = cls(path)
+            return manager
+
+    def __init__(self, path, busy_timeout=None):
+        self.path = path
+        self.busy_timeout = busy_timeout if busy_timeout is not None else float(os.getenv('VYNK_DB_BUSY_TIMEOUT', 10))
+        self._local = threading.local()
+
+        conn = self._connect()
+        # Only takes effect on a new file; existing ones need `python maintenance.py vacuum`
+        conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+        self.journal_mode = conn.execute('PRAGMA journal_mode=WAL').fetchone()[0]
+
+    def connection(self):
+        """Read-write connection owned by the calling thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def read_connection(self):
+        """Read-only connection owned by the calling thread"""
+        conn = getattr(self._local, 'read_conn', None)
+        if conn is None:
+            conn = self._local.read_conn = self._connect(read_only=True)
+        return conn
+
+    def _connect(self, read_only=False):
+        if read_only:
+            uri = f"file:{urllib.parse.quote(os.path.abspath(self.path))}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, timeout=self.busy_timeout)
+        else:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout * 1000)}')
+        return conn
@@ -0,0 +1,213 @@
+import threading
+import time
+from collections import deque
+from http_client import http_client
+
+DISCORD_API_BASE_URL = 'https://discord.com/api/v10'
+
+# Path segments whose IDs are "major parameters" and get their own rate-limit buckets
+MAJOR_PARAMETERS = ('channels', 'guilds', 'webhooks')
+
+def route_key(method, path):
+    """Split a request into its route template and major parameters, e.g.
+    ('PUT /guilds/{id}/members/:id/roles/:id', '1234') for a role assignment."""
+    segments = path.strip('/').split('/')
+    template, major = [], []
+    for i, segment in enumerate(segments):
+        if segment.isdigit():
+            if i > 0 and segments[i - 1] in MAJOR_PARAMETERS:
+                template.append('{id}')
+                major.append(segment)
+            else:
+                template.append(':id')
+        else:
+            template.append(segment)
+    return f"{method} /{'/'.join(template)}", ':'.join(major)
+
+class RateLimitBucket:
+    """Remaining/reset state for one route's Discord rate-limit bucket"""
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.limit = None
+        self.remaining = None
+        self.reset_at = 0.0
+        self.window = 0.0
+        self.probing = False
+        self.unlimited = False
+
+    def acquire(self):
+        """Reserve a request slot, sleeping until the bucket resets if it is exhausted"""
+        start = time.monotonic()
+        with self.cond:
+            while True:
+                now = time.monotonic()
+                if now >= self.reset_at and self.remaining == 0:
+                    # Window is over; without a known limit fall back to "unknown" and let Discord tell us.
+                    # Assume a full window until responses from the new one report the real reset.
+                    self.remaining = self.limit
+                    self.reset_at = now + self.window
+                if self.unlimited:
+                    return 0.0
+                if self.remaining is None:
+                    # Unknown bucket: send one request to learn the limits, hold the rest back
+                    if not self.probing:
+                        self.probing = True
+                        return now - start
+                    self.cond.wait()
+                elif self.remaining > 0:
+                    self.remaining -= 1
+                    return now - start
+                else:
+                    self.cond.wait(self.reset_at - now)
+
+    def update(self, headers, status_code):
+        """Apply the X-RateLimit-* headers of a response"""
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset_after = headers.get('X-RateLimit-Reset-After')
+        limit = headers.get('X-RateLimit-Limit')
+        with self.cond:
+            if remaining is not None and reset_after is not None:
+                # Discord's count is authoritative, but never hand back slots reserved by in-flight requests
+                remaining = int(remaining)
+                self.remaining = remaining if self.remaining is None else min(self.remaining, remaining)
+                reset_after = float(reset_after)
+                self.reset_at = time.monotonic() + reset_after
+                self.window = max(self.window, reset_after)
+                if limit is not None:
+                    self.limit = int(limit)
+                self.unlimited = False
+            elif self.remaining is None and 200 <= status_code < 300:
+                # Route doesn't report a bucket; stop serialising requests to it. Errors from a
+                # proxy in front of Discord carry no headers either, so they don't count.
+                self.unlimited = True
+            self.probing = False
+            self.cond.notify_all()
+
+    def release(self):
+        """Give up a reserved slot after a request that never got a response"""
+        with self.cond:
+            self.probing = False
+            self.cond.notify_all()
+
+    def block_for(self, seconds):
+        with self.cond:
+            self.remaining = 0
+            self.reset_at = max(self.reset_at, time.monotonic() + seconds)
+
+class DiscordREST:
+    """Thread-safe Discord REST client that honours per-route and global rate limits.
+
+    Requests wait for their bucket pre-emptively using the X-RateLimit-* headers
+    of earlier responses; 429s are retried after Retry-After.
+    """
+
+    def __init__(self, token, http=http_client, base_url=DISCORD_API_BASE_URL, global_rate=50, max_retries=3):
+        self.token = token
+        self.http = http
+        self.base_url = base_url
+        self.global_rate = global_rate
+        self.max_retries = max_retries
+
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+        # Global limit: a sliding one-second window plus any global 429 cooldown
+        self._global_cond = threading.Condition()
+        self._global_sent = deque()
+        self._global_reset_at = 0.0
+
+        self.requests_sent = 0
+        self.rate_limited = 0
+        self.preemptive_waits = 0
+        self.wait_seconds = 0.0
+
+    def request(self, method, path, **kwargs):
+        headers = kwargs.pop('headers', {})
+        headers.setdefault('Authorization', f'Bot {self.token}')
+        route, major = route_key(method, path)
+
+        for attempt in range(self.max_retries + 1):
+            bucket = self._bucket_for(route, major)
+            waited = bucket.acquire() + self._acquire_global()
+            if waited > 0.001:
+                with self._lock:
+                    self.preemptive_waits += 1
+                    self.wait_seconds += waited
+
+            try:
+                response = self.http.request(method, f'{self.base_url}{path}', headers=headers, **kwargs)
+            except Exception:
+                bucket.release()
+                raise
+            with self._lock:
+                self.requests_sent += 1
+            bucket.update(response.headers, response.status_code)
+
+            if response.status_code != 429 or attempt == self.max_retries:
+                return response
+
+            with self._lock:
+                self.rate_limited += 1
+            retry_after = self._retry_after(response)
+            if response.headers.get('X-RateLimit-Global'):
+                with self._global_cond:
+                    self._global_reset_at = max(self._global_reset_at, time.monotonic() + retry_after)
+            else:
+                bucket.block_for(retry_after)
+            print(f"⏳ Discord rate limited {route}, retrying in {retry_after:.2f}s")
+
+        return response
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def put(self, path, **kwargs):
+        return self.request('PUT', path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request('DELETE', path, **kwargs)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'requests_sent': self.requests_sent,
+                'rate_limited': self.rate_limited,
+                'preemptive_waits': self.preemptive_waits,
+                'wait_seconds': round(self.wait_seconds, 3),
+                'buckets': len(self._buckets)
+            }
+
+    def _bucket_for(self, route, major):
+        with self._lock:
+            key = (route, major)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = RateLimitBucket()
+            return bucket
+
+    def _acquire_global(self):
+        start = time.monotonic()
+        with self._global_cond:
+            while True:
+                now = time.monotonic()
+                if now < self._global_reset_at:
+                    delay = self._global_reset_at - now
+                else:
+                    while self._global_sent and self._global_sent[0] <= now - 1:
+                        self._global_sent.popleft()
+                    if len(self._global_sent) < self.global_rate:
+                        self._global_sent.append(now)
+                        return now - start
+                    delay = self._global_sent[0] + 1 - now
+                self._global_cond.wait(delay)
+
+    @staticmethod
+    def _retry_after(response):
+        try:
+            return float(response.json().get('retry_after'))
+        except Exception:
+            return float(response.headers.get('Retry-After', 1))
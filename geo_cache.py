@@ -0,0 +1,145 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from db_connection import ConnectionManager
+
+class GeolocationCache:
+    """Bounded LRU+TTL cache of geolocation lookups, persisted to SQLite.
+
+    Concurrent misses for the same IP share one in-flight upstream call.
+    """
+
+    def __init__(self, db_path, max_entries=10000, ttl=86400):
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self.db = ConnectionManager.for_path(db_path)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS geolocation_cache (
+                ip_address TEXT PRIMARY KEY,
+                data TEXT,
+                fetched_at REAL
+            )
+        ''')
+        self.conn.commit()
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._inflight = {}
+
+        self.hits = 0
+        self.persisted_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.upstream_calls = 0
+
+    @property
+    def conn(self):
+        return self.db.connection()
+
+    def get_or_fetch(self, ip_address, fetch):
+        """Return cached data for ip_address, calling fetch(ip_address) at most once per miss.
+
+        fetch may return None to signal a result that shouldn't be cached.
+        """
+        with self._lock:
+            data = self._get_fresh(ip_address)
+            if data is not None:
+                self.hits += 1
+                return dict(data)
+
+            future = self._inflight.get(ip_address)
+            if future is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                future = Future()
+                self._inflight[ip_address] = future
+                leader = True
+
+        if not leader:
+            data = future.result()
+            return dict(data) if data is not None else None
+
+        try:
+            data = self._load_persisted(ip_address)
+            if data is None:
+                with self._lock:
+                    self.misses += 1
+                    self.upstream_calls += 1
+                data = fetch(ip_address)
+                if data is not None:
+                    self._persist(ip_address, data)
+                    with self._lock:
+                        self._store(ip_address, data, time.time())
+            future.set_result(data)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(ip_address, None)
+
+        return dict(data) if data is not None else None
+
+    def purge_expired(self):
+        """Delete persisted rows older than the TTL"""
+        with self.conn:
+            cursor = self.conn.execute(
+                'DELETE FROM geolocation_cache WHERE fetched_at < ?', (time.time() - self.ttl,)
+            )
+        return cursor.rowcount
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.persisted_hits + self.misses + self.coalesced
+            return {
+                'hits': self.hits,
+                'persisted_hits': self.persisted_hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'upstream_calls': self.upstream_calls,
+                'hit_ratio': round((lookups - self.misses) / lookups, 3) if lookups else 0,
+                'entries': len(self._entries)
+            }
+
+    def _get_fresh(self, ip_address):
+        entry = self._entries.get(ip_address)
+        if entry is None:
+            return None
+        data, fetched_at = entry
+        if time.time() - fetched_at > self.ttl:
+            del self._entries[ip_address]
+            return None
+        self._entries.move_to_end(ip_address)
+        return data
+
+    def _store(self, ip_address, data, fetched_at):
+        self._entries[ip_address] = (data, fetched_at)
+        self._entries.move_to_end(ip_address)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # SQLite I/O stays outside _lock: a write waiting on the database lock must not
+    # hold up cache hits for other IPs
+
+    def _load_persisted(self, ip_address):
+        row = self.conn.execute(
+            'SELECT data, fetched_at FROM geolocation_cache WHERE ip_address = ?', (ip_address,)
+        ).fetchone()
+        if not row or time.time() - row[1] > self.ttl:
+            return None
+        data = json.loads(row[0])
+        with self._lock:
+            self.persisted_hits += 1
+            self._store(ip_address, data, row[1])
+        return data
+
+    def _persist(self, ip_address, data):
+        with self.conn:
+            self.conn.execute('''
+                INSERT OR REPLACE INTO geolocation_cache (ip_address, data, fetched_at)
+                VALUES (?, ?, ?)
+            ''', (ip_address, json.dumps(data), time.time()))
@@ -0,0 +1,78 @@
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+class HTTPClient:
+    """Shared keep-alive HTTP client with per-host connection pools, default timeouts and retries"""
+
+    def __init__(self, pool_connections=10, pool_maxsize=20, timeout=(3.05, 10), retries=2, backoff_factor=0.3):
+        self.timeout = timeout
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            # 429s are left to the caller so rate limits can be honoured per route
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS']),
+            raise_on_status=False
+        )
+        self.adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+
+        self._lock = threading.Lock()
+        self.requests_sent = 0
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        with self._lock:
+            self.requests_sent += 1
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request('PUT', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+    def stats(self):
+        """Per-host connection reuse: connections opened vs. requests sent over them"""
+        hosts = {}
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            host = f"{pool.scheme}://{pool.host}:{pool.port}"
+            hosts[host] = {
+                'connections_opened': pool.num_connections,
+                'requests': pool.num_requests,
+                'reused': max(pool.num_requests - pool.num_connections, 0)
+            }
+
+        opened = sum(h['connections_opened'] for h in hosts.values())
+        sent = sum(h['requests'] for h in hosts.values())
+        return {
+            'requests_sent': self.requests_sent,
+            'connections_opened': opened,
+            'reuse_ratio': round((sent - opened) / sent, 3) if sent else 0,
+            'hosts': hosts
+        }
+
+# Shared client used for Discord and Abstract API calls
+http_client = HTTPClient(
+    pool_connections=int(os.getenv('VYNK_HTTP_POOL_CONNECTIONS', 10)),
+    pool_maxsize=int(os.getenv('VYNK_HTTP_POOL_MAXSIZE', 20)),
+    timeout=(3.05, float(os.getenv('VYNK_HTTP_TIMEOUT', 10))),
+    retries=int(os.getenv('VYNK_HTTP_RETRIES', 2))
+)
@@ -0,0 +1,148 @@
+import queue
+import threading
+from collections import defaultdict
+from rollups import query_server_stats
+from db_connection import ConnectionManager
+
+class Subscription:
+    """One dashboard tab's stream of events for a guild"""
+
+    def __init__(self, guild_id, max_pending):
+        self.guild_id = guild_id
+        self.events = queue.Queue(maxsize=max_pending)
+        # Set when events were dropped; the tab has to resync with a full reload
+        self.lagged = False
+
+    def get(self, timeout):
+        """Next (event, data) pair, or None after timeout seconds"""
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+class LiveFeed:
+    """Fans out new verification_logs rows and refreshed stats to dashboard subscribers.
+
+    A single poller thread reads rows with an id above the last one it saw and
+    recomputes stats once per guild with new rows, so the query count depends on
+    the poll interval and write activity, not on how many tabs are open. The
+    poller only runs while someone is subscribed.
+    """
+
+    def __init__(self, db_path, poll_interval=1.0, max_subscribers=8, max_pending=100):
+        self.db = ConnectionManager.for_path(db_path)
+        self.poll_interval = poll_interval
+        self.max_subscribers = max_subscribers
+        self.max_pending = max_pending
+
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+        self._last_id = None
+        self._thread = None
+        self._wakeup = threading.Event()
+
+        self.polls = 0
+        self.events_published = 0
+        self.events_dropped = 0
+
+    @property
+    def conn(self):
+        return self.db.read_connection()
+
+    def subscribe(self, guild_id):
+        """Register a subscriber, or return None when the subscriber limit is reached"""
+        with self._lock:
+            if self.subscriber_count() >= self.max_subscribers:
+                return None
+            subscription = Subscription(str(guild_id), self.max_pending)
+            self._subscribers[subscription.guild_id].add(subscription)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="vynk-live-feed", daemon=True)
+                self._thread.start()
+            return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.guild_id)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.guild_id]
+            if not self._subscribers:
+                self._wakeup.set()
+
+    def subscriber_count(self):
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def stats(self):
+        with self._lock:
+            return {
+                'subscribers': self.subscriber_count(),
+                'guilds': len(self._subscribers),
+                'polls': self.polls,
+                'events_published': self.events_published,
+                'events_dropped': self.events_dropped
+            }
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._subscribers:
+                    # Idle: the next subscribe() starts a fresh poller
+                    self._thread = None
+                    self._last_id = None
+                    return
+            try:
+                self._poll()
+            except Exception as e:
+                print(f"❌ Live feed poll failed: {e}")
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def _poll(self):
+        self.polls += 1
+        if self._last_id is None:
+            # Only events that happen after the first subscriber connects are streamed
+            self._last_id = self.conn.execute('SELECT COALESCE(MAX(id), 0) FROM verification_logs').fetchone()[0]
+            return
+
+        rows = self.conn.execute('''
+            SELECT id, guild_id, user_name, method, status, timestamp
+            FROM verification_logs
+            WHERE id > ?
+            ORDER BY id
+            LIMIT 500
+        ''', (self._last_id,)).fetchall()
+        if not rows:
+            return
+        self._last_id = rows[-1]['id']
+
+        with self._lock:
+            watched = set(self._subscribers)
+
+        events = defaultdict(list)
+        for row in rows:
+            if row['guild_id'] in watched:
+                events[row['guild_id']].append({
+                    'user_name': row['user_name'],
+                    'method': row['method'],
+                    'status': row['status'],
+                    'timestamp': row['timestamp']
+                })
+
+        for guild_id, verifications in events.items():
+            stats = query_server_stats(self.conn, guild_id)
+            with self._lock:
+                subscribers = list(self._subscribers.get(guild_id, ()))
+            for subscription in subscribers:
+                for verification in verifications:
+                    self._publish(subscription, 'verification', verification)
+                self._publish(subscription, 'stats', stats)
+
+    def _publish(self, subscription, event, data):
+        try:
+            subscription.events.put_nowait((event, data))
+            self.events_published += 1
+        except queue.Full:
+            subscription.lagged = True
+            self.events_dropped += 1
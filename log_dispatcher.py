@@ -0,0 +1,141 @@
+import asyncio
+from collections import Counter, defaultdict
+import discord
+
+# Discord accepts at most 10 embeds per message
+MAX_EMBEDS_PER_MESSAGE = 10
+
+class LogDispatcher:
+    """Per-guild log-channel sender that coalesces events into as few messages as possible.
+
+    Events are gathered for `window` seconds, then each guild gets one message with
+    up to 10 embeds. Bursts beyond that are folded into a summary embed, and once a
+    guild's queue is full further events are only counted.
+    """
+
+    def __init__(self, bot, window=2.0, max_queue=100):
+        self.bot = bot
+        self.window = window
+        self.max_queue = max_queue
+
+        self._queues = defaultdict(list)
+        self._overflow = defaultdict(Counter)
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._flushing = None
+
+        self.events_enqueued = 0
+        self.events_overflowed = 0
+        self.events_sent = 0
+        self.messages_sent = 0
+        self.send_errors = 0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop the background task, let a send in progress finish and send whatever is still queued"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flushing:
+            await self._flushing
+            self._flushing = None
+        await self.flush()
+
+    def enqueue(self, guild_id, embed):
+        """Queue an embed for the guild's log channel; never blocks"""
+        guild_id = str(guild_id)
+        self.events_enqueued += 1
+        queue = self._queues[guild_id]
+        if len(queue) >= self.max_queue:
+            # Backpressure: keep counts only
+            self._overflow[guild_id][embed.title] += 1
+            self.events_overflowed += 1
+        else:
+            queue.append(embed)
+        self._wakeup.set()
+
+    async def flush(self):
+        guild_ids = set(self._queues) | set(self._overflow)
+        for guild_id in guild_ids:
+            events = self._queues.pop(guild_id, [])
+            overflow = self._overflow.pop(guild_id, Counter())
+            if events or overflow:
+                await self._send(guild_id, events, overflow)
+
+    def stats(self):
+        return {
+            'queue_depth': sum(len(q) for q in self._queues.values()),
+            'overflow_pending': sum(sum(c.values()) for c in self._overflow.values()),
+            'events_enqueued': self.events_enqueued,
+            'events_overflowed': self.events_overflowed,
+            'messages_sent': self.messages_sent,
+            'messages_saved': self.events_sent - self.messages_sent,
+            'send_errors': self.send_errors
+        }
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            # Let the window fill up before sending
+            await asyncio.sleep(self.window)
+            self._wakeup.clear()
+            # Shielded: events are popped from the queues before they are sent, so
+            # cancelling mid-send would drop them; stop() waits for this instead
+            self._flushing = asyncio.ensure_future(self._flush_logged())
+            await asyncio.shield(self._flushing)
+
+    async def _flush_logged(self):
+        try:
+            await self.flush()
+        except Exception as e:
+            print(f"❌ Error flushing log dispatcher: {e}")
+
+    async def _send(self, guild_id, events, overflow):
+        from database import async_db
+        settings = await async_db.get_server_settings(guild_id)
+        if not settings or not settings['log_channel']:
+            print(f"ℹ️ No log channel configured for guild {guild_id}")
+            return
+
+        channel = self.bot.get_channel(int(settings['log_channel']))
+        if not channel:
+            print(f"⚠️ Could not find log channel {settings['log_channel']} in guild {guild_id}")
+            return
+
+        if len(events) <= MAX_EMBEDS_PER_MESSAGE and not overflow:
+            embeds = events
+        else:
+            # Keep the first events in full and condense the rest into counts
+            shown = events[:MAX_EMBEDS_PER_MESSAGE - 1]
+            condensed = Counter(embed.title for embed in events[len(shown):])
+            condensed.update(overflow)
+            embeds = shown + [self._summary_embed(condensed)]
+
+        try:
+            await channel.send(embeds=embeds)
+            count = len(events) + sum(overflow.values())
+            self.messages_sent += 1
+            self.events_sent += count
+            print(f"📝 Sent {count} log event(s) to channel {channel.id} in guild {guild_id}")
+        except Exception as e:
+            self.send_errors += 1
+            print(f"❌ Error sending log: {e}")
+
+    def _summary_embed(self, counts):
+        embed = discord.Embed(
+            title="📊 Verification Activity Summary",
+            description=f"**{sum(counts.values())}** more event(s) in the last {self.window:g}s",
+            color=0xF59E0B,
+            timestamp=discord.utils.utcnow()
+        )
+        for title, count in counts.most_common(25):
+            embed.add_field(name=title, value=f"`{count}`", inline=True)
+        embed.set_footer(text="VYNK Verification System")
+        return embed
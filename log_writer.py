@@ -0,0 +1,98 @@
+import threading
+import atexit
+import time
+from rollups import insert_verification_logs
+from db_connection import ConnectionManager
+
+class LogWriter:
+    """Write-behind buffer that groups verification log inserts into batched transactions"""
+
+    def __init__(self, db_path, batch_size=100, flush_interval=0.5, max_buffer=10000):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+
+        self.db = ConnectionManager.for_path(db_path)
+        self._buffer = []
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._closed = False
+
+        self.rows_written = 0
+        self.batches_written = 0
+
+        self._thread = threading.Thread(target=self._run, name="vynk-log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, row):
+        """Queue one (guild_id, user_id, user_name, method, status, timestamp) row"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Log writer is closed")
+            # Backpressure: block the producer while the buffer is full
+            while len(self._buffer) >= self.max_buffer:
+                self._cond.notify_all()
+                self._cond.wait()
+            self._buffer.append(row)
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify_all()
+
+    def flush(self):
+        """Synchronously write everything buffered so far"""
+        with self._write_lock:
+            with self._cond:
+                rows = self._buffer
+                self._buffer = []
+                self._cond.notify_all()
+            if not rows:
+                return
+            try:
+                self._write(rows)
+            except Exception:
+                # Put the batch back so the next flush retries it
+                with self._cond:
+                    self._buffer[:0] = rows
+                raise
+
+    def close(self):
+        """Stop the background thread and flush the remaining rows"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout=5)
+        self.flush()
+
+    @property
+    def conn(self):
+        return self.db.connection()
+
+    def pending(self):
+        with self._cond:
+            return len(self._buffer)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                while not self._closed and len(self._buffer) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                closed = self._closed
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"❌ Error flushing verification logs: {e}")
+            if closed:
+                return
+
+    def _write(self, rows):
+        with self.conn:
+            insert_verification_logs(self.conn, rows)
+        self.rows_written += len(rows)
+        self.batches_written += 1
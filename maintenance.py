@@ -0,0 +1,342 @@
+import argparse
+import gzip
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from db_connection import ConnectionManager
+from rollups import bump_guild_versions, create_archived_rollup_table, record_archived_logs
+
+# A run that hasn't finished after this long is assumed to have crashed
+STALE_RUN_AFTER = timedelta(hours=6)
+
+# Guild IDs reach the tables from URLs like /verify/<guild_id>; only snowflakes name archive directories
+SNOWFLAKE = re.compile(r'[0-9]{1,20}')
+
+def create_maintenance_tables(conn):
+    """Per-guild retention overrides and the single-row run lease"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS retention_policies (
+            guild_id TEXT PRIMARY KEY,
+            log_retention_days INTEGER,
+            session_retention_days INTEGER
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS maintenance_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            running_since TEXT,
+            last_run_at TEXT,
+            last_report TEXT
+        )
+    ''')
+    conn.execute('INSERT OR IGNORE INTO maintenance_state (id) VALUES (1)')
+    conn.commit()
+    create_archived_rollup_table(conn)
+
+class RetentionManager:
+    """Archives and deletes old verification_logs and verification_sessions rows.
+
+    Rows past their guild's retention are appended to monthly gzip NDJSON files
+    under archive_dir and then deleted in small transactions, pausing between
+    batches so bot and dashboard writers get the lock. Abandoned pending
+    sessions and expired geolocation_cache rows are deleted without archiving.
+    Rollup counters are left alone, so /server-stats totals still include
+    archived rows; archived log counts are also kept in archived_rollups so
+    `python rollups.py rebuild` includes them.
+    """
+
+    def __init__(self, db_path, archive_dir='archives', batch_size=500, pause=0.05,
+                 log_retention_days=365, session_retention_days=90, pending_session_ttl_hours=24,
+                 geolocation_ttl=86400, vacuum_pages=2000):
+        self.archive_dir = archive_dir
+        self.batch_size = batch_size
+        self.pause = pause
+        self.log_retention_days = log_retention_days
+        self.session_retention_days = session_retention_days
+        self.pending_session_ttl_hours = pending_session_ttl_hours
+        self.geolocation_ttl = geolocation_ttl
+        self.vacuum_pages = vacuum_pages
+
+        self.db = ConnectionManager.for_path(db_path)
+        create_maintenance_tables(self.db.connection())
+
+        self.last_report = None
+
+    @property
+    def conn(self):
+        return self.db.connection()
+
+    def set_policy(self, guild_id, log_retention_days=None, session_retention_days=None):
+        """Override retention for one guild; None falls back to the global default"""
+        with self.conn:
+            self.conn.execute('''
+                INSERT OR REPLACE INTO retention_policies (guild_id, log_retention_days, session_retention_days)
+                VALUES (?, ?, ?)
+            ''', (str(guild_id), log_retention_days, session_retention_days))
+
+    def get_policy(self, guild_id):
+        """Effective retention for a guild, in days"""
+        row = self.conn.execute('SELECT * FROM retention_policies WHERE guild_id = ?', (str(guild_id),)).fetchone()
+        return {
+            'log_retention_days': (row and row['log_retention_days']) or self.log_retention_days,
+            'session_retention_days': (row and row['session_retention_days']) or self.session_retention_days
+        }
+
+    def status(self):
+        row = self.conn.execute('SELECT * FROM maintenance_state WHERE id = 1').fetchone()
+        return {
+            'running_since': row['running_since'],
+            'last_run_at': row['last_run_at'],
+            'last_report': json.loads(row['last_report']) if row['last_report'] else None
+        }
+
+    def run(self):
+        """Archive, purge, vacuum and analyze; returns a report, or None if another run holds the lease"""
+        if not self._acquire():
+            print("ℹ️ Maintenance already running in another process, skipping")
+            return None
+
+        started = time.monotonic()
+        report = {}
+        try:
+            report['logs_archived'] = self.archive_logs()
+            report['sessions_archived'] = self.archive_sessions()
+            report['pending_sessions_deleted'] = self.purge_pending_sessions()
+            report['geolocation_rows_deleted'] = self.purge_geolocation_cache()
+            report['pages_vacuumed'] = self.incremental_vacuum()
+            self.analyze()
+        finally:
+            report['duration'] = round(time.monotonic() - started, 2)
+            self.last_report = report
+            self._release(report)
+        return report
+
+    def archive_logs(self):
+        if not self._table_exists('verification_logs'):
+            return 0
+        guild_ids = [row[0] for row in self.conn.execute('SELECT DISTINCT guild_id FROM verification_logs')]
+        archived = 0
+        for guild_id in guild_ids:
+            cutoff = (datetime.now() - timedelta(days=self.get_policy(guild_id)['log_retention_days'])).isoformat()
+            archived += self._archive_batches(
+                'verification_logs', 'id', 'timestamp',
+                'SELECT * FROM verification_logs WHERE guild_id IS ? AND timestamp < ? LIMIT ?',
+                (guild_id, cutoff)
+            )
+        return archived
+
+    def archive_sessions(self):
+        if not self._table_exists('verification_sessions'):
+            return 0
+        guild_ids = [row[0] for row in self.conn.execute('SELECT DISTINCT discord_guild_id FROM verification_sessions')]
+        archived = 0
+        for guild_id in guild_ids:
+            cutoff = (datetime.now() - timedelta(days=self.get_policy(guild_id)['session_retention_days'])).isoformat()
+            archived += self._archive_batches(
+                'verification_sessions', 'rowid', 'created_at',
+                '''SELECT rowid, * FROM verification_sessions
+                   WHERE discord_guild_id IS ? AND status != 'pending' AND created_at < ? LIMIT ?''',
+                (guild_id, cutoff)
+            )
+        return archived
+
+    def purge_pending_sessions(self):
+        """Delete portal visits that never completed; there is nothing worth archiving in them"""
+        if not self._table_exists('verification_sessions'):
+            return 0
+        cutoff = (datetime.now() - timedelta(hours=self.pending_session_ttl_hours)).isoformat()
+        deleted = 0
+        while True:
+            with self.conn:
+                cursor = self.conn.execute('''
+                    DELETE FROM verification_sessions WHERE rowid IN (
+                        SELECT rowid FROM verification_sessions
+                        WHERE status = 'pending' AND created_at < ? LIMIT ?
+                    )
+                ''', (cutoff, self.batch_size))
+            deleted += cursor.rowcount
+            if cursor.rowcount < self.batch_size:
+                return deleted
+            time.sleep(self.pause)
+
+    def purge_geolocation_cache(self):
+        """Delete persisted geolocation lookups older than the dashboard's cache TTL"""
+        if not self._table_exists('geolocation_cache'):
+            return 0
+        cutoff = time.time() - self.geolocation_ttl
+        deleted = 0
+        while True:
+            with self.conn:
+                cursor = self.conn.execute('''
+                    DELETE FROM geolocation_cache WHERE rowid IN (
+                        SELECT rowid FROM geolocation_cache WHERE fetched_at < ? LIMIT ?
+                    )
+                ''', (cutoff, self.batch_size))
+            deleted += cursor.rowcount
+            if cursor.rowcount < self.batch_size:
+                return deleted
+            time.sleep(self.pause)
+
+    def incremental_vacuum(self):
+        """Return free pages to the filesystem a chunk at a time"""
+        if self.conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+            print("ℹ️ auto_vacuum is not incremental; run `python maintenance.py vacuum` once to enable it")
+            return 0
+        freed = 0
+        while freed < self.vacuum_pages:
+            free_pages = self.conn.execute('PRAGMA freelist_count').fetchone()[0]
+            if not free_pages:
+                break
+            step = min(free_pages, self.batch_size, self.vacuum_pages - freed)
+            self.conn.execute(f'PRAGMA incremental_vacuum({step})').fetchall()
+            freed += step
+            time.sleep(self.pause)
+        # Fold the WAL back into the main file so the -wal file doesn't keep the old size
+        self.conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchall()
+        return freed
+
+    def analyze(self):
+        # Bounded per-index sampling keeps ANALYZE cheap on large tables
+        self.conn.execute('PRAGMA analysis_limit=1000')
+        self.conn.execute('ANALYZE')
+        self.conn.commit()
+
+    def full_vacuum(self):
+        """Switch the file to incremental auto_vacuum; rewrites the whole database once"""
+        self.conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+        self.conn.execute('VACUUM')
+
+    def _archive_batches(self, table, key, time_column, select_sql, params):
+        archived = 0
+        while True:
+            rows = self.conn.execute(select_sql, (*params, self.batch_size)).fetchall()
+            if not rows:
+                return archived
+            keys = [(row[key],) for row in rows]
+            self._append_archive(table, [dict(row) for row in rows], time_column)
+            # Delete only after the archive is on disk; a crash in between leaves duplicates, not gaps
+            with self.conn:
+                self.conn.executemany(f'DELETE FROM {table} WHERE {key} = ?', keys)
+                if table == 'verification_logs':
+                    bump_guild_versions(self.conn, [row['guild_id'] for row in rows])
+                    record_archived_logs(self.conn, rows)
+            archived += len(rows)
+            if len(rows) < self.batch_size:
+                return archived
+            time.sleep(self.pause)
+
+    def _append_archive(self, table, rows, time_column):
+        files = defaultdict(list)
+        for row in rows:
+            guild_id = str(row.get('guild_id') or row.get('discord_guild_id') or '')
+            if not SNOWFLAKE.fullmatch(guild_id):
+                guild_id = 'unknown'
+            month = (row[time_column] or 'unknown')[:7]
+            row.pop('rowid', None)
+            files[(guild_id, month)].append(row)
+
+        for (guild_id, month), month_rows in files.items():
+            directory = os.path.join(self.archive_dir, table, guild_id)
+            os.makedirs(directory, exist_ok=True)
+            # Appending adds a new gzip member; gzip readers treat the file as one stream
+            with open(os.path.join(directory, f"{month}.ndjson.gz"), 'ab') as f:
+                with gzip.GzipFile(fileobj=f, mode='ab') as gz:
+                    for row in month_rows:
+                        gz.write((json.dumps(row) + '\n').encode())
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _table_exists(self, name):
+        return self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+        ).fetchone() is not None
+
+    def _acquire(self):
+        now = datetime.now()
+        with self.conn:
+            cursor = self.conn.execute('''
+                UPDATE maintenance_state SET running_since = ?
+                WHERE id = 1 AND (running_since IS NULL OR running_since < ?)
+            ''', (now.isoformat(), (now - STALE_RUN_AFTER).isoformat()))
+        return cursor.rowcount == 1
+
+    def _release(self, report):
+        with self.conn:
+            self.conn.execute('''
+                UPDATE maintenance_state SET running_since = NULL, last_run_at = ?, last_report = ?
+                WHERE id = 1
+            ''', (datetime.now().isoformat(), json.dumps(report)))
+
+class MaintenanceScheduler:
+    """Background thread that runs RetentionManager.run() every `interval` seconds"""
+
+    def __init__(self, manager, interval=6 * 3600, initial_delay=300):
+        self.manager = manager
+        self.interval = interval
+        self.initial_delay = initial_delay
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="vynk-maintenance", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        delay = self.initial_delay
+        while not self._stop.wait(delay):
+            try:
+                report = self.manager.run()
+                if report:
+                    print(f"🧹 Maintenance finished: {report}")
+            except Exception as e:
+                print(f"❌ Maintenance run failed: {e}")
+            delay = self.interval
+
+def from_env(db_path):
+    """RetentionManager configured from VYNK_* environment variables"""
+    return RetentionManager(
+        db_path,
+        archive_dir=os.getenv('VYNK_ARCHIVE_DIR', 'archives'),
+        batch_size=int(os.getenv('VYNK_MAINTENANCE_BATCH_SIZE', 500)),
+        log_retention_days=int(os.getenv('VYNK_LOG_RETENTION_DAYS', 365)),
+        session_retention_days=int(os.getenv('VYNK_SESSION_RETENTION_DAYS', 90)),
+        pending_session_ttl_hours=int(os.getenv('VYNK_PENDING_SESSION_TTL_HOURS', 24)),
+        # Same variable the dashboard's GeolocationCache uses
+        geolocation_ttl=int(os.getenv('GEOLOCATION_CACHE_TTL', 86400))
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="VYNK database retention and maintenance")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('run', help="Archive old rows, purge pending sessions and expired geolocation lookups, vacuum and analyze")
+    commands.add_parser('vacuum', help="Enable incremental auto_vacuum with a one-off full VACUUM")
+    commands.add_parser('status', help="Show the last maintenance report")
+    policy = commands.add_parser('set-retention', help="Override retention for one guild")
+    policy.add_argument('guild_id')
+    policy.add_argument('--logs-days', type=int)
+    policy.add_argument('--sessions-days', type=int)
+    args = parser.parse_args()
+
+    path = os.getenv('VYNK_DB_PATH', 'vynk.db')
+    manager = from_env(path)
+    if args.command == 'run':
+        print(f"✅ Maintenance of {path} finished: {manager.run()}")
+    elif args.command == 'vacuum':
+        manager.full_vacuum()
+        print(f"✅ {path} now uses incremental auto_vacuum")
+    elif args.command == 'status':
+        print(json.dumps(manager.status(), indent=2))
+    elif args.command == 'set-retention':
+        manager.set_policy(args.guild_id, args.logs_days, args.sessions_days)
+        print(f"✅ Retention for guild {args.guild_id}: {manager.get_policy(args.guild_id)}")
@@ -0,0 +1,170 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+# Discord's ADMINISTRATOR permission bit
+ADMINISTRATOR = 0x8
+
+class TokenRevoked(Exception):
+    """Discord rejected a refresh token with invalid_grant; only a new login will help"""
+
+class OAuthSessionManager:
+    """Keeps dashboard users' Discord access tokens fresh and their admin-guild lists cached.
+
+    get_admin_guilds() serves each user's list from memory for `guild_ttl`
+    seconds. A background thread refreshes tokens that expire within
+    `refresh_margin` seconds for users active in the last `active_window`
+    seconds, and deletes user_sessions rows whose token expired more than
+    `purge_after` seconds ago.
+    """
+
+    def __init__(self, db, oauth, guild_ttl=300, refresh_margin=600, refresh_interval=300,
+                 active_window=3600, purge_after=7 * 86400):
+        self.db = db
+        self.oauth = oauth
+        self.guild_ttl = guild_ttl
+        self.refresh_margin = refresh_margin
+        self.refresh_interval = refresh_interval
+        self.active_window = active_window
+        self.purge_after = purge_after
+
+        self._lock = threading.Lock()
+        self._user_locks = {}
+        self._guilds = {}
+        self._last_seen = {}
+        self._thread = None
+
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.tokens_refreshed = 0
+        self.refresh_failures = 0
+        self.sessions_revoked = 0
+        self.sessions_purged = 0
+
+    def get_admin_guilds(self, user_id):
+        """Guilds where the user is an administrator, or None if they need to log in again"""
+        self._start()
+        now = time.monotonic()
+        with self._lock:
+            self._last_seen[user_id] = now
+            entry = self._guilds.get(user_id)
+            if entry and entry[0] > now:
+                self.cache_hits += 1
+                return entry[1]
+            user_lock = self._user_locks.setdefault(user_id, threading.Lock())
+
+        # One Discord call per user even when several tabs load at once
+        with user_lock:
+            with self._lock:
+                entry = self._guilds.get(user_id)
+                if entry and entry[0] > time.monotonic():
+                    self.cache_hits += 1
+                    return entry[1]
+                self.cache_misses += 1
+
+            access_token = self._valid_access_token(user_id)
+            if not access_token:
+                return None
+            guilds = self.oauth.get_user_guilds(access_token)
+            if guilds is None:
+                return None
+
+            admin_guilds = [g for g in guilds if (int(g['permissions']) & ADMINISTRATOR) == ADMINISTRATOR]
+            with self._lock:
+                self._guilds[user_id] = (time.monotonic() + self.guild_ttl, admin_guilds)
+            return admin_guilds
+
+    def forget(self, user_id):
+        """Drop a user's cached guilds, e.g. on logout"""
+        with self._lock:
+            self._guilds.pop(user_id, None)
+            self._last_seen.pop(user_id, None)
+            self._user_locks.pop(user_id, None)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.cache_hits + self.cache_misses
+            return {
+                'cached_users': len(self._guilds),
+                'cache_hits': self.cache_hits,
+                'cache_misses': self.cache_misses,
+                'hit_ratio': round(self.cache_hits / lookups, 3) if lookups else 0,
+                'tokens_refreshed': self.tokens_refreshed,
+                'refresh_failures': self.refresh_failures,
+                'sessions_revoked': self.sessions_revoked,
+                'sessions_purged': self.sessions_purged
+            }
+
+    def _valid_access_token(self, user_id):
+        row = self.db.get_user_session(user_id)
+        if not row:
+            return None
+        expires_at = datetime.fromisoformat(row['expires_at'])
+        if expires_at - timedelta(seconds=self.refresh_margin) > datetime.now():
+            return row['access_token']
+        # Expired or about to: refresh now rather than send a dead token to Discord
+        return self._refresh(user_id, row['refresh_token'])
+
+    def _refresh(self, user_id, refresh_token):
+        try:
+            token_data = self.oauth.refresh_token(refresh_token)
+            revoked = False
+        except TokenRevoked:
+            token_data, revoked = None, True
+        if not token_data:
+            self.refresh_failures += 1
+            row = self.db.get_user_session(user_id)
+            if row and row['refresh_token'] != refresh_token:
+                # Another process rotated the token first
+                return row['access_token']
+            if not revoked:
+                # Timeout, 429 or 5xx: keep the session and retry on the next request or refresh pass
+                if row and datetime.fromisoformat(row['expires_at']) > datetime.now():
+                    return row['access_token']
+                return None
+            if row:
+                self.db.delete_user_session(user_id)
+                self.sessions_revoked += 1
+            self.forget(user_id)
+            return None
+
+        self.db.update_user_tokens(
+            user_id,
+            token_data['access_token'],
+            token_data.get('refresh_token', refresh_token),
+            token_data['expires_in']
+        )
+        self.tokens_refreshed += 1
+        return token_data['access_token']
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="vynk-oauth-sessions", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.refresh_interval)
+            try:
+                self._refresh_active()
+                self.sessions_purged += self.db.purge_user_sessions(
+                    (datetime.now() - timedelta(seconds=self.purge_after)).isoformat()
+                )
+            except Exception as e:
+                print(f"❌ OAuth session maintenance failed: {e}")
+
+    def _refresh_active(self):
+        now = time.monotonic()
+        with self._lock:
+            for user_id, seen in list(self._last_seen.items()):
+                if now - seen > self.active_window:
+                    del self._last_seen[user_id]
+                    self._guilds.pop(user_id, None)
+                    self._user_locks.pop(user_id, None)
+            active = set(self._last_seen)
+
+        deadline = (datetime.now() + timedelta(seconds=self.refresh_margin + self.refresh_interval)).isoformat()
+        for row in self.db.get_expiring_user_sessions(deadline):
+            if row['user_id'] in active:
+                self._refresh(row['user_id'], row['refresh_token'])
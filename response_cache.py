@@ -0,0 +1,59 @@
+import threading
+import time
+from collections import OrderedDict
+
+class ResponseCache:
+    """Small LRU cache of serialized API responses.
+
+    Keys include the guild's data version, so a write makes old entries
+    unreachable rather than stale; they age out through LRU eviction or the
+    TTL.
+    """
+
+    def __init__(self, max_entries=1024, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, body):
+        with self._lock:
+            self._entries[key] = (body, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def stats(self):
+        with self._lock:
+            requests = self.hits + self.misses + self.not_modified
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'not_modified': self.not_modified,
+                # A 304 is served without touching the database or the cache body
+                'hit_ratio': round((self.hits + self.not_modified) / requests, 3) if requests else 0,
+                'entries': len(self._entries),
+                'evictions': self.evictions
+            }
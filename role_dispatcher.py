@@ -0,0 +1,90 @@
+import asyncio
+import threading
+
+class RoleAssignmentDispatcher:
+    """Runs role-assignment coroutines on the bot's event loop and hands each caller a future.
+
+    At most max_concurrency assignments run at once; callers asking for the same
+    (guild_id, user_id) while one is in flight share its future. Every assignment
+    finishes within `timeout` seconds, including time spent waiting for a slot.
+    """
+
+    def __init__(self, handler, max_concurrency=8, timeout=10):
+        self.handler = handler
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.loop = None
+
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._semaphore = None
+
+        self.submitted = 0
+        self.coalesced = 0
+        self.completed = 0
+        self.timeouts = 0
+
+    def attach(self, loop):
+        """Bind the dispatcher to the event loop the handler must run on"""
+        self.loop = loop
+        self._semaphore = None
+
+    def submit(self, guild_id, user_id):
+        """Schedule an assignment from any thread; returns a concurrent.futures.Future"""
+        if self.loop is None:
+            raise RuntimeError("Dispatcher is not attached to an event loop")
+
+        key = (str(guild_id), str(user_id))
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future
+
+            self.submitted += 1
+            future = asyncio.run_coroutine_threadsafe(self._run(*key), self.loop)
+            self._inflight[key] = future
+
+        future.add_done_callback(lambda f: self._finish(key, f))
+        return future
+
+    def assign(self, guild_id, user_id):
+        """Submit and wait for the result dict, blocking the calling thread"""
+        future = self.submit(guild_id, user_id)
+        try:
+            # _run enforces the timeout on the loop; the margin only covers scheduling delay
+            return future.result(timeout=self.timeout + 1)
+        except Exception as e:
+            return {'success': False, 'error': str(e) or 'Operation timeout'}
+
+    def stats(self):
+        with self._lock:
+            return {
+                'submitted': self.submitted,
+                'coalesced': self.coalesced,
+                'completed': self.completed,
+                'timeouts': self.timeouts,
+                'in_flight': len(self._inflight),
+                'max_concurrency': self.max_concurrency
+            }
+
+    async def _run(self, guild_id, user_id):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def limited():
+            async with self._semaphore:
+                return await self.handler(guild_id, user_id)
+
+        try:
+            return await asyncio.wait_for(limited(), self.timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            return {'success': False, 'error': 'Operation timeout'}
+
+    def _finish(self, key, future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+            self.completed += 1
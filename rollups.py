@@ -0,0 +1,171 @@
+import os
+import sys
+from datetime import datetime, timedelta
+from db_connection import ConnectionManager
+
+INSERT_LOG_SQL = '''
+    INSERT INTO verification_logs
+    (guild_id, user_id, user_name, method, status, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+UPSERT_ROLLUP_SQL = '''
+    INSERT INTO verification_rollups (guild_id, bucket, method, status, count)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (guild_id, bucket, method, status)
+    DO UPDATE SET count = count + excluded.count
+'''
+
+UPSERT_ARCHIVED_SQL = '''
+    INSERT INTO archived_rollups (guild_id, bucket, method, status, count)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (guild_id, bucket, method, status)
+    DO UPDATE SET count = count + excluded.count
+'''
+
+BUMP_GUILD_VERSION_SQL = '''
+    INSERT INTO guild_versions (guild_id, version) VALUES (?, 1)
+    ON CONFLICT (guild_id) DO UPDATE SET version = version + 1
+'''
+
+def bucket_for(timestamp):
+    """Hourly bucket key for an isoformat() timestamp, e.g. '2024-05-01T13'"""
+    return timestamp[:13]
+
+def create_rollup_table(conn):
+    """Create the per-guild hourly rollup table, backfilling it from existing logs on first use"""
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'verification_rollups'"
+        ).fetchone()
+        if not exists:
+            conn.execute('''
+                CREATE TABLE verification_rollups (
+                    guild_id TEXT,
+                    bucket TEXT,
+                    method TEXT,
+                    status TEXT,
+                    count INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (guild_id, bucket, method, status)
+                )
+            ''')
+            _backfill(conn)
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+
+def create_archived_rollup_table(conn):
+    """Hourly counts of log rows moved to archives, so rebuild_rollups keeps counting them"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS archived_rollups (
+            guild_id TEXT,
+            bucket TEXT,
+            method TEXT,
+            status TEXT,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (guild_id, bucket, method, status)
+        )
+    ''')
+    conn.commit()
+
+def create_guild_versions_table(conn):
+    """Per-guild counter bumped whenever a guild's verification logs change"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS guild_versions (
+            guild_id TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+    ''')
+    conn.commit()
+
+def bump_guild_versions(conn, guild_ids):
+    """Bump the version of each guild; call inside the transaction that changes its logs"""
+    conn.executemany(BUMP_GUILD_VERSION_SQL, [(guild_id,) for guild_id in set(guild_ids)])
+
+def get_guild_version(conn, guild_id):
+    row = conn.execute('SELECT version FROM guild_versions WHERE guild_id = ?', (guild_id,)).fetchone()
+    return row[0] if row else 0
+
+def insert_verification_logs(conn, rows):
+    """Insert log rows, bump their rollup counters and guild versions; the caller owns the transaction"""
+    conn.executemany(INSERT_LOG_SQL, rows)
+
+    counts = {}
+    for guild_id, user_id, user_name, method, status, timestamp in rows:
+        key = (guild_id, bucket_for(timestamp), method, status)
+        counts[key] = counts.get(key, 0) + 1
+    conn.executemany(UPSERT_ROLLUP_SQL, [key + (count,) for key, count in counts.items()])
+    bump_guild_versions(conn, [row[0] for row in rows])
+
+def record_archived_logs(conn, rows):
+    """Count log rows by bucket before they're deleted; call inside the deleting transaction"""
+    counts = {}
+    for row in rows:
+        key = (row['guild_id'], bucket_for(row['timestamp']), row['method'], row['status'])
+        counts[key] = counts.get(key, 0) + 1
+    conn.executemany(UPSERT_ARCHIVED_SQL, [key + (count,) for key, count in counts.items()])
+
+def rebuild_rollups(conn):
+    """Recompute every rollup bucket from verification_logs plus archived counts, in one transaction"""
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        conn.execute('DELETE FROM verification_rollups')
+        _backfill(conn)
+        # Archived rows are gone from verification_logs but still count towards the totals
+        conn.execute('''
+            INSERT INTO verification_rollups (guild_id, bucket, method, status, count)
+            SELECT guild_id, bucket, method, status, count FROM archived_rollups WHERE true
+            ON CONFLICT (guild_id, bucket, method, status)
+            DO UPDATE SET count = count + excluded.count
+        ''')
+        conn.execute('UPDATE guild_versions SET version = version + 1')
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+    return conn.execute('SELECT COUNT(*) FROM verification_rollups').fetchone()[0]
+
+def query_server_stats(conn, guild_id):
+    """Verification totals for a guild, read from rollup buckets only"""
+    # The 24h figure has hourly granularity: it includes the whole bucket the cutoff falls in
+    since = bucket_for((datetime.now() - timedelta(days=1)).isoformat())
+
+    total, success, failed, recent = conn.execute('''
+        SELECT COALESCE(SUM(count), 0),
+               COALESCE(SUM(CASE WHEN status = 'success' THEN count END), 0),
+               COALESCE(SUM(CASE WHEN status = 'failed' THEN count END), 0),
+               COALESCE(SUM(CASE WHEN bucket >= ? THEN count END), 0)
+        FROM verification_rollups
+        WHERE guild_id = ?
+    ''', (since, guild_id)).fetchone()
+
+    return {
+        'total_verifications': total,
+        'success_verifications': success,
+        'failed_verifications': failed,
+        'recent_verifications': recent,
+        'success_rate': round((success / total * 100) if total > 0 else 0, 1)
+    }
+
+def _backfill(conn):
+    conn.execute('''
+        INSERT INTO verification_rollups (guild_id, bucket, method, status, count)
+        SELECT guild_id, substr(timestamp, 1, 13), method, status, COUNT(*)
+        FROM verification_logs
+        GROUP BY guild_id, substr(timestamp, 1, 13), method, status
+    ''')
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ['rebuild']:
+        print("Usage: python rollups.py rebuild")
+        sys.exit(1)
+
+    path = os.getenv('VYNK_DB_PATH', 'vynk.db')
+    conn = ConnectionManager.for_path(path).connection()
+    create_rollup_table(conn)
+    create_archived_rollup_table(conn)
+    create_guild_versions_table(conn)
+    buckets = rebuild_rollups(conn)
+    print(f"✅ Rebuilt verification rollups in {path}: {buckets} bucket rows")
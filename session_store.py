@@ -0,0 +1,109 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+class VerificationSessionStore:
+    """Bounded in-memory map of active web verification sessions, keyed by session_id.
+
+    Portal visits only create an entry here. A row is written to
+    verification_sessions when a session completes, or when it expires after
+    reaching a non-pending outcome; abandoned visits are never persisted.
+    """
+
+    def __init__(self, db, ttl=900, max_sessions=10000):
+        self.db = db
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()
+        # Expired sessions with an outcome are written off the request thread
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vynk-session-writer")
+
+        self.created = 0
+        self.completed = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def create(self, session_id, discord_user_id, discord_guild_id, ip_address):
+        entry = {
+            'session_id': session_id,
+            'discord_user_id': discord_user_id,
+            'discord_guild_id': discord_guild_id,
+            'status': 'pending',
+            'ip_address': ip_address,
+            'geolocation_data': None,
+            'created_at': datetime.now().isoformat(),
+            'completed_at': None
+        }
+        with self._lock:
+            self._prune()
+            self._sessions[session_id] = (entry, time.monotonic() + self.ttl)
+            while len(self._sessions) > self.max_sessions:
+                _, (oldest, _) = self._sessions.popitem(last=False)
+                self.evicted += 1
+                self._persist_later(oldest)
+            self.created += 1
+        return entry
+
+    def get(self, session_id):
+        """The active session, or None if it is unknown or expired"""
+        with self._lock:
+            item = self._sessions.get(session_id)
+            if item is None or item[1] < time.monotonic():
+                return None
+            return item[0]
+
+    def mark(self, session_id, status):
+        """Record an outcome without ending the session; it is persisted if the session expires"""
+        with self._lock:
+            item = self._sessions.get(session_id)
+            if item:
+                item[0]['status'] = status
+
+    def complete(self, session_id, status, geolocation_data=None):
+        """End a session and persist it; returns the stored row, or None if the session isn't active"""
+        with self._lock:
+            item = self._sessions.pop(session_id, None)
+        if item is None or item[1] < time.monotonic():
+            return None
+
+        entry = item[0]
+        entry['status'] = status
+        entry['geolocation_data'] = geolocation_data
+        entry['completed_at'] = datetime.now().isoformat()
+        self.db.save_verification_session(entry)
+        self.completed += 1
+        return entry
+
+    def stats(self):
+        with self._lock:
+            return {
+                'active': len(self._sessions),
+                'created': self.created,
+                'completed': self.completed,
+                'expired': self.expired,
+                'evicted': self.evicted
+            }
+
+    def _prune(self):
+        # Entries are in creation order and share one TTL, so expired ones are at the front
+        now = time.monotonic()
+        while self._sessions:
+            session_id, (entry, expires) = next(iter(self._sessions.items()))
+            if expires >= now:
+                break
+            del self._sessions[session_id]
+            self.expired += 1
+            self._persist_later(entry)
+
+    def _persist_later(self, entry):
+        if entry['status'] != 'pending':
+            self._writer.submit(self._persist, entry)
+
+    def _persist(self, entry):
+        try:
+            self.db.save_verification_session(entry)
+        except Exception as e:
+            print(f"❌ Error persisting verification session {entry['session_id']}: {e}")
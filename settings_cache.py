@@ -0,0 +1,93 @@
+import threading
+import time
+from db_connection import ConnectionManager
+
+def create_settings_version_table(conn):
+    """Single-row counter bumped whenever any guild's server_settings change"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS settings_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+    ''')
+    conn.execute('INSERT OR IGNORE INTO settings_version (id, version) VALUES (1, 0)')
+    conn.commit()
+
+def bump_settings_version(cursor):
+    """Bump the settings version; call inside the transaction that changes server_settings"""
+    cursor.execute('UPDATE settings_version SET version = version + 1 WHERE id = 1')
+
+class SettingsCache:
+    """Read-through cache of server_settings rows shared by the bot and the web dashboard.
+
+    Writers in this process call invalidate() directly. Changes made by another
+    process are picked up by re-reading settings_version at most once per
+    check_interval seconds.
+    """
+
+    def __init__(self, db_path, check_interval=1.0):
+        self.db = ConnectionManager.for_path(db_path)
+        create_settings_version_table(self.db.connection())
+
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._version = None
+        self._checked_at = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def conn(self):
+        return self.db.read_connection()
+
+    def get(self, guild_id):
+        """Settings for a guild as a dict, or None if the guild isn't configured"""
+        guild_id = str(guild_id)
+        with self._lock:
+            self._check_version()
+            if guild_id in self._entries:
+                self.hits += 1
+                return self._entries[guild_id]
+
+            self.misses += 1
+            row = self.conn.execute('SELECT * FROM server_settings WHERE guild_id = ?', (guild_id,)).fetchone()
+            settings = dict(row) if row else None
+            self._entries[guild_id] = settings
+            return settings
+
+    def invalidate(self, guild_id=None):
+        with self._lock:
+            if guild_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(str(guild_id), None)
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else 0,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+                'version': self._version
+            }
+
+    def _check_version(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+
+        row = self.conn.execute('SELECT version FROM settings_version WHERE id = 1').fetchone()
+        version = row[0] if row else 0
+        if version != self._version:
+            self._entries.clear()
+            if self._version is not None:
+                self.invalidations += 1
+            self._version = version
@@ -1,12 +1,31 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
-import sqlite3
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, Response
 import json
+import base64
+import csv
+import io
+import zlib
+import hashlib
 from datetime import datetime, timedelta
 import os
-from dotenv import load_dotenv
 import requests
+import signal
+import sys
+from dotenv import load_dotenv
 import uuid
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from rollups import create_rollup_table, create_guild_versions_table, get_guild_version, insert_verification_logs, query_server_stats, bucket_for
+from settings_cache import SettingsCache, create_settings_version_table
+from geo_cache import GeolocationCache
+from http_client import http_client
+from discord_rest import DiscordREST
+from db_connection import ConnectionManager
+from live_feed import LiveFeed
+from response_cache import ResponseCache
+from oauth_sessions import OAuthSessionManager, TokenRevoked
+from session_store import VerificationSessionStore
+from backlog_jobs import BacklogJobManager, parse_joined_before
 
 load_dotenv()
 
@@ -27,11 +46,55 @@ DISCORD_API_BASE_URL = 'https://discord.com/api/v10'
 ABSTRACT_API_KEY = os.getenv('ABSTRACT_API_KEY')
 ABSTRACT_API_URL = "https://ipgeolocation.abstractapi.com/v1/"
 
+# SQLite database shared with the bot process
+DATABASE_PATH = os.getenv('VYNK_DB_PATH', 'vynk.db')
+
+# Upper bound for /api/verifications page size
+MAX_VERIFICATIONS_PAGE = 100
+
+# Columns of /api/export; geolocation fields come from the user's completed web session
+EXPORT_FIELDS = ['id', 'user_id', 'user_name', 'method', 'status', 'timestamp',
+                 'country', 'region', 'city', 'isp', 'vpn_detected']
+
+def encode_cursor(timestamp, row_id):
+    """Opaque pagination cursor for the (timestamp, id) position of the last row on a page"""
+    return base64.urlsafe_b64encode(json.dumps([timestamp, row_id]).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    try:
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if not isinstance(timestamp, str) or not isinstance(row_id, int):
+            raise ValueError
+        return timestamp, row_id
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+def normalize_time_filter(value):
+    """Parse a since/until value into the naive local isoformat() form verification_logs stores"""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    # Stored timestamps are compared as strings, so match their 'T' separator
+    return parsed.isoformat()
+
 class DashboardDB:
-    def __init__(self):
-        self.conn = sqlite3.connect('vynk.db', check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
+    def __init__(self, path=DATABASE_PATH):
+        # Per-thread connections for waitress workers; dashboard reads use read-only ones
+        self.db = ConnectionManager.for_path(path)
         self.create_tables()
+        
+        # Picks up /setup-* changes made by the bot process via settings_version
+        self.settings_cache = SettingsCache(path)
+    
+    @property
+    def conn(self):
+        return self.db.connection()
+    
+    @property
+    def read_conn(self):
+        return self.db.read_connection()
     
     def create_tables(self):
         cursor = self.conn.cursor()
@@ -60,6 +123,18 @@ class DashboardDB:
             )
         ''')
         
+        # Covering index for per-guild stats queries
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_verification_logs_guild_status_ts
+            ON verification_logs (guild_id, status, timestamp)
+        ''')
+        
+        # Keyset pagination index for /api/verifications
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_verification_logs_guild_ts_id
+            ON verification_logs (guild_id, timestamp, id)
+        ''')
+        
         # Verification sessions table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS verification_sessions (
@@ -74,6 +149,18 @@ class DashboardDB:
             )
         ''')
         
+        # Geolocation lookup for /api/export rows
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_verification_sessions_guild_user
+            ON verification_sessions (discord_guild_id, discord_user_id, completed_at)
+        ''')
+        
+        # Per-guild lookups and retention scans over persisted sessions
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_verification_sessions_guild_status_created
+            ON verification_sessions (discord_guild_id, status, created_at)
+        ''')
+        
         # User sessions table for OAuth
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS user_sessions (
@@ -86,6 +173,12 @@ class DashboardDB:
         ''')
         
         self.conn.commit()
+        
+        # Per-guild hourly counters read by get_server_stats
+        create_rollup_table(self.conn)
+        create_guild_versions_table(self.conn)
+        
+        create_settings_version_table(self.conn)
     
     def save_user_session(self, user_id, access_token, refresh_token, expires_in, user_data):
         cursor = self.conn.cursor()
@@ -99,71 +192,56 @@ class DashboardDB:
         self.conn.commit()
     
     def get_user_session(self, user_id):
-        cursor = self.conn.cursor()
+        cursor = self.read_conn.cursor()
         cursor.execute('SELECT * FROM user_sessions WHERE user_id = ?', (user_id,))
         return cursor.fetchone()
     
-    def create_verification_session(self, session_id, discord_user_id, discord_guild_id, ip_address):
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            INSERT OR REPLACE INTO verification_sessions 
-            (session_id, discord_user_id, discord_guild_id, ip_address, created_at)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (session_id, discord_user_id, discord_guild_id, ip_address, datetime.now().isoformat()))
-        self.conn.commit()
+    def update_user_tokens(self, user_id, access_token, refresh_token, expires_in):
+        expires_at = datetime.now() + timedelta(seconds=expires_in)
+        with self.conn:
+            self.conn.execute('''
+                UPDATE user_sessions SET access_token = ?, refresh_token = ?, expires_at = ?
+                WHERE user_id = ?
+            ''', (access_token, refresh_token, expires_at.isoformat(), user_id))
     
-    def update_verification_session(self, session_id, status, geolocation_data=None):
-        cursor = self.conn.cursor()
-        if geolocation_data:
-            cursor.execute('''
-                UPDATE verification_sessions 
-                SET status = ?, geolocation_data = ?, completed_at = ?
-                WHERE session_id = ?
-            ''', (status, json.dumps(geolocation_data), datetime.now().isoformat(), session_id))
-        else:
-            cursor.execute('''
-                UPDATE verification_sessions 
-                SET status = ?, completed_at = ?
-                WHERE session_id = ?
-            ''', (status, datetime.now().isoformat(), session_id))
-        self.conn.commit()
+    def delete_user_session(self, user_id):
+        with self.conn:
+            self.conn.execute('DELETE FROM user_sessions WHERE user_id = ?', (user_id,))
+    
+    def get_expiring_user_sessions(self, before):
+        cursor = self.read_conn.cursor()
+        cursor.execute('SELECT user_id, refresh_token FROM user_sessions WHERE expires_at < ?', (before,))
+        return cursor.fetchall()
+    
+    def purge_user_sessions(self, expired_before):
+        """Delete sessions whose access token expired before the given time; returns the count"""
+        with self.conn:
+            return self.conn.execute('DELETE FROM user_sessions WHERE expires_at < ?', (expired_before,)).rowcount
+    
+    def save_verification_session(self, entry):
+        """Write a finished session from VerificationSessionStore"""
+        with self.conn:
+            self.conn.execute('''
+                INSERT OR REPLACE INTO verification_sessions
+                (session_id, discord_user_id, discord_guild_id, status, ip_address, geolocation_data, created_at, completed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                entry['session_id'],
+                entry['discord_user_id'],
+                entry['discord_guild_id'],
+                entry['status'],
+                entry['ip_address'],
+                json.dumps(entry['geolocation_data']) if entry['geolocation_data'] else None,
+                entry['created_at'],
+                entry['completed_at']
+            ))
+    
+    def get_guild_version(self, guild_id):
+        return get_guild_version(self.read_conn, guild_id)
     
     def get_server_stats(self, guild_id):
-        cursor = self.conn.cursor()
-        
         try:
-            # Total verifications
-            cursor.execute('SELECT COUNT(*) as total FROM verification_logs WHERE guild_id = ?', (guild_id,))
-            total_result = cursor.fetchone()
-            total_verifications = total_result[0] if total_result else 0
-            
-            # Successful verifications
-            cursor.execute('SELECT COUNT(*) as success FROM verification_logs WHERE guild_id = ? AND status = "success"', (guild_id,))
-            success_result = cursor.fetchone()
-            success_verifications = success_result[0] if success_result else 0
-            
-            # Failed verifications
-            cursor.execute('SELECT COUNT(*) as failed FROM verification_logs WHERE guild_id = ? AND status = "failed"', (guild_id,))
-            failed_result = cursor.fetchone()
-            failed_verifications = failed_result[0] if failed_result else 0
-            
-            # Recent verifications (last 24 hours)
-            cursor.execute('''
-                SELECT COUNT(*) as recent FROM verification_logs 
-                WHERE guild_id = ? AND timestamp > datetime('now', '-1 day')
-            ''', (guild_id,))
-            recent_result = cursor.fetchone()
-            recent_verifications = recent_result[0] if recent_result else 0
-            
-            success_rate = round((success_verifications / total_verifications * 100) if total_verifications > 0 else 0, 1)
-            
-            return {
-                'total_verifications': total_verifications,
-                'success_verifications': success_verifications,
-                'failed_verifications': failed_verifications,
-                'recent_verifications': recent_verifications,
-                'success_rate': success_rate
-            }
+            return query_server_stats(self.read_conn, guild_id)
         except Exception as e:
             print(f"Error getting server stats: {e}")
             return {
@@ -175,25 +253,92 @@ class DashboardDB:
             }
     
     def get_recent_verifications(self, guild_id, limit=10):
-        cursor = self.conn.cursor()
         try:
-            cursor.execute('''
-                SELECT user_name, method, status, timestamp 
-                FROM verification_logs 
-                WHERE guild_id = ? 
-                ORDER BY timestamp DESC 
-                LIMIT ?
-            ''', (guild_id, limit))
-            return cursor.fetchall()
+            return self.get_verifications_page(guild_id, limit)[0]
         except Exception as e:
             print(f"Error getting recent verifications: {e}")
             return []
     
+    def get_verifications_page(self, guild_id, limit=10, cursor=None, method=None, status=None, since=None, until=None):
+        """One page of a guild's logs, newest first, and the cursor for the next page (or None).
+        
+        Seeks on (timestamp, id) through idx_verification_logs_guild_ts_id, so a page
+        costs the same however deep into the history it is.
+        """
+        conditions = ['guild_id = ?']
+        params = [guild_id]
+        if method:
+            conditions.append('method = ?')
+            params.append(method)
+        if status:
+            conditions.append('status = ?')
+            params.append(status)
+        if since:
+            conditions.append('timestamp >= ?')
+            params.append(since)
+        if until:
+            conditions.append('timestamp < ?')
+            params.append(until)
+        if cursor:
+            conditions.append('(timestamp, id) < (?, ?)')
+            params.extend(decode_cursor(cursor))
+        
+        # Fetch one extra row to know whether another page exists
+        rows = self.read_conn.execute(f'''
+            SELECT id, user_name, method, status, timestamp
+            FROM verification_logs
+            WHERE {' AND '.join(conditions)}
+            ORDER BY timestamp DESC, id DESC
+            LIMIT ?
+        ''', (*params, limit + 1)).fetchall()
+        
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return rows, encode_cursor(rows[-1]['timestamp'], rows[-1]['id'])
+        return rows, None
+    
+    def iter_verification_export(self, guild_id, since=None, until=None, batch_size=1000):
+        """Yield a guild's logs oldest first in lists of up to batch_size rows.
+        
+        Rows are pulled from one open cursor with fetchmany, so memory use doesn't
+        grow with the size of the guild's history.
+        """
+        conditions = ['l.guild_id = ?']
+        params = [guild_id]
+        if since:
+            conditions.append('l.timestamp >= ?')
+            params.append(since)
+        if until:
+            conditions.append('l.timestamp < ?')
+            params.append(until)
+        
+        cursor = self.read_conn.cursor()
+        try:
+            cursor.execute(f'''
+                SELECT l.id, l.user_id, l.user_name, l.method, l.status, l.timestamp,
+                       CASE WHEN l.method = 'web' THEN (
+                           -- The session this log entry recorded: the user's last one completed before it
+                           SELECT s.geolocation_data FROM verification_sessions s
+                           WHERE s.discord_guild_id = l.guild_id AND s.discord_user_id = l.user_id
+                             AND s.status = 'completed' AND s.completed_at <= l.timestamp
+                           ORDER BY s.completed_at DESC
+                           LIMIT 1
+                       ) END AS geolocation_data
+                FROM verification_logs l
+                WHERE {' AND '.join(conditions)}
+                ORDER BY l.timestamp, l.id
+            ''', params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            cursor.close()
+    
     def get_server_settings(self, guild_id):
-        cursor = self.conn.cursor()
         try:
-            cursor.execute('SELECT * FROM server_settings WHERE guild_id = ?', (guild_id,))
-            return cursor.fetchone()
+            return self.settings_cache.get(guild_id)
         except Exception as e:
             print(f"Error getting server settings: {e}")
             return None
@@ -233,16 +378,48 @@ class DiscordOAuth:
             'Content-Type': 'application/x-www-form-urlencoded'
         }
         
-        response = requests.post(f'{DISCORD_API_BASE_URL}/oauth2/token', data=data, headers=headers)
+        response = http_client.post(f'{DISCORD_API_BASE_URL}/oauth2/token', data=data, headers=headers)
         return response.json() if response.status_code == 200 else None
     
+    @staticmethod
+    def refresh_token(refresh_token):
+        """New token data, or None if Discord couldn't be reached or answered with 429/5xx.
+        
+        Raises TokenRevoked when the refresh token itself was rejected.
+        """
+        data = {
+            'client_id': DISCORD_CLIENT_ID,
+            'client_secret': DISCORD_CLIENT_SECRET,
+            'grant_type': 'refresh_token',
+            'refresh_token': refresh_token
+        }
+        headers = {
+            'Content-Type': 'application/x-www-form-urlencoded'
+        }
+        
+        try:
+            response = http_client.post(f'{DISCORD_API_BASE_URL}/oauth2/token', data=data, headers=headers)
+        except requests.RequestException as e:
+            print(f"⚠️ Discord token refresh failed: {e}")
+            return None
+        if response.status_code == 200:
+            return response.json()
+        if response.status_code == 400:
+            try:
+                error = response.json().get('error')
+            except ValueError:
+                error = None
+            if error == 'invalid_grant':
+                raise TokenRevoked()
+        return None
+    
     @staticmethod
     def get_user_info(access_token):
         headers = {
             'Authorization': f'Bearer {access_token}'
         }
         
-        response = requests.get(f'{DISCORD_API_BASE_URL}/users/@me', headers=headers)
+        response = http_client.get(f'{DISCORD_API_BASE_URL}/users/@me', headers=headers)
         return response.json() if response.status_code == 200 else None
     
     @staticmethod
@@ -251,13 +428,15 @@ class DiscordOAuth:
             'Authorization': f'Bearer {access_token}'
         }
         
-        response = requests.get(f'{DISCORD_API_BASE_URL}/users/@me/guilds', headers=headers)
+        response = http_client.get(f'{DISCORD_API_BASE_URL}/users/@me/guilds', headers=headers)
         return response.json() if response.status_code == 200 else None
 
 # Geolocation service using Abstract API
 class GeolocationService:
-    @staticmethod
-    def get_geolocation_data(ip_address):
+    def __init__(self, cache=None):
+        self.cache = cache
+    
+    def get_geolocation_data(self, ip_address):
         if not ABSTRACT_API_KEY:
             print("⚠️ Abstract API key not set - using mock data")
             return {
@@ -271,31 +450,9 @@ class GeolocationService:
             }
         
         try:
-            response = requests.get(
-                ABSTRACT_API_URL,
-                params={
-                    'api_key': ABSTRACT_API_KEY,
-                    'ip_address': ip_address,
-                    'fields': 'country,region,city,isp,security,connection'
-                },
-                timeout=5
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return {
-                    "ip_address": ip_address,
-                    "country": data.get('country', 'Unknown'),
-                    "region": data.get('region', 'Unknown'),
-                    "city": data.get('city', 'Unknown'),
-                    "isp": data.get('isp', 'Unknown'),
-                    "vpn_detected": data.get('security', {}).get('is_vpn', False),
-                    "connection_type": data.get('connection', {}).get('connection_type', 'Unknown')
-                }
-            else:
-                print(f"❌ Abstract API error: {response.status_code}")
-                return None
-                
+            if self.cache:
+                return self.cache.get_or_fetch(ip_address, self.fetch_geolocation_data)
+            return self.fetch_geolocation_data(ip_address)
         except Exception as e:
             print(f"❌ Geolocation error: {e}")
             return {
@@ -307,10 +464,117 @@ class GeolocationService:
                 "vpn_detected": False,
                 "connection_type": "Error"
             }
+    
+    @staticmethod
+    def fetch_geolocation_data(ip_address):
+        """Query Abstract API directly; returns None on a non-200 response"""
+        response = http_client.get(
+            ABSTRACT_API_URL,
+            params={
+                'api_key': ABSTRACT_API_KEY,
+                'ip_address': ip_address,
+                'fields': 'country,region,city,isp,security,connection'
+            },
+            timeout=5
+        )
+        
+        if response.status_code == 200:
+            data = response.json()
+            return {
+                "ip_address": ip_address,
+                "country": data.get('country', 'Unknown'),
+                "region": data.get('region', 'Unknown'),
+                "city": data.get('city', 'Unknown'),
+                "isp": data.get('isp', 'Unknown'),
+                "vpn_detected": data.get('security', {}).get('is_vpn', False),
+                "connection_type": data.get('connection', {}).get('connection_type', 'Unknown')
+            }
+        else:
+            print(f"❌ Abstract API error: {response.status_code}")
+            return None
+
+# Resolves portal geolocation off the request thread
+class GeolocationResolver:
+    def __init__(self, service, max_workers=8, ttl=900):
+        self.service = service
+        self.ttl = ttl
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="vynk-geolocation")
+        self._lock = threading.Lock()
+        self._pending = {}
+    
+    def submit(self, session_id, ip_address):
+        """Start resolving geolocation for a verification session"""
+        future = self.executor.submit(self.service.get_geolocation_data, ip_address)
+        with self._lock:
+            self._prune()
+            self._pending[session_id] = (future, ip_address, time.monotonic())
+        return future
+    
+    def get(self, session_id, timeout=0):
+        """Return (ready, geolocation_data, ip_address) for a session, waiting up to timeout seconds"""
+        with self._lock:
+            entry = self._pending.get(session_id)
+        if entry is None:
+            raise KeyError(session_id)
+        
+        future, ip_address, _ = entry
+        try:
+            return True, future.result(timeout=timeout), ip_address
+        except FutureTimeoutError:
+            return False, None, ip_address
+    
+    def forget(self, session_id):
+        with self._lock:
+            self._pending.pop(session_id, None)
+    
+    def _prune(self):
+        cutoff = time.monotonic() - self.ttl
+        for session_id in [sid for sid, (_, _, created) in self._pending.items() if created < cutoff]:
+            del self._pending[session_id]
 
 db = DashboardDB()
 discord_oauth = DiscordOAuth()
-geolocation_service = GeolocationService()
+# Admin-guild lists and token refresh for dashboard users
+oauth_sessions = OAuthSessionManager(
+    db,
+    discord_oauth,
+    guild_ttl=int(os.getenv('VYNK_GUILD_CACHE_TTL', 300)),
+    purge_after=int(os.getenv('VYNK_USER_SESSION_PURGE_AFTER', 7 * 86400))
+)
+discord_rest = DiscordREST(discord_bot_token, base_url=DISCORD_API_BASE_URL)
+geolocation_service = GeolocationService(
+    GeolocationCache(
+        DATABASE_PATH,
+        max_entries=int(os.getenv('GEOLOCATION_CACHE_SIZE', 10000)),
+        ttl=int(os.getenv('GEOLOCATION_CACHE_TTL', 86400))
+    )
+)
+geolocation_resolver = GeolocationResolver(
+    geolocation_service,
+    max_workers=int(os.getenv('GEOLOCATION_WORKERS', 8))
+)
+# Active portal sessions live in memory; only finished ones reach SQLite
+verification_sessions = VerificationSessionStore(
+    db,
+    ttl=int(os.getenv('VYNK_SESSION_TTL', 900)),
+    max_sessions=int(os.getenv('VYNK_MAX_ACTIVE_SESSIONS', 10000))
+)
+
+# Serialized /api/stats and /api/verifications bodies, keyed by guild version
+response_cache = ResponseCache(
+    max_entries=int(os.getenv('VYNK_RESPONSE_CACHE_SIZE', 1024)),
+    ttl=float(os.getenv('VYNK_RESPONSE_CACHE_TTL', 60))
+)
+
+# Shared poller behind the dashboard's /api/live stream
+live_feed = LiveFeed(
+    DATABASE_PATH,
+    poll_interval=float(os.getenv('VYNK_LIVE_POLL_INTERVAL', 1.0)),
+    max_subscribers=int(os.getenv('VYNK_LIVE_MAX_SUBSCRIBERS', 8))
+)
+
+# /verify-backlog jobs are recorded here and run by the bot process
+backlog_jobs = BacklogJobManager(None, DATABASE_PATH)
 
 # Authentication decorator
 def login_required(f):
@@ -321,6 +585,20 @@ def login_required(f):
     decorated_function.__name__ = f.__name__
     return decorated_function
 
+# Guild authorization for routes taking a <guild_id>; implies login_required
+def guild_admin_required(f):
+    def decorated_function(guild_id, *args, **kwargs):
+        if 'user_id' not in session:
+            return redirect('/login')
+        admin_guilds = oauth_sessions.get_admin_guilds(session['user_id'])
+        if admin_guilds is None:
+            return jsonify({'error': 'Discord session expired, please log in again'}), 401
+        if not any(g['id'] == guild_id for g in admin_guilds):
+            return jsonify({'error': 'You are not an administrator of this server'}), 403
+        return f(guild_id, *args, **kwargs)
+    decorated_function.__name__ = f.__name__
+    return decorated_function
+
 # Routes
 @app.route('/')
 def index():
@@ -355,6 +633,9 @@ def auth_callback():
         user_info
     )
     
+    # A fresh login may come with different guild permissions
+    oauth_sessions.forget(user_info['id'])
+    
     # Set session
     session['user_id'] = user_info['id']
     session['username'] = user_info['username']
@@ -364,6 +645,8 @@ def auth_callback():
 
 @app.route('/logout')
 def logout():
+    if 'user_id' in session:
+        oauth_sessions.forget(session['user_id'])
     session.clear()
     return redirect('/')
 
@@ -371,14 +654,11 @@ def logout():
 @login_required
 def dashboard():
     try:
-        # Get user's guilds
-        user_session = db.get_user_session(session['user_id'])
-        if not user_session:
+        # User's admin guilds, cached and with the access token refreshed as needed
+        admin_guilds = oauth_sessions.get_admin_guilds(session['user_id'])
+        if admin_guilds is None:
             return redirect('/login')
         
-        guilds = discord_oauth.get_user_guilds(user_session['access_token'])
-        admin_guilds = [g for g in guilds if (g['permissions'] & 0x8) == 0x8]  # ADMINISTRATOR permission
-        
         # Get stats for first admin guild (or demo data)
         if admin_guilds:
             guild_id = admin_guilds[0]['id']
@@ -412,23 +692,24 @@ def verification_portal(guild_id, user_id):
         else:
             ip_address = request.remote_addr
         
-        # Create verification session
+        # Create verification session (in memory; persisted when it completes)
         session_id = str(uuid.uuid4())
-        db.create_verification_session(session_id, user_id, guild_id, ip_address)
+        verification_sessions.create(session_id, user_id, guild_id, ip_address)
         
-        # Get geolocation data
-        geolocation_data = geolocation_service.get_geolocation_data(ip_address)
+        # Resolve geolocation in the background; the page polls /api/geolocation/<session_id>
+        geolocation_resolver.submit(session_id, ip_address)
         
         return render_template('verification_portal.html', 
                              session_id=session_id,
                              user_id=user_id,
                              guild_id=guild_id,
-                             geolocation_data=geolocation_data)
+                             ip_address=ip_address)
     except Exception as e:
         return f"Error loading verification portal: {e}", 500
 
 @app.route('/api/verify', methods=['POST'])
 def api_verify():
+    session_id = None
     try:
         data = request.json
         session_id = data.get('session_id')
@@ -438,16 +719,22 @@ def api_verify():
         if not all([session_id, user_id, guild_id]):
             return jsonify({'success': False, 'error': 'Missing required fields'})
         
-        # Get IP and geolocation for logging
-        if request.headers.get('X-Forwarded-For'):
-            ip_address = request.headers.get('X-Forwarded-For').split(',')[0]
-        else:
-            ip_address = request.remote_addr
+        verification_session = verification_sessions.get(session_id)
+        if not verification_session:
+            return jsonify({'success': False, 'error': 'Verification session expired. Please reload the page.'}), 404
+        if verification_session['discord_user_id'] != user_id or verification_session['discord_guild_id'] != guild_id:
+            return jsonify({'success': False, 'error': 'Verification session does not match this user'}), 403
         
-        geolocation_data = geolocation_service.get_geolocation_data(ip_address)
+        # Reuse the geolocation resolved when the portal was rendered
+        try:
+            _, geolocation_data, _ = geolocation_resolver.get(session_id, timeout=5)
+        except KeyError:
+            geolocation_data = geolocation_service.get_geolocation_data(verification_session['ip_address'])
+        geolocation_resolver.forget(session_id)
         
-        # Update session status
-        db.update_verification_session(session_id, 'completed', geolocation_data)
+        # Persist the finished session; a concurrent submit for the same session loses here
+        if not verification_sessions.complete(session_id, 'completed', geolocation_data):
+            return jsonify({'success': False, 'error': 'Verification session already completed'}), 409
         
         # Log the verification using the main database
         try:
@@ -463,13 +750,8 @@ def api_verify():
             print(f"❌ Error logging to main database: {db_error}")
             # Fallback: log to web dashboard database
             try:
-                cursor = db.conn.cursor()
-                cursor.execute('''
-                    INSERT INTO verification_logs 
-                    (guild_id, user_id, user_name, method, status, timestamp)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (guild_id, user_id, f"Web User {user_id}", "web", "success", datetime.now().isoformat()))
-                db.conn.commit()
+                with db.conn:
+                    insert_verification_logs(db.conn, [(guild_id, user_id, f"Web User {user_id}", "web", "success", datetime.now().isoformat())])
                 print(f"✅ Web verification logged to fallback database")
             except Exception as fallback_error:
                 print(f"❌ Error with fallback logging: {fallback_error}")
@@ -484,13 +766,57 @@ def api_verify():
         })
     except Exception as e:
         print(f"Error in API verify: {e}")
+        if session_id:
+            verification_sessions.mark(session_id, 'failed')
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/api/geolocation/<session_id>')
+def api_geolocation(session_id):
+    # Short long-poll: hold the request for at most a couple of seconds
+    wait = min(request.args.get('wait', 0, type=float), 2.0)
+    try:
+        ready, geolocation_data, _ = geolocation_resolver.get(session_id, timeout=wait)
+    except KeyError:
+        return jsonify({'status': 'unknown'}), 404
+    except Exception as e:
+        return jsonify({'status': 'error', 'error': str(e)}), 500
+    
+    if not ready:
+        return jsonify({'status': 'pending'})
+    return jsonify({'status': 'ready', 'geolocation_data': geolocation_data})
+
+def conditional_json(endpoint, guild_id, build, extra=()):
+    """JSON response with a strong ETag derived from the guild's data version.
+    
+    A matching If-None-Match gets a 304 without running `build`; otherwise the
+    serialized body comes from response_cache when this exact version was
+    already rendered. `extra` adds key parts for data that changes with time.
+    """
+    params = tuple(sorted(request.args.items(multi=True)))
+    key = (endpoint, guild_id, params, db.get_guild_version(guild_id), *extra)
+    etag = hashlib.sha1(repr(key).encode()).hexdigest()
+    
+    if request.if_none_match.contains(etag):
+        response_cache.record_not_modified()
+        response = app.response_class(status=304)
+    else:
+        body = response_cache.get(key)
+        if body is None:
+            body = app.json.dumps(build())
+            response_cache.put(key, body)
+        response = app.response_class(body, mimetype='application/json')
+    
+    response.set_etag(etag)
+    # Clients may keep the body but must revalidate before reusing it
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
 @app.route('/api/stats/<guild_id>')
 def api_stats(guild_id):
     try:
-        stats = db.get_server_stats(guild_id)
-        return jsonify(stats)
+        # The 24h figure moves with the hourly bucket even without new logs
+        hour = bucket_for(datetime.now().isoformat())
+        return conditional_json('stats', guild_id, lambda: db.get_server_stats(guild_id), extra=(hour,))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -509,32 +835,22 @@ def discord_assign_role():
             return jsonify({'success': False, 'error': 'Missing guild_id or user_id'})
         
         # Get server settings to find the role ID and log channel
-        cursor = db.conn.cursor()
-        cursor.execute('SELECT verified_role, log_channel FROM server_settings WHERE guild_id = ?', (guild_id,))
-        result = cursor.fetchone()
+        settings = db.get_server_settings(guild_id)
         
-        if not result:
+        if not settings:
             return jsonify({'success': False, 'error': 'Server not configured'})
         
-        verified_role_id = result[0]
-        log_channel_id = result[1]
-        
-        # Use Discord's REST API to assign role
-        headers = {
-            'Authorization': f'Bot {discord_bot_token}',
-            'Content-Type': 'application/json'
-        }
+        verified_role_id = settings['verified_role']
+        log_channel_id = settings['log_channel']
         
-        # Add role to guild member
-        url = f'https://discord.com/api/v10/guilds/{guild_id}/members/{user_id}/roles/{verified_role_id}'
-        response = requests.put(url, headers=headers)
+        # Use Discord's REST API to assign role (waits out rate limits instead of failing)
+        response = discord_rest.put(f'/guilds/{guild_id}/members/{user_id}/roles/{verified_role_id}')
         
         if response.status_code == 204:
             # Success - log the verification
             try:
                 # Get user info for logging
-                user_url = f'https://discord.com/api/v10/users/{user_id}'
-                user_response = requests.get(user_url, headers=headers)
+                user_response = discord_rest.get(f'/users/{user_id}')
                 user_data = user_response.json() if user_response.status_code == 200 else {}
                 username = user_data.get('username', f'User{user_id}')
                 discriminator = user_data.get('discriminator', '0000')
@@ -571,11 +887,10 @@ def discord_assign_role():
                         }
                     }
                     
-                    log_url = f'https://discord.com/api/v10/channels/{log_channel_id}/messages'
                     log_data = {
                         "embeds": [log_embed]
                     }
-                    log_response = requests.post(log_url, headers=headers, json=log_data)
+                    log_response = discord_rest.post(f'/channels/{log_channel_id}/messages', json=log_data)
                     
                     if log_response.status_code == 200:
                         print("📝 Log sent to Discord channel")
@@ -600,9 +915,23 @@ def discord_assign_role():
 
 @app.route('/api/verifications/<guild_id>')
 def api_verifications(guild_id):
+    limit = min(max(request.args.get('limit', 10, type=int), 1), MAX_VERIFICATIONS_PAGE)
     try:
-        limit = request.args.get('limit', 10, type=int)
-        verifications = db.get_recent_verifications(guild_id, limit)
+        since = normalize_time_filter(request.args.get('since'))
+        until = normalize_time_filter(request.args.get('until'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    def build():
+        verifications, next_cursor = db.get_verifications_page(
+            guild_id,
+            limit,
+            cursor=request.args.get('cursor'),
+            method=request.args.get('method'),
+            status=request.args.get('status'),
+            since=since,
+            until=until
+        )
         
         result = []
         for v in verifications:
@@ -613,10 +942,161 @@ def api_verifications(guild_id):
                 'timestamp': v['timestamp']
             })
         
-        return jsonify(result)
+        return {'verifications': result, 'next_cursor': next_cursor}
+    
+    try:
+        return conditional_json('verifications', guild_id, build)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def export_records(batches):
+    """Flatten export rows into EXPORT_FIELDS dicts, one list per batch"""
+    for rows in batches:
+        records = []
+        for row in rows:
+            geolocation = json.loads(row['geolocation_data']) if row['geolocation_data'] else {}
+            record = {field: row[field] for field in EXPORT_FIELDS[:6]}
+            for field in EXPORT_FIELDS[6:]:
+                record[field] = geolocation.get(field)
+            records.append(record)
+        yield records
+
+def export_csv(batches):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    for records in export_records(batches):
+        writer.writerows(records)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    tail = buffer.getvalue()
+    if tail:
+        yield tail.encode()
+
+def export_ndjson(batches):
+    for records in export_records(batches):
+        yield ''.join(json.dumps(record) + '\n' for record in records).encode()
+
+def gzip_stream(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+@app.route('/api/export/<guild_id>')
+@guild_admin_required
+def api_export(guild_id):
+    export_format = request.args.get('format', 'csv')
+    if export_format not in ('csv', 'ndjson'):
+        return jsonify({'error': 'format must be csv or ndjson'}), 400
+    try:
+        since = normalize_time_filter(request.args.get('since'))
+        until = normalize_time_filter(request.args.get('until'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    batches = db.iter_verification_export(guild_id, since=since, until=until)
+    if export_format == 'csv':
+        body, mimetype = export_csv(batches), 'text/csv'
+    else:
+        body, mimetype = export_ndjson(batches), 'application/x-ndjson'
+    
+    filename = f"vynk-{guild_id}-verifications.{export_format}"
+    if request.args.get('gzip') in ('1', 'true'):
+        body, mimetype, filename = gzip_stream(body), 'application/gzip', filename + '.gz'
+    
+    return Response(body, mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename="{filename}"'
+    })
+
+def sse_message(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/api/live/<guild_id>')
+@guild_admin_required
+def api_live(guild_id):
+    subscription = live_feed.subscribe(guild_id)
+    if subscription is None:
+        return jsonify({'error': 'Too many live dashboard connections'}), 503
+    
+    def stream():
+        try:
+            # Tell EventSource to wait a few seconds before reconnecting
+            yield "retry: 5000\n\n"
+            while True:
+                if subscription.lagged:
+                    yield sse_message('reset', {})
+                    return
+                message = subscription.get(timeout=15)
+                if message is None:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": keepalive\n\n"
+                else:
+                    yield sse_message(*message)
+        finally:
+            live_feed.unsubscribe(subscription)
+    
+    return Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/verify-backlog/<guild_id>', methods=['POST'])
+@guild_admin_required
+def api_start_verify_backlog(guild_id):
+    settings = db.get_server_settings(guild_id)
+    if not settings:
+        return jsonify({'success': False, 'error': 'Server not configured'}), 404
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        joined_before = parse_joined_before(data.get('joined_before'))
+    except (ValueError, TypeError):
+        return jsonify({'success': False, 'error': 'joined_before must be a date like 2024-01-31'}), 400
+    
+    try:
+        job_id = backlog_jobs.create_job(guild_id, settings['verified_role'],
+                                         joined_before=joined_before, requested_by=session['user_id'])
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 409
+    # The bot picks the job up on its next poll
+    return jsonify({'success': True, 'job': backlog_jobs.get_job(job_id)}), 202
+
+@app.route('/api/verify-backlog/<guild_id>')
+@guild_admin_required
+def api_verify_backlog_status(guild_id):
+    job = backlog_jobs.get_latest_job(guild_id)
+    if not job:
+        return jsonify({'success': False, 'error': 'No verification backlog jobs for this server'}), 404
+    return jsonify({'success': True, 'job': job})
+
+@app.route('/api/verify-backlog/<guild_id>/cancel', methods=['POST'])
+@guild_admin_required
+def api_cancel_verify_backlog(guild_id):
+    job = backlog_jobs.get_active_job(guild_id)
+    if not job or not backlog_jobs.cancel_job(job['job_id']):
+        return jsonify({'success': False, 'error': 'No verification backlog job is running'}), 404
+    # The bot's task stops at its next checkpoint
+    return jsonify({'success': True, 'job': backlog_jobs.get_job(job['job_id'])})
+
+@app.route('/api/diagnostics')
+def api_diagnostics():
+    return jsonify({
+        'settings_cache': db.settings_cache.stats(),
+        'geolocation_cache': geolocation_service.cache.stats(),
+        'http_client': http_client.stats(),
+        'discord_rest': discord_rest.stats(),
+        'live_feed': live_feed.stats(),
+        'response_cache': response_cache.stats(),
+        'oauth_sessions': oauth_sessions.stats(),
+        'verification_sessions': verification_sessions.stats()
+    })
+
 @app.route('/test-setup')
 def test_setup():
     return render_template('test_setup.html')
@@ -633,6 +1113,9 @@ if __name__ == '__main__':
     print(f"   - Redirect URI: {DISCORD_REDIRECT_URI}")
     print(f"📊 Database Status: ✅ Connected and ready")
 
+    # Hosts stop the process with SIGTERM; exit normally so atexit flushes buffered verification logs
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
     if debug:
         print(f"⚙️ Running in debug mode on port {port}")
         app.run(debug=True, port=port, host='0.0.0.0')
@@ -641,7 +1124,8 @@ if __name__ == '__main__':
         try:
             from waitress import serve
             print(f"🚀 Production server starting on port {port}")
-            serve(app, host='0.0.0.0', port=port)
+            # Each open /api/live stream holds a worker thread
+            serve(app, host='0.0.0.0', port=port, threads=int(os.getenv('VYNK_WEB_THREADS', 16)))
         except Exception as e:
             print(f"❌ Failed to start production server: {e}")
             # Fallback to Flask dev server if waitress not available
@@ -0,0 +1,183 @@
+import asyncio
+import time
+from collections import deque
+import discord
+
+# Channels searched, in order, for welcome messages
+WELCOME_CHANNEL_NAMES = ("verification", "general")
+
+WELCOME_DESCRIPTION = "Please complete verification to access the server. Check the verification channel for instructions."
+
+_UNRESOLVED = object()
+
+class WelcomeDispatcher:
+    """Welcomes new members, switching a guild to batched welcomes during join floods.
+
+    Normally each member gets their own welcome message. Once a guild sees
+    `flood_threshold` joins within `flood_window` seconds it stays in flood mode
+    until `calm_after` seconds pass below that rate: joins are only recorded,
+    and every `interval` seconds the guild gets one message mentioning up to
+    `batch_size` of them and counting the rest.
+
+    The welcome channel is resolved once per guild and cached until
+    invalidate() is called for a channel create, delete or update.
+    """
+
+    def __init__(self, flood_threshold=10, flood_window=10.0, interval=5.0, batch_size=50, calm_after=30.0):
+        self.flood_threshold = flood_threshold
+        self.flood_window = flood_window
+        self.interval = interval
+        # ~22 characters per mention keeps 50 well inside Discord's 2000
+        self.batch_size = batch_size
+        self.calm_after = calm_after
+
+        # guild_id -> channel_id, or None when the guild has no welcome channel
+        self._channels = {}
+        self._joins = {}
+        self._flood_until = {}
+        # guild_id -> [guild, mentions, total]
+        self._pending = {}
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+        self.joins = 0
+        self.messages_sent = 0
+        self.batch_messages = 0
+        self.batched_members = 0
+        self.floods = 0
+        self.channel_lookups = 0
+        self.send_errors = 0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop the background task and send any pending batches"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def member_joined(self, member):
+        guild = member.guild
+        self.joins += 1
+        if self._flooding(guild.id, time.monotonic()):
+            entry = self._pending.get(guild.id)
+            if entry is None:
+                entry = self._pending[guild.id] = [guild, [], 0]
+            if len(entry[1]) < self.batch_size:
+                entry[1].append(member.mention)
+            entry[2] += 1
+            self._wakeup.set()
+            return
+
+        print(f"👤 {member} joined the server {guild.name}")
+        channel = self.welcome_channel(guild)
+        if channel:
+            embed = discord.Embed(
+                title=f"Welcome {member.name}! 👋",
+                description=WELCOME_DESCRIPTION,
+                color=0x3B82F6
+            )
+            await self._send(channel, f"{member.mention}", embed)
+
+    def welcome_channel(self, guild):
+        channel_id = self._channels.get(guild.id, _UNRESOLVED)
+        if channel_id is _UNRESOLVED:
+            self.channel_lookups += 1
+            channel = None
+            for name in WELCOME_CHANNEL_NAMES:
+                channel = discord.utils.get(guild.text_channels, name=name)
+                if channel:
+                    break
+            self._channels[guild.id] = channel.id if channel else None
+            return channel
+        return guild.get_channel(channel_id) if channel_id else None
+
+    def invalidate(self, guild_id):
+        """Forget the guild's cached welcome channel"""
+        self._channels.pop(guild_id, None)
+
+    async def flush(self):
+        pending, self._pending = self._pending, {}
+        for guild, mentions, total in pending.values():
+            channel = self.welcome_channel(guild)
+            if not channel:
+                continue
+            content = " ".join(mentions)
+            if total > len(mentions):
+                content += f" and **{total - len(mentions)}** more"
+            embed = discord.Embed(
+                title=f"Welcome, {total} new member{'s' if total != 1 else ''}! 👋",
+                description=WELCOME_DESCRIPTION,
+                color=0x3B82F6
+            )
+            if await self._send(channel, content, embed):
+                self.batch_messages += 1
+                self.batched_members += total
+                print(f"👥 Welcomed {total} member(s) in one message in guild {guild.name}")
+
+    def stats(self):
+        now = time.monotonic()
+        return {
+            'joins': self.joins,
+            'guilds_flooding': sum(1 for until in self._flood_until.values() if until > now),
+            'floods': self.floods,
+            'pending_members': sum(entry[2] for entry in self._pending.values()),
+            'messages_sent': self.messages_sent,
+            'batch_messages': self.batch_messages,
+            'batched_members': self.batched_members,
+            'cached_channels': len(self._channels),
+            'channel_lookups': self.channel_lookups,
+            'send_errors': self.send_errors
+        }
+
+    def _flooding(self, guild_id, now):
+        joins = self._joins.get(guild_id)
+        if joins is None:
+            joins = self._joins[guild_id] = deque(maxlen=self.flood_threshold)
+        joins.append(now)
+        if len(joins) == self.flood_threshold and now - joins[0] <= self.flood_window:
+            if guild_id not in self._flood_until:
+                self.floods += 1
+                print(f"🌊 Join flood detected in guild {guild_id}, batching welcome messages")
+            self._flood_until[guild_id] = now + self.calm_after
+            return True
+
+        until = self._flood_until.get(guild_id)
+        if until is None:
+            return False
+        if until > now:
+            return True
+        del self._flood_until[guild_id]
+        print(f"✅ Join flood over in guild {guild_id}")
+        return False
+
+    async def _send(self, channel, content, embed):
+        try:
+            await channel.send(
+                content,
+                embed=embed,
+                allowed_mentions=discord.AllowedMentions(everyone=False, roles=False, users=True)
+            )
+            self.messages_sent += 1
+            return True
+        except Exception as e:
+            self.send_errors += 1
+            print(f"❌ Error sending welcome message: {e}")
+            return False
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(self.interval)
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"❌ Error sending batched welcomes: {e}")
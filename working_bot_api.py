@@ -2,10 +2,9 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS
 import threading
 import os
-from dotenv import load_dotenv
 import asyncio
-import queue
-import time
+from dotenv import load_dotenv
+from role_dispatcher import RoleAssignmentDispatcher
 
 load_dotenv()
 
@@ -13,40 +12,13 @@ app = Flask(__name__)
 CORS(app)
 app.secret_key = os.getenv('FLASK_SECRET_KEY', 'bot-api-secret-2024')
 
-# Global bot reference and task queue
+# Global bot reference
 bot_ref = None
-task_queue = queue.Queue()
-results = {}
 
 def set_bot(bot):
     global bot_ref
     bot_ref = bot
-
-def bot_worker():
-    """Run bot tasks in the bot's thread"""
-    while True:
-        try:
-            task_id, guild_id, user_id = task_queue.get(timeout=1)
-            if bot_ref and bot_ref.loop:
-                # Schedule the task in the bot's event loop
-                future = asyncio.run_coroutine_threadsafe(
-                    assign_role_task(guild_id, user_id), 
-                    bot_ref.loop
-                )
-                try:
-                    result = future.result(timeout=10)  # 10 second timeout
-                    results[task_id] = result
-                except Exception as e:
-                    results[task_id] = {'success': False, 'error': str(e)}
-            task_queue.task_done()
-        except queue.Empty:
-            continue
-        except Exception as e:
-            print(f"❌ Bot worker error: {e}")
-
-# Start the worker thread
-worker_thread = threading.Thread(target=bot_worker, daemon=True)
-worker_thread.start()
+    role_dispatcher.attach(bot.loop)
 
 @app.route('/api/assign-role', methods=['POST', 'OPTIONS'])
 def assign_role():
@@ -66,18 +38,9 @@ def assign_role():
         if not bot_ref:
             return jsonify({'success': False, 'error': 'Bot not initialized'})
         
-        # Create task and wait for result
-        task_id = f"{guild_id}_{user_id}_{int(time.time())}"
-        task_queue.put((task_id, guild_id, user_id))
-        
-        # Wait for result (max 15 seconds)
-        for _ in range(150):  # 150 * 0.1 = 15 seconds
-            if task_id in results:
-                result = results.pop(task_id)
-                return jsonify(result)
-            time.sleep(0.1)
-        
-        return jsonify({'success': False, 'error': 'Operation timeout'})
+        # Run on the bot's loop and wait on this request's own future
+        result = role_dispatcher.assign(guild_id, user_id)
+        return jsonify(result)
         
     except Exception as e:
         print(f"❌ Error in assign_role: {e}")
@@ -96,15 +59,13 @@ async def assign_role_task(guild_id, user_id):
             return {'success': False, 'error': 'User not found in guild'}
         
         # Get verified role from database
-        from database import db
-        cursor = db.conn.cursor()
-        cursor.execute('SELECT verified_role FROM server_settings WHERE guild_id = ?', (guild_id,))
-        result = cursor.fetchone()
+        from database import async_db
+        settings = await async_db.get_server_settings(guild_id)
         
-        if not result:
+        if not settings:
             return {'success': False, 'error': 'Server not configured. Please run /setup-web-verification first.'}
         
-        verified_role_id = result[0]
+        verified_role_id = settings['verified_role']
         verified_role = guild.get_role(int(verified_role_id))
         
         if not verified_role:
@@ -120,7 +81,7 @@ async def assign_role_task(guild_id, user_id):
         await member.add_roles(verified_role)
         
         # Log the verification
-        db.log_verification(
+        await async_db.log_verification(
             guild_id=guild_id,
             user_id=user_id,
             user_name=str(member),
@@ -139,14 +100,35 @@ async def assign_role_task(guild_id, user_id):
         print(f"❌ Error in assign_role_task: {e}")
         return {'success': False, 'error': str(e)}
 
+role_dispatcher = RoleAssignmentDispatcher(
+    assign_role_task,
+    max_concurrency=int(os.getenv('VYNK_ROLE_CONCURRENCY', 8)),
+    timeout=float(os.getenv('VYNK_ROLE_TIMEOUT', 10))
+)
+
+async def loop_stats():
+    """Stats of services the bot's event loop mutates; only read them on that loop"""
+    return {
+        'log_dispatcher': bot_ref.log_dispatcher.stats(),
+        'welcomes': bot_ref.welcomes.stats(),
+        'captcha_pool': bot_ref.captcha_pool.stats()
+    }
+
 @app.route('/api/bot-status', methods=['GET'])
 def bot_status():
     if bot_ref and bot_ref.is_ready():
+        from database import db
+        snapshot = asyncio.run_coroutine_threadsafe(loop_stats(), bot_ref.loop).result(timeout=5)
         return jsonify({
             'status': 'online', 
             'guilds': len(bot_ref.guilds),
             'user': str(bot_ref.user),
-            'latency': round(bot_ref.latency * 1000, 2)
+            'latency': round(bot_ref.latency * 1000, 2),
+            'settings_cache': db.settings_cache.stats(),
+            'role_dispatcher': role_dispatcher.stats(),
+            'maintenance': bot_ref.retention.status(),
+            'captcha_answers': bot_ref.captcha_answers.stats(),
+            **snapshot
         })
     return jsonify({'status': 'offline'})
 